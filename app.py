@@ -1,225 +1,372 @@
-from fastapi import FastAPI, HTTPException, Query, Path
+from fastapi import FastAPI, HTTPException, Query, Path, Request, Header, Response, Depends
+from fastapi.responses import JSONResponse
 from typing import Optional, Dict, List
-from supabase import create_client, Client
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
-from graphql.menu_graphql import fetch_menu_for_place
-from graphql.menu_groups_graphql import fetch_menu_groups_for_place
+from graphql.menu_graphql import fetch_menu_for_place, menu_fetch_stats
+from graphql.menu_groups_graphql import fetch_menu_groups_for_place, menu_groups_fetch_stats
+from graphql import booking
 from models.auth import LoginRequest, LoginResponse, SignupRequest, SignupResponse
+from models.hours import BusinessHoursBatchRequest, BusinessHoursBatchResponse
+from models.cache import CacheInvalidateRequest
+from models.action import ActionBatchRequest, ActionBatchResponse, ActionEventResult
+from core.cache import TTLCache
+from core import http_client, db, passwords
+from core.db import supabase, QueryTimeout
+from core.passwords import PasswordHashBusy
+from core.session import Session, InvalidSession, issue_token, verify_token, bearer_token, SESSION_SECRET_CONFIGURED
+from core.etag import make_etag, etag_response
+from core.business_hours import load_business_hours
+from core.open_hours import OpenHoursIndex, minute_of_week
+from core.geo_index import GeoIndex
+from core.tile_cache import TileCache
+from core.category_catalog import CategoryCatalog
+from core.action_spool import ActionSpool
+from core.write_queue import WriteQueue
+from core.jobs import Job, JobRegistry
+from core.rate_limit import TokenBucket
+from core.action_buffer import ActionAggregator, ACTION_TYPES, COUNTERS, FEEDBACKS, KINDS, aggregate, build_rows
+from core.json_response import list_response
+from core.compression import CompressionMiddleware
+from core import compression
+from core.pagination import PageRequest, decode_cursor, parse_fields, paginate
+from contextlib import asynccontextmanager
 import os
-import httpx
-import re
 import json
-import requests
-import random
 import asyncio
 import statistics
+import time
 import uuid
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 토큰이 필수인데 서명 키가 프로세스마다 다르면 다른 워커/재시작 전에 발급한 토큰이 모두 401이 됨
+    if SESSION_AUTH_REQUIRED and not SESSION_SECRET_CONFIGURED:
+        raise RuntimeError("SESSION_AUTH_REQUIRED=true이면 SESSION_SECRET을 설정해야 합니다")
+    # upstream(Naver) 호출용 공용 커넥션 풀
+    await http_client.startup()
+    # 비밀번호 해시 전용 프로세스 풀
+    await passwords.startup()
+    # 영업시간 구간 인덱스 주기적 갱신
+    hours_index_task = asyncio.create_task(refresh_open_hours_index_forever())
+    # 주변 장소 인덱스 적재 및 증분 갱신
+    geo_index_task = asyncio.create_task(refresh_geo_indexes_forever()) if GEO_INDEX_ENABLED else None
+    # 백그라운드 쓰기 큐
+    write_queue_task = asyncio.create_task(write_queue.run_forever())
+    # 카테고리 카탈로그는 첫 요청 전에 적재하고 이후 주기적으로 갱신
+    await refresh_category_catalog()
+    category_task = asyncio.create_task(refresh_category_catalog_forever())
+    # action 카운터 주기적 일괄 반영
+    action_flush_task = asyncio.create_task(action_aggregator.run_forever()) if ACTION_WRITE_BEHIND_ENABLED else None
+    # action 이벤트 spool (이전 기동에서 남은 이벤트도 이어서 반영)
+    action_spool_task = None
+    if ACTION_SPOOL_ENABLED:
+        await action_spool.start()
+        action_spool_task = asyncio.create_task(action_spool.run_drainer(ship_action_events))
+    yield
+    hours_index_task.cancel()
+    category_task.cancel()
+    if action_flush_task:
+        action_aggregator.stop()
+        await action_flush_task
+        await action_aggregator.drain()
+    if action_spool_task:
+        action_spool_task.cancel()
+        await action_spool.stop(ship_action_events)
+    write_queue.stop()
+    await write_queue_task
+    await write_queue.flush()
+    if geo_index_task:
+        geo_index_task.cancel()
+    await menu_cache_jobs.shutdown()
+    await http_client.shutdown()
+    await passwords.shutdown()
+    db.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# 응답 압축 (Accept-Encoding에 따라 br/gzip), 단위: byte / 초
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_CACHE_TTL = int(os.getenv("COMPRESSION_CACHE_TTL", "600"))
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# ETag가 있는 응답의 압축본 캐시 ((ETag, 인코딩) -> 압축된 본문)
+compressed_cache = TTLCache(
+    "compressed_body",
+    ttl=COMPRESSION_CACHE_TTL,
+    maxsize=4096,
+    max_bytes=COMPRESSION_CACHE_MAX_BYTES,
+    sizeof=len,
+)
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        cache=compressed_cache,
+    )
+
+# DB 쿼리 제한 시간 초과는 504로 응답
+@app.exception_handler(QueryTimeout)
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    return JSONResponse(status_code=504, content={"error": str(exc)})
 
-SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
-SUPABASE_ANON_API_KEY = os.getenv("SUPABASE_ANON_API_KEY")
-supabase: Client = create_client(SUPABASE_PROJECT_URL, SUPABASE_ANON_API_KEY)
+# 비밀번호 해시 대기열이 가득 차면 503으로 응답 (클라이언트 재시도)
+@app.exception_handler(PasswordHashBusy)
+async def password_hash_busy_handler(request: Request, exc: PasswordHashBusy):
+    return JSONResponse(status_code=503, content={"error": str(exc)}, headers={"Retry-After": "1"})
 
 # KST(한국시간) 설정
 KST = timezone(timedelta(hours=9))
 
-# 비밀번호 해싱
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# 비밀번호 해시
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-# 로그인 시, 비밀번호 검증
-def verify_password(plain_pw: str, hashed_pw: str) -> bool:
-    return pwd_context.verify(plain_pw, hashed_pw)
+# 영업시간 캐시 설정 (단위: 초 / 개 / byte)
+HOURS_CACHE_TTL = int(os.getenv("HOURS_CACHE_TTL", "1800"))
+HOURS_CACHE_EMPTY_TTL = int(os.getenv("HOURS_CACHE_EMPTY_TTL", "120"))
+HOURS_CACHE_MAXSIZE = int(os.getenv("HOURS_CACHE_MAXSIZE", "5000"))
+HOURS_CACHE_MAX_BYTES = int(os.getenv("HOURS_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# 일괄 조회 시 동시에 긁어오는 최대 개수
+HOURS_BATCH_CONCURRENCY = int(os.getenv("HOURS_BATCH_CONCURRENCY", "8"))
+
+# business_id -> 영업시간 리스트
+hours_cache = TTLCache(
+    "business_hours",
+    ttl=HOURS_CACHE_TTL,
+    maxsize=HOURS_CACHE_MAXSIZE,
+    max_bytes=HOURS_CACHE_MAX_BYTES,
+)
+
+# open_now / open_at 필터용 영업 구간 인덱스 (business_hours_interval 테이블을 메모리에 올려서 사용)
+OPEN_HOURS_REFRESH_INTERVAL = int(os.getenv("OPEN_HOURS_REFRESH_INTERVAL", "600"))
+open_hours_index = OpenHoursIndex()
+
+# 주변 장소 인덱스 (true면 /restaurants, /cache/menu가 get_restaurants RPC 대신 메모리 인덱스로 조회)
+GEO_INDEX_ENABLED = os.getenv("GEO_INDEX_ENABLED", "false").lower() == "true"
+GEO_INDEX_REFRESH_INTERVAL = int(os.getenv("GEO_INDEX_REFRESH_INTERVAL", "60"))
+GEO_INDEX_FULL_RELOAD_INTERVAL = int(os.getenv("GEO_INDEX_FULL_RELOAD_INTERVAL", str(6 * 3600)))
+RESTAURANT_INDEX_COLUMNS = (
+    "place_id, place_name, category, address, road_address, thumbnail, review_score, review_count, "
+    "booking_id, naverorder_id, latitude, longitude, updated_at"
+)
+ACTIVITY_INDEX_COLUMNS = (
+    "place_id, place_name, category, address, road_address, thumbnail, review_score, review_count, "
+    "latitude, longitude, updated_at"
+)
+restaurant_index = GeoIndex("restaurant")
+activity_index = GeoIndex("activity")
+
+# 주변 식당 조회 결과를 지리 타일 단위로 캐싱, 인덱스(GEO_INDEX_ENABLED)가 준비된 경우에만 사용 (단위: m / m / 초 / 개 / byte)
+TILE_CACHE_ENABLED = os.getenv("TILE_CACHE_ENABLED", "true").lower() == "true"
+TILE_CACHE_TILE_M = int(os.getenv("TILE_CACHE_TILE_M", "250"))
+TILE_CACHE_RADIUS_BUCKET = int(os.getenv("TILE_CACHE_RADIUS_BUCKET", "500"))
+TILE_CACHE_TTL = int(os.getenv("TILE_CACHE_TTL", "120"))
+TILE_CACHE_MAXSIZE = int(os.getenv("TILE_CACHE_MAXSIZE", "500"))
+TILE_CACHE_MAX_BYTES = int(os.getenv("TILE_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+nearby_cache = TileCache(
+    tile_m=TILE_CACHE_TILE_M,
+    radius_bucket=TILE_CACHE_RADIUS_BUCKET,
+    ttl=TILE_CACHE_TTL,
+    maxsize=TILE_CACHE_MAXSIZE,
+    max_bytes=TILE_CACHE_MAX_BYTES,
+)
+# /restaurants limit 최대값
+RESTAURANTS_MAX_LIMIT = int(os.getenv("RESTAURANTS_MAX_LIMIT", "500"))
+
+# "맛집"/"여가" 카테고리 목록 (distinct_category_groups를 메모리에 올려서 정렬/직렬화된 상태로 응답)
+CATEGORY_REFRESH_INTERVAL = int(os.getenv("CATEGORY_REFRESH_INTERVAL", "3600"))
+CATEGORY_TYPES = ("food", "leisure")
+category_catalog = CategoryCatalog()
+
+# 응답을 기다리게 할 필요 없는 쓰기(menu_cache, last_active_at)를 모아서 반영하는 큐 (단위: 초 / 개)
+WRITE_QUEUE_WINDOW = float(os.getenv("WRITE_QUEUE_WINDOW", "2"))
+WRITE_QUEUE_MAXSIZE = int(os.getenv("WRITE_QUEUE_MAXSIZE", "10000"))
+write_queue = WriteQueue("background_writes", window=WRITE_QUEUE_WINDOW, maxsize=WRITE_QUEUE_MAXSIZE)
+
+# 식당 상세 응답 캐시 (place_id -> (ETag, 직렬화된 본문))
+DETAIL_CACHE_TTL = int(os.getenv("DETAIL_CACHE_TTL", "600"))
+DETAIL_CACHE_MAXSIZE = int(os.getenv("DETAIL_CACHE_MAXSIZE", "2000"))
+DETAIL_CACHE_MAX_BYTES = int(os.getenv("DETAIL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+detail_cache = TTLCache(
+    "restaurant_detail",
+    ttl=DETAIL_CACHE_TTL,
+    maxsize=DETAIL_CACHE_MAXSIZE,
+    max_bytes=DETAIL_CACHE_MAX_BYTES,
+    sizeof=lambda doc: len(doc[1]) if doc else 0,
+)
+# true면 상세 조회를 get_restaurant_detail RPC 한 번으로 처리
+DETAIL_RPC_ENABLED = os.getenv("DETAIL_RPC_ENABLED", "false").lower() == "true"
+# 캐시 무효화 API 호출 시 X-Cache-Token 헤더와 비교 (없으면 무효화 API 비활성화)
+CACHE_INVALIDATION_TOKEN = os.getenv("CACHE_INVALIDATION_TOKEN")
+# action 카운터 write-behind (true면 요청에서는 메모리에만 쌓고 주기적으로 record_actions RPC로 일괄 반영)
+ACTION_WRITE_BEHIND_ENABLED = os.getenv("ACTION_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+ACTION_FLUSH_INTERVAL = float(os.getenv("ACTION_FLUSH_INTERVAL", "1"))
+ACTION_FLUSH_MAX_PENDING = int(os.getenv("ACTION_FLUSH_MAX_PENDING", "500"))
+# 반영 실패 시 다시 쌓아두는 key 수 상한과, 연속 실패가 이 시간(초)을 넘으면 증가분을 버림
+ACTION_RETRY_MAX_KEYS = int(os.getenv("ACTION_RETRY_MAX_KEYS", "20000"))
+ACTION_RETRY_MAX_AGE = float(os.getenv("ACTION_RETRY_MAX_AGE", "600"))
+ACTION_TABLES = {"restaurant": "user_restaurant_action", "activity": "user_activity_action"}
+action_aggregator = ActionAggregator(
+    lambda rows: flush_actions(rows),
+    interval=ACTION_FLUSH_INTERVAL,
+    max_pending=ACTION_FLUSH_MAX_PENDING,
+    max_retry_keys=ACTION_RETRY_MAX_KEYS,
+    max_retry_age=ACTION_RETRY_MAX_AGE,
+)
+
+# action 이벤트 로컬 spool (true면 요청은 로컬 SQLite에 기록 후 응답, drainer가 record_action_events RPC로 반영)
+ACTION_SPOOL_ENABLED = os.getenv("ACTION_SPOOL_ENABLED", "false").lower() == "true"
+ACTION_SPOOL_PATH = os.getenv("ACTION_SPOOL_PATH", "/tmp/action_spool.db")
+ACTION_SPOOL_DRAIN_INTERVAL = float(os.getenv("ACTION_SPOOL_DRAIN_INTERVAL", "1"))
+ACTION_SPOOL_DRAIN_BATCH = int(os.getenv("ACTION_SPOOL_DRAIN_BATCH", "500"))
+# 같은 파일을 쓰는 워커들의 drainer가 row를 claim한 뒤 보내기까지 허용하는 시간 (지나면 다른 워커가 가져감, 단위: 초)
+ACTION_SPOOL_CLAIM_TTL = float(os.getenv("ACTION_SPOOL_CLAIM_TTL", "120"))
+action_spool = ActionSpool(
+    ACTION_SPOOL_PATH,
+    drain_interval=ACTION_SPOOL_DRAIN_INTERVAL,
+    drain_batch=ACTION_SPOOL_DRAIN_BATCH,
+    claim_ttl=ACTION_SPOOL_CLAIM_TTL,
+)
+
+# /action/batch 이벤트 시각 허용 범위 (단위: 초)
+ACTION_BATCH_MAX_AGE = int(os.getenv("ACTION_BATCH_MAX_AGE", str(7 * 24 * 3600)))
+ACTION_BATCH_MAX_SKEW = int(os.getenv("ACTION_BATCH_MAX_SKEW", "300"))
+
+# users row를 만들어둔 게스트 ID (action마다 DB를 확인하지 않기 위함)
+materialized_guests = TTLCache("materialized_guests", ttl=24 * 3600, maxsize=100_000, sizeof=lambda v: 0)
+# false면 세션 토큰 없이 user_id 쿼리 파라미터만으로도 action API 호출 허용 (구버전 앱 전환 기간용)
+# 토큰을 보내는 앱 버전이 충분히 배포된 뒤에 true로 변경
+SESSION_AUTH_REQUIRED = os.getenv("SESSION_AUTH_REQUIRED", "false").lower() == "true"
+# 토큰 없이 user_id로만 들어온 요청 수 (/metrics의 session, true로 바꿀 시점 판단용)
+# 처음 한 번과 이후 SESSION_FALLBACK_LOG_EVERY번마다 경고 로그
+SESSION_FALLBACK_LOG_EVERY = int(os.getenv("SESSION_FALLBACK_LOG_EVERY", "1000"))
+session_fallback_requests = 0
+
+# /cache/menu 백그라운드 작업 (단위: 개 / 초당 식당 수 / 초)
+# 동시에 처리하는 식당 수와 식당을 처리하기 시작하는 속도를 제한 (둘 다 모든 작업이 함께 나눠 씀)
+# 속도 제한은 작업이 식당마다 직접 토큰을 받는 방식이라, 작업이 시작한 캐시 조회를 같이 기다리는 사용자 요청에는 걸리지 않음
+MENU_CACHE_JOB_CONCURRENCY = int(os.getenv("MENU_CACHE_JOB_CONCURRENCY", "8"))
+MENU_CACHE_JOB_RATE = float(os.getenv("MENU_CACHE_JOB_RATE", "5"))
+MENU_CACHE_JOB_BURST = float(os.getenv("MENU_CACHE_JOB_BURST", "10"))
+MENU_CACHE_JOB_TTL = int(os.getenv("MENU_CACHE_JOB_TTL", "3600"))
+menu_cache_jobs = JobRegistry("menu_cache", ttl=MENU_CACHE_JOB_TTL)
+menu_cache_rate_limit = TokenBucket(MENU_CACHE_JOB_RATE, MENU_CACHE_JOB_BURST)
+menu_cache_job_semaphore = asyncio.Semaphore(MENU_CACHE_JOB_CONCURRENCY)
 
 # --------------------------------------
 # 공통적으로 사용하는 변수, 함수는 이곳에 정리
 # --------------------------------------
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:118.0) Gecko/20100101 Firefox/118.0",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 12_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Linux; Android 10; SM-G973N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.77 Mobile Safari/537.36",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.6 Mobile/15E148 Safari/604.1",
-    "Mozilla/5.0 (iPad; CPU OS 14_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.2478.67",
-]
-
-def fix_encoding(s: str) -> str:
-    try:
-        return s.encode('latin1').decode('utf-8')
-    except:
-        return s
-    
-async def update_menu_cache(place_id: str, menus: List[Dict]):
+# 가격 중앙값을 계산해서 쓰기 큐에 넣음 (같은 가게는 window 안에서 마지막 값만 반영)
+def update_menu_cache(place_id: str, menus: List[Dict]):
     prices = [m["menu_price"] for m in menus if m.get("menu_price", 0) > 5000]
     if prices:
         median_price = int(statistics.median(prices))
-        supabase.table("menu_cache").upsert({
+        write_queue.submit("menu_cache", place_id, {
             "place_id": place_id,
             "median_price": median_price
-        }).execute()
+        })
 
-def _extract_array_after_pos(html: str, pos: int) -> str | None:
-    br = html.find('[', pos)
-    if br == -1:
-        return None
-    depth = 0
-    in_str = False
-    esc = False
-    for i in range(br, len(html)):
-        ch = html[i]
-        if in_str:
-            if esc:
-                esc = False
-            elif ch == '\\':
-                esc = True
-            elif ch == '"':
-                in_str = False
-            continue
-        else:
-            if ch == '"':
-                in_str = True
-                continue
-            if ch == '[':
-                depth += 1
-            elif ch == ']':
-                depth -= 1
-                if depth == 0:
-                    return html[br:i+1]
-    return None
-
-def _find_business_hours_array(html: str):
-    m = re.search(r'"newBusinessHours\([^)]*\)"\s*:\s*\[', html)
-    if m:
-        arr_str = _extract_array_after_pos(html, m.start())
-        if arr_str:
-            try:
-                arr = json.loads(arr_str)
-                for obj in arr:
-                    if isinstance(obj, dict) and isinstance(obj.get("businessHours"), list):
-                        return obj["businessHours"]
-            except Exception:
-                pass
-
-    for mm in re.finditer(r'"businessHours"\s*:\s*\[', html):
-        arr_str = _extract_array_after_pos(html, mm.start())
-        if not arr_str:
-            continue
-        try:
-            arr = json.loads(arr_str)
-        except Exception:
-            continue
-        if (
-            isinstance(arr, list) and arr and isinstance(arr[0], dict)
-            and "day" in arr[0] and "businessHours" in arr[0]
-        ):
-            return arr
-    return None
-
-def sort_business_hours(bh_list: list) -> list:
-    weekday_order = ["월", "화", "수", "목", "금", "토", "일"]
-    def get_index(item):
-        day = item.get("day")
-        if day == "매일":
-            return -1
-        try:
-            return weekday_order.index(day)
-        except ValueError:
-            return 100
-    return sorted(bh_list, key=get_index)
-
-async def fetch_business_hours(business_id: str):
-    url = f"https://pcmap.place.naver.com/restaurant/{business_id}/home"
-
-    headers = {
-            "authority": "pcmap.place.naver.com",
-            "method": "GET",
-            "scheme": "https",
-            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-            "User-Agent": random.choice(USER_AGENTS),
-            "Referer": url,
-            "Accept-Language": "ko-KR,ko;q=0.9",
-            "Connection": "keep-alive",
-            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-            "sec-ch-ua-platform-version": '"19.0.0"',
-            "sec-fetch-dest": "document",
-            "sec-fetch-mode": "navigate",
-            "sec-fetch-site": "same-origin",
-            "sec-fetch-user": "?1",
-    }
+async def write_menu_cache(rows: List[Dict]):
+    await db.execute(supabase.table("menu_cache").upsert(rows))
+
+# 같은 window 안에 로그인한 사용자들은 가장 늦은 시각 하나로 묶어서 update (id 목록은 URL 길이 때문에 나눠서)
+async def write_last_active_at(values: List[tuple]):
+    latest = max(ts for _, ts in values)
+    user_ids = [user_id for user_id, _ in values]
+    for i in range(0, len(user_ids), 100):
+        await db.execute(supabase.table("users").update({"last_active_at": latest})\
+            .in_("id", user_ids[i:i + 100]))
+
+write_queue.register("menu_cache", write_menu_cache)
+write_queue.register("last_active_at", write_last_active_at)
+
+# 영업시간이 비어있으면 짧게만 캐싱 (요청 실패는 예외라서 캐싱되지 않음)
+def _hours_ttl(hours: list) -> int:
+    return HOURS_CACHE_TTL if hours else HOURS_CACHE_EMPTY_TTL
+
+async def get_cached_business_hours(business_id: str):
+    return await hours_cache.get_or_load(
+        business_id,
+        lambda: load_business_hours(business_id),
+        ttl=_hours_ttl,
+    )
 
-    async with httpx.AsyncClient(timeout=20) as client:
+# business_hours_interval 전체를 읽어서 인덱스 교체 (filldata/fill_business_hours.py가 채움)
+async def load_open_hours_index():
+    batch_size = 1000
+    offset = 0
+    rows = []
+    while True:
+        res = await db.execute(supabase.table("business_hours_interval")\
+            .select("place_id, start_minute, end_minute")\
+            .order("id")\
+            .range(offset, offset + batch_size - 1))
+        if not res.data:
+            break
+        rows.extend(res.data)
+        if len(res.data) < batch_size:
+            break
+        offset += batch_size
+    open_hours_index.load(rows)
+
+async def refresh_open_hours_index_forever():
+    while True:
         try:
-            r = await client.get(url, headers=headers)
-            r.raise_for_status()
-        except Exception:
-            return []
-    try:
-        r = requests.get(url, headers=headers, timeout=20)
-        r.raise_for_status()
-    except Exception:
-        return []  # 요청 실패 시 빈 리스트 반환
-
-    html = r.text
-    bh_list = _find_business_hours_array(html)
-    if not bh_list:
-        return []  # businessHours 없으면 빈 리스트 반환
+            await load_open_hours_index()
+        except Exception as e:
+            print(f"[ERROR] open_hours_index 갱신 실패: {e}")
+        await asyncio.sleep(OPEN_HOURS_REFRESH_INTERVAL)
 
-    results = []
-    for info in bh_list:
-        if not isinstance(info, dict):
-            continue
-        bh = info.get("businessHours") or {}
-        last_orders = []
-        for lo in info.get("lastOrderTimes") or []:
-            if isinstance(lo, dict) and "time" in lo:
-                last_orders.append(lo["time"])
-        results.append({
-            "day": fix_encoding(info.get("day")),
-            "start": bh.get("start"),
-            "end": bh.get("end"),
-            "lastOrder": last_orders
-        })
+# distinct_category_groups 전체를 읽어서 카탈로그 교체 (classify 스크립트 실행 후 무효화 API로도 호출됨)
+async def load_category_catalog():
+    res = await db.execute(supabase.table("distinct_category_groups").select("category_group, category_type"))
+    if res.data is None:
+        raise RuntimeError("distinct_category_groups 조회 실패")
+    category_catalog.load(res.data, CATEGORY_TYPES)
 
-    return sort_business_hours(results)
+async def refresh_category_catalog():
+    try:
+        await load_category_catalog()
+    except Exception as e:
+        print(f"[ERROR] category_catalog 갱신 실패: {e}")
+
+async def refresh_category_catalog_forever():
+    while True:
+        await asyncio.sleep(CATEGORY_REFRESH_INTERVAL)
+        await refresh_category_catalog()
+
+# 카테고리 목록 응답, 시작 시 적재에 실패했으면 이때 다시 시도
+async def category_response(request: Request, category_type: str):
+    if not category_catalog.ready:
+        await refresh_category_catalog()
+        if not category_catalog.ready:
+            return {"error": "Supabase 조회 실패"}
 
-# -------------------------------
-# restaurant API
-# -------------------------------
-# 식당 상세정보 조회
-@app.get("/restaurant/{place_id}")
-async def get_restaurant_detail_async(
-    place_id: str = Path(..., description="가게 고유 ID")
-) -> Dict:
+    etag, body = category_catalog.get(category_type)
+    return etag_response(request, body, etag)
 
-    # restaurant 단일 조회 (순차)
-    res = supabase.table("restaurant").select("*").eq("place_id", place_id).single().execute()
-    if res.data is None:
-        return {"error": "해당 place_id가 존재하지 않습니다."}
+# 식당 상세정보 조회 (restaurant, menu, menu_board, keywords)
+# 기존 방식: PostgREST 4번 호출 (restaurant 조회 후 나머지 3개 동시 실행)
+async def load_restaurant_detail_gather(place_id: str) -> Optional[Dict]:
+    # restaurant 단일 조회 (순차), 없으면 None (RPC 방식과 같게 예외 대신 None)
+    # maybe_single()은 row가 없으면 버전에 따라 응답 대신 None을 돌려줌
+    res = await db.execute(supabase.table("restaurant").select("*").eq("place_id", place_id).maybe_single())
+    if res is None or res.data is None:
+        return None
     restaurant = res.data
 
-    # 동기 함수를 스레드에서 동시에 실행하도록 준비 (코루틴 객체)
-    menu_task = asyncio.to_thread(lambda: supabase.rpc("get_menu_data", {"p_place_id": place_id}).execute())
+    # 나머지 쿼리는 DB 스레드풀에서 동시에 실행
+    menu_task = db.execute(supabase.rpc("get_menu_data", {"p_place_id": place_id}))
 
-    menu_board_task = asyncio.to_thread(lambda: supabase.table("menu_board")
-                                        .select("image_url")
-                                        .eq("place_id", place_id)
-                                        .execute())
+    menu_board_task = db.execute(supabase.table("menu_board")
+                                 .select("image_url")
+                                 .eq("place_id", place_id))
 
-    keyword_task = asyncio.to_thread(lambda: supabase.table("place_keyword")
-                                    .select("keywords")
-                                    .eq("place_id", place_id)
-                                    .single()
-                                    .execute())
+    keyword_task = db.execute(supabase.table("place_keyword")
+                              .select("keywords")
+                              .eq("place_id", place_id)
+                              .limit(1)
+                              .maybe_single())
 
     # 동시에 실행
     menu_res, menu_board_res, keyword_res = await asyncio.gather(
@@ -228,7 +375,7 @@ async def get_restaurant_detail_async(
 
     menu = menu_res.data if menu_res.data else []
     menu_board = menu_board_res.data if menu_board_res.data else []
-    keywords = keyword_res.data["keywords"] if keyword_res.data else []
+    keywords = keyword_res.data["keywords"] if keyword_res is not None and keyword_res.data else []
 
     return {
         "restaurant": restaurant,
@@ -237,34 +384,373 @@ async def get_restaurant_detail_async(
         "keywords": keywords
     }
 
+# RPC 방식: get_restaurant_detail 함수(sql/get_restaurant_detail.sql) 한 번으로 전체 문서 조회
+async def load_restaurant_detail_rpc(place_id: str) -> Optional[Dict]:
+    res = await db.execute(supabase.rpc("get_restaurant_detail", {"p_place_id": place_id}))
+    return res.data or None
+
+async def load_restaurant_detail(place_id: str) -> Optional[Dict]:
+    if DETAIL_RPC_ENABLED:
+        return await load_restaurant_detail_rpc(place_id)
+    return await load_restaurant_detail_gather(place_id)
+
+# 상세정보를 직렬화해서 (ETag, 본문 bytes)로 캐싱, 없는 place_id는 캐싱하지 않음
+async def build_restaurant_detail_document(place_id: str):
+    detail = await load_restaurant_detail(place_id)
+    if detail is None:
+        return None
+    body = json.dumps(detail, ensure_ascii=False, default=str).encode("utf-8")
+    return make_etag(body), body
+
+def _detail_ttl(doc) -> int:
+    return DETAIL_CACHE_TTL if doc is not None else 0
+
+# 크롤러/filldata upsert 후 호출되는 무효화 hook (이 프로세스의 캐시만 비움, 다른 워커는 DETAIL_CACHE_TTL 뒤 만료)
+def invalidate_restaurant_detail(place_ids: List[str]) -> int:
+    return sum(detail_cache.invalidate(pid) for pid in place_ids)
+
+# category -> category_group 매핑 (classify 스크립트가 채우는 category_groups 테이블)
+async def load_category_group_map() -> Dict[str, str]:
+    batch_size = 1000
+    offset = 0
+    mapping = {}
+    while True:
+        res = await db.execute(supabase.table("category_groups")\
+            .select("category, category_group")\
+            .order("id")\
+            .range(offset, offset + batch_size - 1))
+        if not res.data:
+            break
+        for row in res.data:
+            mapping[row["category"]] = row["category_group"]
+        if len(res.data) < batch_size:
+            break
+        offset += batch_size
+    return mapping
+
+# since가 있으면 updated_at이 그 이후인 row만 가져옴
+async def fetch_geo_rows(table: str, columns: str, since: Optional[str] = None) -> List[Dict]:
+    batch_size = 1000
+    offset = 0
+    rows = []
+    while True:
+        query = supabase.table(table).select(columns)
+        if since:
+            query = query.gt("updated_at", since)
+        res = await db.execute(query.order("place_id").range(offset, offset + batch_size - 1))
+        if not res.data:
+            break
+        rows.extend(res.data)
+        if len(res.data) < batch_size:
+            break
+        offset += batch_size
+    return rows
+
+async def refresh_geo_indexes(full: bool):
+    category_map = await load_category_group_map()
+    for index, table, columns in (
+        (restaurant_index, "restaurant", RESTAURANT_INDEX_COLUMNS),
+        (activity_index, "activity", ACTIVITY_INDEX_COLUMNS),
+    ):
+        rows = await fetch_geo_rows(table, columns, None if full else index.watermark)
+        for r in rows:
+            r["category_group"] = category_map.get(r.get("category"))
+
+        # 배열 재구성은 CPU 작업이라 이벤트 루프 밖에서 실행
+        if full:
+            await asyncio.to_thread(index.replace, rows)
+        elif rows:
+            await asyncio.to_thread(index.upsert, rows)
+
+async def refresh_geo_indexes_forever():
+    last_full = None
+    while True:
+        try:
+            full = last_full is None or time.monotonic() - last_full >= GEO_INDEX_FULL_RELOAD_INTERVAL
+            await refresh_geo_indexes(full)
+            if full:
+                last_full = time.monotonic()
+        except Exception as e:
+            print(f"[ERROR] geo_index 갱신 실패: {e}")
+        await asyncio.sleep(GEO_INDEX_REFRESH_INTERVAL)
+
+# 주변 식당 조회: 인덱스가 준비돼 있으면 메모리에서, 아니면 get_restaurants RPC
+async def find_nearby_restaurants(
+    lat: float, lng: float, radius: int, category_group: Optional[str] = None
+) -> Optional[List[Dict]]:
+    if GEO_INDEX_ENABLED and restaurant_index.ready:
+        return restaurant_index.query(lat, lng, radius, category_group)
+
+    # get_restaurants() 함수를 RPC로 호출
+    response = await db.execute(supabase.rpc(
+        "get_restaurants",
+        {
+            "p_lat": lat,
+            "p_lng": lng,
+            "p_category_group": category_group,
+            "p_radius": radius
+        }
+    ))
+    return response.data
+
+# 타일 캐시는 인덱스가 준비된 경우에만 사용
+# get_restaurants RPC 결과에는 좌표가 없어서 타일 안에서 다시 거를 수 없음 (모든 타일이 캐시를 우회)
+def tile_cache_active() -> bool:
+    return TILE_CACHE_ENABLED and GEO_INDEX_ENABLED and restaurant_index.ready
+
+# 타일 캐시를 거친 주변 식당 조회 (근처 사용자끼리 같은 타일 결과를 공유)
+async def get_nearby_restaurants(
+    lat: float, lng: float, radius: int, category_group: Optional[str] = None
+) -> Optional[List[Dict]]:
+    if not tile_cache_active():
+        return await find_nearby_restaurants(lat, lng, radius, category_group)
+    return await nearby_cache.query(find_nearby_restaurants, lat, lng, radius, category_group)
+
+# 한 페이지만 조회 → (rows, 다음 커서), 인덱스/타일 캐시에서는 해당 페이지만 dict로 만듦
+async def get_nearby_restaurants_page(
+    lat: float, lng: float, radius: int, category_group: Optional[str], page: PageRequest
+):
+    if tile_cache_active():
+        return await nearby_cache.query_page(find_nearby_restaurants, lat, lng, radius, category_group, page)
+    if GEO_INDEX_ENABLED and restaurant_index.ready:
+        return restaurant_index.query_page(lat, lng, radius, category_group, page)
+
+    restaurants = await find_nearby_restaurants(lat, lng, radius, category_group)
+    return None if restaurants is None else paginate(restaurants, page)
+
+def count_session_fallback(user_id: str):
+    global session_fallback_requests
+    session_fallback_requests += 1
+    if session_fallback_requests == 1 or session_fallback_requests % SESSION_FALLBACK_LOG_EVERY == 0:
+        print(f"[WARN] 세션 토큰 없이 user_id로 인증된 요청 누적 {session_fallback_requests}건 (최근: {user_id})")
+
+# Authorization: Bearer <세션 토큰>을 서명만으로 검증 (users 조회 없음)
+# user_id 쿼리 파라미터를 같이 보내면 토큰의 사용자와 같아야 함
+async def current_session(
+    authorization: Optional[str] = Header(None, description="Bearer <세션 토큰>"),
+    user_id: Optional[str] = Query(None, description="사용자 ID (토큰이 있으면 생략 가능)"),
+) -> Session:
+    token = bearer_token(authorization)
+    if token is None:
+        if not SESSION_AUTH_REQUIRED and user_id:
+            count_session_fallback(user_id)
+            return Session(user_id=user_id, is_guest=False, expires_at=0, from_query=True)
+        raise HTTPException(status_code=401, detail="세션 토큰이 필요합니다", headers={"WWW-Authenticate": "Bearer"})
+
+    try:
+        session = verify_token(token)
+    except InvalidSession as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+    if user_id and user_id != session.user_id:
+        raise HTTPException(status_code=403, detail="토큰의 사용자와 user_id가 다릅니다")
+    return session
+
+# 게스트 토큰이 해당 guest_id의 것인지 확인
+def owns_guest(authorization: Optional[str], guest_id: str) -> bool:
+    token = bearer_token(authorization)
+    if token is None:
+        return False
+    try:
+        session = verify_token(token)
+    except InvalidSession:
+        return False
+    return session.is_guest and session.user_id == guest_id
+
+# 게스트의 첫 action 기록 전에 users row 생성 (이미 만든 게스트는 메모리에서 확인하고 넘어감)
+# 토큰 없이 user_id만 보낸 구버전 앱은 게스트인지 알 수 없어서 row가 없을 때만 게스트로 생성 (회원은 이미 row가 있어서 그대로)
+async def ensure_guest_user(session: Session):
+    if not (session.is_guest or session.from_query):
+        return
+    await materialized_guests.get_or_load(session.user_id, lambda: materialize_guest(session.user_id))
+
+async def materialize_guest(user_id: str) -> bool:
+    now = datetime.now(KST).isoformat()
+    # 이미 있으면(다른 워커가 먼저 만들었거나 회원 전환된 경우) 그대로 둠
+    await db.execute(supabase.table("users").upsert(
+        {"id": user_id, "is_guest": True, "created_at": now, "last_active_at": now},
+        on_conflict="id",
+        ignore_duplicates=True,
+    ))
+    return True
+
+# 기존 방식: (user_id, place_id) 조회 후 update 또는 insert (ACTION_WRITE_BEHIND_ENABLED=false)
+async def record_action_direct(kind: str, user_id: str, place_id: str, action_type: str):
+    table = ACTION_TABLES[kind]
+    action_column = COUNTERS.get(action_type, "feedback")
+
+    res = await db.execute(supabase.table(table)\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .eq("place_id", place_id)\
+                .maybe_single())
+
+    if res is not None and res.data is not None:
+        # view, click은 count를 1씩 증가
+        if action_type in COUNTERS:
+            await db.execute(supabase.table(table).update({
+                action_column: res.data[action_column] + 1,
+                "updated_at": datetime.now(KST).isoformat(),
+            }).eq("user_id", user_id).eq("place_id", place_id))
+
+        # like, dislike는 상태를 업데이트
+        else:
+            await db.execute(supabase.table(table).update({
+                action_column: action_type,
+                "updated_at": datetime.now(KST).isoformat(),
+            }).eq("user_id", user_id).eq("place_id", place_id))
+    else:
+        new_data = {
+            "user_id": user_id,
+            "place_id": place_id,
+            "view_count": 0,
+            "click_count": 0,
+            "feedback": None,
+            "updated_at": datetime.now(KST).isoformat()
+        }
+        if action_type in COUNTERS:
+            new_data[action_column] = 1
+        else:
+            new_data["feedback"] = action_type
+
+        await db.execute(supabase.table(table).insert(new_data))
+
+# 집계기가 모아둔 증가분을 record_actions RPC(sql/record_actions.sql) 한 번으로 반영
+async def flush_actions(rows: Dict[str, List[Dict]]):
+    await db.execute(supabase.rpc("record_actions", {
+        "p_restaurant": rows["restaurant"],
+        "p_activity": rows["activity"],
+    }))
+
+# spool에 쌓인 이벤트를 record_action_events RPC(sql/record_action_events.sql)로 반영, event_id 기준 멱등
+async def ship_action_events(rows: List[Dict]):
+    await db.execute(supabase.rpc("record_action_events", {"p_events": rows}))
+
+# (kind, user_id, place_id, action_type, ts) 목록 → record_action_events RPC 인자 (event_id가 없으면 새로 발급)
+def event_rows(events: List[tuple], event_ids: List[Optional[str]]) -> List[Dict]:
+    return [{
+        "event_id": event_id or uuid.uuid4().hex,
+        "kind": kind,
+        "user_id": user_id,
+        "place_id": place_id,
+        "action_type": action_type,
+        "ts": ts.isoformat(),
+    } for (kind, user_id, place_id, action_type, ts), event_id in zip(events, event_ids)]
+
+# 반영 경로: spool > write-behind 집계기 > 직접 조회/수정
+async def record_action(kind: str, session: Session, place_id: str, action_type: str):
+    if action_type not in ACTION_TYPES:
+        raise HTTPException(status_code=400, detail="잘못된 action_type 입니다")
+
+    await ensure_guest_user(session)
+    if ACTION_SPOOL_ENABLED:
+        await action_spool.append([(kind, session.user_id, place_id, action_type, datetime.now(KST))])
+    elif ACTION_WRITE_BEHIND_ENABLED:
+        action_aggregator.add(kind, session.user_id, place_id, action_type)
+    else:
+        await record_action_direct(kind, session.user_id, place_id, action_type)
+
+# -------------------------------
+# restaurant API
+# -------------------------------
+# 식당 상세정보 조회
+@app.get("/restaurant/{place_id}")
+async def get_restaurant_detail_async(
+    request: Request,
+    place_id: str = Path(..., description="가게 고유 ID")
+):
+    doc = await detail_cache.get_or_load(
+        place_id,
+        lambda: build_restaurant_detail_document(place_id),
+        ttl=_detail_ttl,
+    )
+    if doc is None:
+        return {"error": "해당 place_id가 존재하지 않습니다."}
+
+    etag, body = doc
+    return etag_response(request, body, etag)
+
 @app.get("/restaurant/{business_id}/hours", response_model=List[Dict])
 async def get_business_hours(
     business_id: str = Path(..., description="네이버 플레이스 가게 고유 ID")
 ):
-    return await fetch_business_hours(business_id)
+    try:
+        return await get_cached_business_hours(business_id)
+    except Exception:
+        return []  # 요청 실패 시 빈 리스트 반환
+
+# 여러 가게의 영업시간을 한 번에 조회 (목록 화면의 영업중 배지용)
+@app.post("/restaurants/hours", response_model=BusinessHoursBatchResponse)
+async def get_business_hours_batch(req: BusinessHoursBatchRequest):
+    business_ids = list(dict.fromkeys(req.business_ids))  # 순서 유지 중복 제거
+    semaphore = asyncio.Semaphore(HOURS_BATCH_CONCURRENCY)
+
+    async def fetch_one(business_id: str):
+        async with semaphore:
+            return await get_cached_business_hours(business_id)
+
+    results = await asyncio.gather(
+        *(fetch_one(bid) for bid in business_ids), return_exceptions=True
+    )
+
+    hours, failed = {}, []
+    for business_id, result in zip(business_ids, results):
+        if isinstance(result, BaseException):
+            print(f"[ERROR] business_hours {business_id}: {result}")
+            failed.append(business_id)
+        else:
+            hours[business_id] = result
+
+    return BusinessHoursBatchResponse(hours=hours, failed=failed)
     
 @app.get("/restaurants", response_model=List[Dict])
-def search_restaurants(
+async def search_restaurants(
+    response: Response,
     lat: float = Query(..., description="사용자 위도"),
     lng: float = Query(..., description="사용자 경도"),
     category_group: Optional[str] = Query(None, description="대분류 카테고리, 없으면 전체 조회"),
-    radius: int = Query(5000, description="반경(m), 기본 5km")
+    radius: int = Query(5000, description="반경(m), 기본 5km"),
+    open_now: bool = Query(False, description="현재(KST) 영업중인 식당만 조회"),
+    open_at: Optional[datetime] = Query(None, description="해당 시각에 영업중인 식당만 조회 (ISO 8601, 시간대 없으면 KST)"),
+    limit: Optional[int] = Query(None, ge=1, le=RESTAURANTS_MAX_LIMIT, description="페이지 크기, 없으면 전체"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    fields: Optional[str] = Query(None, description="응답에 포함할 컬럼 (쉼표 구분, 예: place_id,place_name,distance)"),
 ):
-    # get_restaurants() 함수를 RPC로 호출
-    response = supabase.rpc(
-        "get_restaurants",
-        {
-            "p_lat": lat,
-            "p_lng": lng,
-            "p_category_group": category_group,
-            "p_radius": radius
-        }
-    ).execute()
+    # 페이지/필드 지정이 있으면 (distance, place_id) 순으로 한 페이지만 만들어서 응답
+    if limit is not None or cursor is not None or fields is not None:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+        keep = None
+        if open_now or open_at is not None:
+            minute = minute_of_week(open_at)
+            keep = lambda r: open_hours_index.is_open(str(r.get("place_id")), minute)
+
+        page = PageRequest(limit=limit, after=after, fields=parse_fields(fields), keep=keep)
+        result = await get_nearby_restaurants_page(lat, lng, radius, category_group, page)
+        if result is None:
+            return {"error": "Supabase RPC 호출 실패"}
+
+        restaurants, next_cursor = result
+        # Response를 직접 반환하는 빠른 모드에서도 헤더가 유지되도록 양쪽에 설정
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        if headers:
+            response.headers.update(headers)
+        return list_response(restaurants, headers)
 
-    if response.data is None:
+    restaurants = await get_nearby_restaurants(lat, lng, radius, category_group)
+
+    if restaurants is None:
         return {"error": "Supabase RPC 호출 실패"}
 
-    return response.data
+    # 영업중 필터는 메모리 인덱스로만 처리 (영업시간 정보가 없는 식당은 제외)
+    if open_now or open_at is not None:
+        minute = minute_of_week(open_at)
+        return list_response([r for r in restaurants if open_hours_index.is_open(str(r.get("place_id")), minute)])
+
+    return list_response(restaurants)
 
 # -------------------------------
 # MENU API
@@ -274,8 +760,8 @@ def search_restaurants(
 async def get_menu(business_id: str = Query(..., description="네이버 플레이스 business_id")):
     
     # place_id, booking_id, naverorder_id는 DB에서 조회
-    res = supabase.table("restaurant").select("place_id, booking_id, naverorder_id")\
-        .eq("place_id", business_id).single().execute()
+    res = await db.execute(supabase.table("restaurant").select("place_id, booking_id, naverorder_id")\
+        .eq("place_id", business_id).single())
 
     if res.data is None:
         return {"error": "해당 place_id가 존재하지 않습니다."}
@@ -288,9 +774,9 @@ async def get_menu(business_id: str = Query(..., description="네이버 플레
     menus = await fetch_menu_for_place(place_id, booking_id, naverorder_id)
 
     # median_price를 계산, 캐싱
-    await update_menu_cache(place_id, menus)
+    update_menu_cache(place_id, menus)
 
-    return menus
+    return list_response(menus)
 
 # menuGroups Graphql에서 메뉴 받아오기
 @app.get("/menu/menuGroups", response_model=List[Dict])
@@ -299,169 +785,207 @@ async def get_menu_groups(place_id: str = Query(..., description="네이버 플
     menus = await fetch_menu_groups_for_place(place_id)
 
     # median_price를 계산, 캐싱
-    await update_menu_cache(place_id, menus)
-
-    return menus
-
-# booking_id, naverorder_id가 있는 place를 menu_cache에 캐싱
-@app.get("/cache/menu")
-async def cache_menus(
-    lat: float = Query(..., description="사용자 위도"),
-    lng: float = Query(..., description="사용자 경도"),
-    radius: int = Query(5000, description="검색 반경(m)")
-):
+    update_menu_cache(place_id, menus)
+
+    return list_response(menus)
+
+# place_id -> menu_cache.updated_at (URL 길이 때문에 나눠서 조회)
+async def load_menu_cache_dates(place_ids: List[str]) -> Dict[str, str]:
+    dates = {}
+    for i in range(0, len(place_ids), 100):
+        res = await db.execute(supabase.table("menu_cache").select("place_id, updated_at")\
+            .in_("place_id", place_ids[i:i + 100]))
+        for row in res.data or []:
+            dates[str(row["place_id"])] = row["updated_at"]
+    return dates
+
+# 식당 하나의 메뉴를 조회해서 가격 중앙값 저장, 저장했으면 True (메뉴/가격이 없으면 False)
+async def cache_restaurant_menu(r: Dict, today_kst_str: str) -> bool:
+    place_id = r["place_id"]
+
+    # 메뉴 조회
+    menus = await fetch_menu_for_place(place_id, r.get("booking_id"), r.get("naverorder_id"))
+    if not menus:
+        menus = await fetch_menu_groups_for_place(place_id)
+
+    # 가격 중앙값 계산 후 저장
+    prices = [m["menu_price"] for m in menus if m.get("menu_price")]
+    if not prices:
+        return False
+    prices.sort()
+    median_price = prices[len(prices) // 2]
+
+    print(f"[UPSERT] {place_id}, median={median_price}, date={today_kst_str}")
+    await db.execute(supabase.table("menu_cache").upsert({
+        "place_id": place_id,
+        "median_price": median_price,
+        "updated_at": today_kst_str
+    }))
+    return True
+
+# 주변 식당 메뉴 캐싱 작업 본문 (동시 처리 수와 Naver 호출 속도를 제한해서 실행)
+async def run_menu_cache_job(job: Job, lat: float, lng: float, radius: int):
     # 1. 주변 식당 조회
-    res = supabase.rpc("get_restaurants", {
-        "p_lat": lat,
-        "p_lng": lng,
-        "p_radius": radius
-    }).execute()
-    restaurants = res.data or []
+    restaurants = await get_nearby_restaurants(lat, lng, radius) or []
 
     # 2. 대상 필터링
     targets = [
         r for r in restaurants
         if r.get("booking_id") and r.get("naverorder_id")
     ]
+    job.total = len(targets)
     if not targets:
-        return {"message": "캐싱할 대상 식당이 없습니다."}
+        return
 
     # 오늘 날짜(KST)
     today_kst_str = datetime.now(KST).strftime("%Y-%m-%d")
 
-    async def process_restaurant(r):
-        try:
-            place_id = r["place_id"]
+    # 이미 오늘 저장된 식당은 건너뜀 (기존 캐시는 한 번에 조회)
+    cached_dates = await load_menu_cache_dates([str(r["place_id"]) for r in targets])
+    pending = []
+    for r in targets:
+        if cached_dates.get(str(r["place_id"])) == today_kst_str:
+            job.skipped += 1
+        else:
+            pending.append(r)
 
-            # 기존 캐시 확인
-            existing = supabase.table("menu_cache").select("updated_at").eq("place_id", place_id).execute()
-            existing_date = existing.data[0]["updated_at"] if existing.data else None
+    async def process_restaurant(r):
+        async with menu_cache_job_semaphore:
+            await menu_cache_rate_limit.acquire()
+            try:
+                cached = await cache_restaurant_menu(r, today_kst_str)
+            except Exception as e:
+                print(f"[ERROR] {r.get('place_id')}: {e}")
+                job.failed += 1
+                return
+            if cached:
+                job.done += 1
+            else:
+                job.skipped += 1
 
-            if existing_date == today_kst_str:
-                return  # 이미 오늘 저장됨
+    await asyncio.gather(*(process_restaurant(r) for r in pending))
 
-            # 메뉴 조회
-            menus = await fetch_menu_for_place(place_id, r.get("booking_id"), r.get("naverorder_id"))
-            if not menus:
-                menus = await fetch_menu_groups_for_place(place_id)
+    print(f"[INFO] menu_cache 작업 {job.id} 완료: done={job.done}, failed={job.failed}, skipped={job.skipped}")
 
-            # 가격 중앙값 계산 후 저장
-            prices = [m["menu_price"] for m in menus if m.get("menu_price")]
-            if prices:
-                prices.sort()
-                median_price = prices[len(prices) // 2]
+# booking_id, naverorder_id가 있는 place를 menu_cache에 캐싱
+# 작업만 등록하고 바로 job_id를 응답, 진행 상황은 GET /cache/menu/{job_id}로 조회
+@app.post("/cache/menu")
+async def cache_menus(
+    lat: float = Query(..., description="사용자 위도"),
+    lng: float = Query(..., description="사용자 경도"),
+    radius: int = Query(5000, description="검색 반경(m)")
+):
+    job = menu_cache_jobs.start(
+        "menu_cache",
+        {"lat": lat, "lng": lng, "radius": radius},
+        lambda job: run_menu_cache_job(job, lat, lng, radius),
+    )
+    return JSONResponse(
+        status_code=202,
+        content={**job.to_dict(), "status_url": f"/cache/menu/{job.id}"},
+        headers={"Location": f"/cache/menu/{job.id}"},
+    )
 
-                print(f"[UPSERT] {place_id}, median={median_price}, date={today_kst_str}")
-                supabase.table("menu_cache").upsert({
-                    "place_id": place_id,
-                    "median_price": median_price,
-                    "updated_at": today_kst_str
-                }).execute()
+# 메뉴 캐싱 작업 진행 상황 (대상 수, 완료/실패/건너뜀 수)
+@app.get("/cache/menu/{job_id}")
+async def get_cache_menu_job(job_id: str = Path(..., description="POST /cache/menu가 돌려준 job_id")):
+    job = menu_cache_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다 (만료되었거나 다른 워커에서 만든 작업)")
+    return job.to_dict()
+
+# 크롤러/filldata에서 upsert 후 호출 → 해당 식당 상세 캐시 삭제
+@app.post("/cache/restaurant/invalidate")
+async def invalidate_restaurant_cache(
+    req: CacheInvalidateRequest,
+    x_cache_token: Optional[str] = Header(None, description="캐시 무효화 토큰")
+):
+    if not CACHE_INVALIDATION_TOKEN or x_cache_token != CACHE_INVALIDATION_TOKEN:
+        raise HTTPException(status_code=403, detail="캐시 무효화 권한이 없습니다")
 
-        except Exception as e:
-            print(f"[ERROR] {r.get('place_id')}: {e}")
+    invalidated = invalidate_restaurant_detail(req.place_ids)
+    return {"invalidated": invalidated}
 
-    # 병렬 실행
-    await asyncio.gather(*(process_restaurant(r) for r in targets))
+# classify 스크립트 실행 후 호출 → 카테고리 카탈로그 다시 적재
+@app.post("/cache/category/invalidate")
+async def invalidate_category_cache(
+    x_cache_token: Optional[str] = Header(None, description="캐시 무효화 토큰")
+):
+    if not CACHE_INVALIDATION_TOKEN or x_cache_token != CACHE_INVALIDATION_TOKEN:
+        raise HTTPException(status_code=403, detail="캐시 무효화 권한이 없습니다")
 
-    return {"message": f"{len(targets)}개 식당 캐싱 완료"}
+    await load_category_catalog()
+    return category_catalog.stats()
 
 # -------------------------------
 # CATEGORY API
 # -------------------------------
 # "맛집" 카테고리 출력
 @app.get("/category/restaurant", response_model=List[Dict])
-async def get_restaurant_categories():
-    try:
-        category_res = supabase.table("distinct_category_groups").select("category_group").eq("category_type", "food").execute()
-
-        if category_res.data is None:
-            return {"error": "Supabase 조회 실패"}
-
-        categories = [row["category_group"] for row in category_res.data if row["category_group"]]
-        
-        # "기타"는 맨 뒤로 정렬
-        categories_sorted = sorted(
-            [c for c in categories if c != "기타"]
-        ) + (["기타"] if "기타" in categories else [])
-
-        return [{"category_group": c} for c in categories_sorted]
+async def get_restaurant_categories(request: Request):
+    return await category_response(request, "food")
 
-    except Exception as e:
-        print(f"[ERROR] get_restaurant_categories: {e}")
-        return {"error": "서버 내부 오류 발생"}
-    
 # "여가" 카테고리 출력
 @app.get("/category/activity", response_model=List[Dict])
-async def get_restaurant_categories():
-    try:
-        category_res = supabase.table("distinct_category_groups").select("category_group").eq("category_type", "leisure").execute()
-
-        if category_res.data is None:
-            return {"error": "Supabase 조회 실패"}
-
-        categories = [row["category_group"] for row in category_res.data if row["category_group"]]
-        
-        # "기타"는 맨 뒤로 정렬
-        categories_sorted = sorted(
-            [c for c in categories if c != "기타"]
-        ) + (["기타"] if "기타" in categories else [])
-
-        return [{"category_group": c} for c in categories_sorted]
+async def get_activity_categories(request: Request):
+    return await category_response(request, "leisure")
 
-    except Exception as e:
-        print(f"[ERROR] get_restaurant_categories: {e}")
-        return {"error": "서버 내부 오류 발생"}
-    
 # -------------------------------
 # AUTH API
 # -------------------------------
-# 게스트 사용자 생성
+# 게스트 토큰 발급 (users row는 첫 action 기록 또는 회원 전환 시점에 생성)
 @app.get("/auth/guest", response_model=Dict)
 async def create_guest_user():
-    try:
-        guest_id = str(uuid.uuid4())
-
-        guest_data = {
-            "id" : guest_id,
-            "is_guest" : True,
-            "last_active_at": datetime.now(KST).isoformat(),
-        }
-
-        res = supabase.table("users").insert(guest_data).execute()
-
-        if not res.data:
-            raise HTTPException(status_code=500, detail="게스트 사용자 생성 실패")
-
-        return {"user_id": guest_id, "is_guest": True}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    guest_id = str(uuid.uuid4())
+    token, expires_at = issue_token(guest_id, is_guest=True)
+    return {
+        "user_id": guest_id,
+        "is_guest": True,
+        "access_token": token,
+        "token_type": "bearer",
+        "expires_at": expires_at,
+    }
 
 # 회원가입
 @app.post("/auth/signup", response_model=SignupResponse)
-async def signup(req: SignupRequest):
+async def signup(
+    req: SignupRequest,
+    authorization: Optional[str] = Header(None, description="Bearer <게스트 세션 토큰> (게스트 전환 시)"),
+):
     try:
-        hashed_pw = hash_password(req.password)
+        hashed_pw = await passwords.hash_password(req.password)
 
         if req.guest_id:  # 게스트 → 회원 전환
-            res = supabase.table("users").update({
+            member_data = {
                 "is_guest": False,
                 "email": req.email,
                 "nickname": req.nickname,
                 "birth": req.birth,
                 "password_hash": hashed_pw,
                 "last_active_at": datetime.now(KST).isoformat(),
-            }).eq("id", req.guest_id).execute()
+            }
+            res = await db.execute(supabase.table("users").update(member_data)\
+                .eq("id", req.guest_id).eq("is_guest", True))
 
             if not res.data:
-                raise HTTPException(status_code=404, detail="해당 게스트가 존재하지 않음")
-            
+                # 아직 users row가 없는 게스트 (action 기록 전) → 본인 게스트 토큰이 있을 때만 새로 생성
+                if not owns_guest(authorization, req.guest_id):
+                    raise HTTPException(status_code=404, detail="해당 게스트가 존재하지 않음")
+
+                res = await db.execute(supabase.table("users").insert({
+                    "id": req.guest_id,
+                    **member_data,
+                    "created_at": datetime.now(KST).isoformat(),
+                }))
+                if not res.data:
+                    raise HTTPException(status_code=500, detail="회원가입 실패")
+
             user_id = req.guest_id
             
         else:  # 일반 신규 가입자
             user_id = str(uuid.uuid4())
 
-            res = supabase.table("users").insert({
+            res = await db.execute(supabase.table("users").insert({
                 "id": user_id,
                 "is_guest": False,
                 "email": req.email,
@@ -470,18 +994,23 @@ async def signup(req: SignupRequest):
                 "password_hash": hashed_pw,
                 "created_at": datetime.now(KST).isoformat(),
                 "last_active_at": datetime.now(KST).isoformat(),
-            }).execute()
+            }))
 
             if not res.data:
                 raise HTTPException(status_code=500, detail="회원가입 실패")
         
+        token, expires_at = issue_token(user_id, is_guest=False)
         return SignupResponse(
             user_id=user_id,
             email=req.email,
             nickname=req.nickname,
             birth=req.birth,
-            is_guest=False
+            is_guest=False,
+            access_token=token,
+            expires_at=expires_at,
         )
+    except (HTTPException, PasswordHashBusy):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -490,29 +1019,40 @@ async def signup(req: SignupRequest):
 async def login(req: LoginRequest):
     try:
         # 1. 유저 조회
-        res = supabase.table("users").select("*").eq("email", req.email).single().execute()
+        res = await db.execute(supabase.table("users").select("*").eq("email", req.email).single())
         if not res.data:
             raise HTTPException(status_code=404, detail="이메일이 존재하지 않음")
 
         user = res.data
 
-        # 2. 비밀번호 검증
-        if not verify_password(req.password, user["password_hash"]):
+        # 2. 비밀번호 검증 (프로세스 풀에서 실행)
+        ok, new_hash = await passwords.verify_password(req.password, user["password_hash"])
+        if not ok:
             raise HTTPException(status_code=401, detail="비밀번호 불일치")
 
-        # 3. 로그인 성공 시 last_active_at 업데이트
-        supabase.table("users").update({
-            "last_active_at": datetime.now(KST).isoformat()
-        }).eq("id", user["id"]).execute()
+        # 3. 로그인 성공 시 last_active_at 업데이트 (백그라운드), cost 설정이 바뀌었으면 해시는 바로 교체
+        now = datetime.now(KST).isoformat()
+        if new_hash:
+            await db.execute(supabase.table("users").update({
+                "password_hash": new_hash,
+                "last_active_at": now,
+            }).eq("id", user["id"]))
+        else:
+            write_queue.submit("last_active_at", user["id"], (user["id"], now))
 
-        # 4. 응답 반환
+        # 4. 세션 토큰 발급 후 응답 반환
+        token, expires_at = issue_token(user["id"], is_guest=user["is_guest"])
         return LoginResponse(
             user_id=user["id"],
             email=user["email"],
             nickname=user["nickname"],
             birth=user["birth"],
             is_guest=user["is_guest"],
+            access_token=token,
+            expires_at=expires_at,
         )
+    except (HTTPException, PasswordHashBusy):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
@@ -522,127 +1062,146 @@ async def login(req: LoginRequest):
 # 식당에 대한 action 기록
 @app.post("/action/restaurant")
 async def record_restaurant_action(
-    user_id: str = Query(..., description="사용자 ID"),
     place_id: str = Query(..., description="식당 ID"),
-    action_type: str = Query(..., description="액션 타입(view, click, like, dislike)")
-):  
+    action_type: str = Query(..., description="액션 타입(view, click, like, dislike)"),
+    session: Session = Depends(current_session),
+):
     try:
-        if action_type == "view":
-            action_column = "view_count"
-        elif action_type == "click":
-            action_column = "click_count"
-        elif action_type == "like":
-            action_column = "feedback"
-        elif action_type == "dislike":
-            action_column = "feedback"
-        else:
-            raise HTTPException(status_code=400, detail="잘못된 action_type 입니다")
-
-        res = supabase.table("user_restaurant_action")\
-                    .select("*")\
-                    .eq("user_id", user_id)\
-                    .eq("place_id", place_id)\
-                    .maybe_single()\
-                    .execute()
-
-        if res is not None and res.data is not None:
-            # view, click은 count를 1씩 증가
-            if action_type in ["view", "click"]:
-                updated_data = supabase.table("user_restaurant_action").update({
-                    action_column: res.data[action_column] + 1,
-                    "updated_at": datetime.now(KST).isoformat(),
-                }).eq("user_id", user_id).eq("place_id", place_id).execute()
-
-            # like, dislike는 상태를 업데이트
-            else:
-                updated_data = supabase.table("user_restaurant_action").update({
-                    action_column: action_type,
-                    "updated_at": datetime.now(KST).isoformat(),
-                }).eq("user_id", user_id).eq("place_id", place_id).execute()
-        else:
-            new_data = {
-                "user_id": user_id,
-                "place_id": place_id,
-                "view_count": 0,
-                "click_count": 0,
-                "feedback": None,
-                "updated_at": datetime.now(KST).isoformat()
-            }
-            if action_type == "view":
-                new_data["view_count"] = 1
-            elif action_type == "click":
-                new_data["click_count"] = 1
-            elif action_type == "like":
-                new_data["feedback"] = "like"
-            elif action_type == "dislike":
-                new_data["feedback"] = "dislike"    
-
-            updated_data = supabase.table("user_restaurant_action").insert(new_data).execute()
-        
+        await record_action("restaurant", session, place_id, action_type)
         return {"message": f"식당 {action_type} 액션이 기록되었습니다."}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
+
 # 여가에 대한 액션 기록
 @app.post("/action/activity")
-async def record_restaurant_action(
-    user_id: str = Query(..., description="사용자 ID"),
+async def record_activity_action(
     place_id: str = Query(..., description="장소 ID"),
-    action_type: str = Query(..., description="액션 타입(view, click, like, dislike)")
-):  
+    action_type: str = Query(..., description="액션 타입(view, click, like, dislike)"),
+    session: Session = Depends(current_session),
+):
     try:
-        if action_type == "view":
-            action_column = "view_count"
-        elif action_type == "click":
-            action_column = "click_count"
-        elif action_type == "like":
-            action_column = "feedback"
-        elif action_type == "dislike":
-            action_column = "feedback"
-        else:
-            raise HTTPException(status_code=400, detail="잘못된 action_type 입니다")
-
-        res = supabase.table("user_activity_action")\
-                    .select("*")\
-                    .eq("user_id", user_id)\
-                    .eq("place_id", place_id)\
-                    .maybe_single()\
-                    .execute()
-
-        if res is not None and res.data is not None:
-            # view, click은 count를 1씩 증가
-            if action_type in ["view", "click"]:
-                updated_data = supabase.table("user_activity_action").update({
-                    action_column: res.data[action_column] + 1,
-                    "updated_at": datetime.now(KST).isoformat(),
-                }).eq("user_id", user_id).eq("place_id", place_id).execute()
-
-            # like, dislike는 상태를 업데이트
-            else:
-                updated_data = supabase.table("user_activity_action").update({
-                    action_column: action_type,
-                    "updated_at": datetime.now(KST).isoformat(),
-                }).eq("user_id", user_id).eq("place_id", place_id).execute()
-        else:
-            new_data = {
-                "user_id": user_id,
-                "place_id": place_id,
-                "view_count": 0,
-                "click_count": 0,
-                "feedback": None,
-                "updated_at": datetime.now(KST).isoformat()
-            }
-            if action_type == "view":
-                new_data["view_count"] = 1
-            elif action_type == "click":
-                new_data["click_count"] = 1
-            elif action_type == "like":
-                new_data["feedback"] = "like"
-            elif action_type == "dislike":
-                new_data["feedback"] = "dislike"    
-
-            updated_data = supabase.table("user_activity_action").insert(new_data).execute()
-        
+        await record_action("activity", session, place_id, action_type)
         return {"message": f"여가 {action_type} 액션이 기록되었습니다."}
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# 여러 action을 한 번에 기록 (목록 화면 노출 등), 이벤트별로 반영/건너뜀/거부 결과를 응답
+# - 거부: 잘못된 kind/action_type/place_id, 허용 범위를 벗어난 ts
+# - 건너뜀: 같은 요청 안의 완전히 같은 이벤트(ts 포함)나 같은 event_id, 같은 장소의 더 최신 like/dislike가 있는 이벤트
+# - event_id가 하나라도 있으면 반영 경로와 관계없이 record_action_events RPC(또는 spool)로 보내서 재전송을 한 번만 반영
+@app.post("/action/batch", response_model=ActionBatchResponse)
+async def record_action_batch(
+    req: ActionBatchRequest,
+    session: Session = Depends(current_session),
+):
+    now = datetime.now(KST)
+    skipped, rejected = [], []
+    accepted = []  # (index, (kind, user_id, place_id, action_type, ts))
+    seen = set()
+    seen_event_ids = set()
+    latest_feedback = {}  # (kind, place_id) -> (ts, index)
+
+    for i, e in enumerate(req.events):
+        ts = now if e.ts is None else (e.ts.astimezone(KST) if e.ts.tzinfo else e.ts.replace(tzinfo=KST))
+        if e.kind not in KINDS:
+            reason = "잘못된 kind 입니다"
+        elif e.action_type not in ACTION_TYPES:
+            reason = "잘못된 action_type 입니다"
+        elif not e.place_id.strip():
+            reason = "place_id가 비어 있습니다"
+        elif (ts - now).total_seconds() > ACTION_BATCH_MAX_SKEW:
+            reason = "미래 시각의 이벤트입니다"
+        elif (now - ts).total_seconds() > ACTION_BATCH_MAX_AGE:
+            reason = "너무 오래된 이벤트입니다"
+        else:
+            reason = None
+        if reason:
+            rejected.append(ActionEventResult(index=i, reason=reason))
+            continue
+
+        if e.event_id:
+            if e.event_id in seen_event_ids:
+                skipped.append(ActionEventResult(index=i, reason="같은 event_id의 이벤트가 이미 있습니다"))
+                continue
+            seen_event_ids.add(e.event_id)
+
+        # 클라이언트가 ts를 보낸 경우에만 중복 판단 (재전송된 같은 이벤트)
+        if e.ts is not None:
+            key = (e.kind, e.place_id, e.action_type, ts)
+            if key in seen:
+                skipped.append(ActionEventResult(index=i, reason="중복 이벤트"))
+                continue
+            seen.add(key)
+
+        accepted.append((i, (e.kind, session.user_id, e.place_id, e.action_type, ts)))
+        if e.action_type in FEEDBACKS:
+            place = (e.kind, e.place_id)
+            if place not in latest_feedback or ts >= latest_feedback[place][0]:
+                latest_feedback[place] = (ts, i)
+
+    # like/dislike는 장소별 가장 마지막 것만 반영
+    applied, events, event_ids = [], [], []
+    for i, event in accepted:
+        kind, _, place_id, action_type, _ = event
+        if action_type in FEEDBACKS and latest_feedback[(kind, place_id)][1] != i:
+            skipped.append(ActionEventResult(index=i, reason="이후 feedback으로 대체됨"))
+            continue
+        applied.append(i)
+        events.append(event)
+        event_id = req.events[i].event_id
+        event_ids.append(f"{session.user_id}:{event_id}" if event_id else None)
+
+    if events:
+        try:
+            await ensure_guest_user(session)
+            if ACTION_SPOOL_ENABLED:
+                await action_spool.append(events, event_ids)
+            elif any(event_ids):
+                # 집계기/record_actions는 event_id를 모르기 때문에 action_event_log로 중복을 거르는 RPC로 바로 반영
+                await ship_action_events(event_rows(events, event_ids))
+            elif ACTION_WRITE_BEHIND_ENABLED:
+                for event in events:
+                    action_aggregator.add(*event)
+            else:
+                # 집계기를 쓰지 않을 때도 요청 하나는 record_actions RPC 한 번으로 반영
+                await flush_actions(build_rows(aggregate(events)))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    skipped.sort(key=lambda r: r.index)
+    return ActionBatchResponse(applied=applied, skipped=skipped, rejected=rejected)
+
+# -------------------------------
+# METRICS API
+# -------------------------------
+# 프로세스 내 캐시 적중률/크기 확인용
+@app.get("/metrics", response_model=Dict)
+async def get_metrics():
+    return {
+        "hours_cache": hours_cache.stats(),
+        "open_hours_index": open_hours_index.stats(),
+        "detail_cache": detail_cache.stats(),
+        "restaurant_index": restaurant_index.stats(),
+        "activity_index": activity_index.stats(),
+        "nearby_tile_cache": nearby_cache.stats(),
+        "compression": compression.stats(compressed_cache),
+        "category_catalog": category_catalog.stats(),
+        "password_hashing": passwords.stats(),
+        "materialized_guests": materialized_guests.stats(),
+        "session": {
+            "auth_required": SESSION_AUTH_REQUIRED,
+            "secret_configured": SESSION_SECRET_CONFIGURED,
+            "fallback_requests": session_fallback_requests,
+        },
+        "action_aggregator": action_aggregator.stats(),
+        "action_spool": action_spool.stats(),
+        "write_queue": write_queue.stats(),
+        "menu_fetch": menu_fetch_stats.stats(),
+        "menu_groups_fetch": menu_groups_fetch_stats.stats(),
+        "booking_cache": booking.stats(),
+        "menu_cache_jobs": {**menu_cache_jobs.stats(), "rate_limit": menu_cache_rate_limit.stats()},
+    }
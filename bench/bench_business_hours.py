@@ -0,0 +1,145 @@
+# 영업시간 추출 벤치마크: 기존 정규식 + 문자 단위 탐색 vs 스트리밍 추출기
+#
+# 사용법
+#   python -m bench.bench_business_hours                 # bench/pages/의 저장된 pcmap 페이지로 측정 (없으면 합성 페이지)
+#   python -m bench.bench_business_hours pages/          # 지정한 폴더의 pcmap HTML(*.html, *.html.gz)로 측정
+#   python -m bench.bench_business_hours --synthetic     # 합성 페이지로 측정
+#
+# 페이지 저장: python -m bench.record_pages <place_id> ...  (bench/pages/<place_id>.html.gz)
+#
+# 스트리밍 추출기는 배열이 끝나면 읽기를 멈춰서 받는 바이트가 줄고, 키 후보는 str.find로만 찾고 배열은 C JSON 파서로 읽어서
+# CPU 시간도 줄어야 함 → 두 값을 같이 출력해서 확인
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from businessHour import _find_business_hours_array
+from core.business_hours import BusinessHoursStreamExtractor
+
+CHUNK_SIZE = 16 * 1024
+REPEAT = 20
+PAGES_DIR = Path(__file__).parent / "pages"
+
+
+# pcmap 홈과 비슷한 구조의 페이지 (앞쪽 리소스 + apollo state + 뒤쪽 리뷰 등)
+def synthetic_page(seed: int) -> str:
+    rnd = random.Random(seed)
+    head = "".join(
+        f'<link rel="preload" href="/static/js/chunk-{i}.js" as="script">\n' for i in range(400)
+    )
+    before = {
+        f"Place:{seed}:{i}": {"name": "가게 이름 \"따옴표\" [대괄호]", "tags": [rnd.random() for _ in range(20)]}
+        for i in range(300)
+    }
+    hours = [
+        {
+            "day": day,
+            "businessHours": {"start": "11:00", "end": "22:00"},
+            "breakHours": [{"start": "15:00", "end": "17:00"}],
+            "lastOrderTimes": [{"type": "주문", "time": "21:30"}],
+            "description": None,
+        }
+        for day in ["월", "화", "수", "목", "금", "토", "일"]
+    ]
+    after = {
+        f"VisitorReview:{i}": {"body": "맛있어요 " * 40, "images": [f"https://img/{i}/{j}.jpg" for j in range(5)]}
+        for i in range(1500)
+    }
+    state = {
+        **before,
+        'PlaceDetailBase:1': {
+            'newBusinessHours({"format":"restaurant"})': [{"name": None, "businessStatusDescription": {}, "businessHours": hours}],
+        },
+        **after,
+    }
+    state_json = json.dumps(state, ensure_ascii=False)
+    return (
+        f"<html><head>{head}</head><body><div id=\"app-root\"></div>"
+        f"<script>window.__APOLLO_STATE__ = {state_json};</script></body></html>"
+    )
+
+
+def read_page(path: Path) -> str:
+    raw = path.read_bytes()
+    if path.suffix == ".gz":
+        raw = gzip.decompress(raw)
+    return raw.decode("utf-8")
+
+
+def load_recorded(path: Path) -> list[tuple[str, str]]:
+    files = sorted(list(path.glob("*.html")) + list(path.glob("*.html.gz")))
+    return [(p.name.split(".")[0], read_page(p)) for p in files]
+
+
+def load_pages(arg: str | None) -> list[tuple[str, str]]:
+    if arg == "--synthetic":
+        return [(f"synthetic-{i}", synthetic_page(i)) for i in range(5)]
+    if arg:
+        return load_recorded(Path(arg))
+    pages = load_recorded(PAGES_DIR) if PAGES_DIR.is_dir() else []
+    if not pages:
+        print("bench/pages/에 저장된 페이지가 없어 합성 페이지로 측정 (python -m bench.record_pages로 저장)\n")
+        return [(f"synthetic-{i}", synthetic_page(i)) for i in range(5)]
+    return pages
+
+
+def run_stream(html: str) -> tuple[list | None, int]:
+    extractor = BusinessHoursStreamExtractor()
+    for i in range(0, len(html), CHUNK_SIZE):
+        if extractor.feed(html[i:i + CHUNK_SIZE]):
+            break
+    return extractor.finish(), extractor.chars_read
+
+
+# 한 번 실행할 때의 CPU 시간(ms)
+def bench(fn, html: str) -> float:
+    start = time.process_time()
+    for _ in range(REPEAT):
+        fn(html)
+    return (time.process_time() - start) / REPEAT * 1000
+
+
+def main():
+    pages = load_pages(sys.argv[1] if len(sys.argv) > 1 else None)
+    if not pages:
+        print("측정할 페이지가 없습니다.")
+        return
+
+    print(
+        f"{'page':<24}{'size(KB)':>10}{'read(KB)':>10}{'read(%)':>9}"
+        f"{'legacy cpu(ms)':>16}{'stream cpu(ms)':>16}  same"
+    )
+    total_bytes = total_read = 0
+    total_legacy = total_stream = 0.0
+    for name, html in pages:
+        legacy_result = _find_business_hours_array(html)
+        stream_result, chars_read = run_stream(html)
+        # 기존 방식은 페이지 전체를 받아야 하고, 스트리밍은 배열이 끝난 청크까지만 받음
+        size = len(html.encode("utf-8"))
+        read_end = min(len(html), -(-chars_read // CHUNK_SIZE) * CHUNK_SIZE)
+        read = len(html[:read_end].encode("utf-8"))
+
+        legacy_ms = bench(_find_business_hours_array, html)
+        stream_ms = bench(run_stream, html)
+        total_bytes += size
+        total_read += read
+        total_legacy += legacy_ms
+        total_stream += stream_ms
+
+        print(
+            f"{name:<24}{size / 1024:>10.0f}{read / 1024:>10.0f}{read / size * 100:>9.1f}"
+            f"{legacy_ms:>16.2f}{stream_ms:>16.2f}  {legacy_result == stream_result}"
+        )
+
+    print(
+        f"{'total':<24}{total_bytes / 1024:>10.0f}{total_read / 1024:>10.0f}{total_read / total_bytes * 100:>9.1f}"
+        f"{total_legacy:>16.2f}{total_stream:>16.2f}"
+    )
+    print(f"\n스트리밍: 받는 바이트 {100 - total_read / total_bytes * 100:.1f}% 감소, CPU 시간 {total_stream / total_legacy:.2f}배")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# 식당 상세 조회 벤치마크: PostgREST 4번 호출(gather) vs get_restaurant_detail RPC 1번
+#
+# 사용법 (로컬 Supabase/PostgREST 기준)
+#   1. supabase start                                   # http://127.0.0.1:54321
+#   2. 운영 스키마/샘플 데이터 적용 후 sql/get_restaurant_detail.sql 실행
+#   3. SUPABASE_PROJECT_URL=http://127.0.0.1:54321 SUPABASE_ANON_API_KEY=<anon key> \
+#        python -m bench.bench_detail [place_id ...]
+#
+# place_id를 주지 않으면 restaurant 테이블에서 20개를 가져와서 사용
+# 두 경로의 결과가 같은지 먼저 확인한 뒤 p50/p99를 출력 (결과 비교만은 tests/test_restaurant_detail.py로 자동 실행)
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import app
+from core import db
+
+ROUNDS = 20
+WARMUP = 3
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def normalize(doc) -> str:
+    return json.dumps(doc, ensure_ascii=False, sort_keys=True, default=str)
+
+
+async def measure(fn, place_ids: list, rounds: int) -> list:
+    latencies = []
+    for _ in range(rounds):
+        for pid in place_ids:
+            start = time.perf_counter()
+            await fn(pid)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def sample_place_ids(n: int = 20) -> list:
+    res = await db.execute(db.supabase.table("restaurant").select("place_id").limit(n))
+    return [r["place_id"] for r in res.data or []]
+
+
+async def main():
+    place_ids = sys.argv[1:] or await sample_place_ids()
+    if not place_ids:
+        print("측정할 place_id가 없습니다.")
+        return
+
+    # 1. 두 경로의 결과 비교
+    mismatches = []
+    for pid in place_ids:
+        gathered = await app.load_restaurant_detail_gather(pid)
+        rpc = await app.load_restaurant_detail_rpc(pid)
+        if normalize(gathered) != normalize(rpc):
+            mismatches.append(pid)
+    print(f"결과 비교: {len(place_ids) - len(mismatches)}/{len(place_ids)} 일치")
+    for pid in mismatches:
+        print(f"  불일치 place_id: {pid}")
+
+    # 2. 지연시간 측정
+    paths = [
+        ("gather (4 calls)", app.load_restaurant_detail_gather),
+        ("rpc (1 call)", app.load_restaurant_detail_rpc),
+    ]
+    print(f"\n{'path':<20}{'n':>6}{'p50(ms)':>10}{'p99(ms)':>10}{'mean(ms)':>10}")
+    for name, fn in paths:
+        await measure(fn, place_ids, WARMUP)
+        latencies = await measure(fn, place_ids, ROUNDS)
+        print(
+            f"{name:<20}{len(latencies):>6}{percentile(latencies, 50):>10.2f}"
+            f"{percentile(latencies, 99):>10.2f}{statistics.mean(latencies):>10.2f}"
+        )
+
+    db.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+# 목록 응답 직렬화 벤치마크: FastAPI 기본 경로(response_model 검증 + jsonable_encoder + json) vs 빠른 모드
+#
+# 사용법
+#   python -m bench.bench_json              # 1k / 5k / 20k rows
+#   python -m bench.bench_json 3000         # 지정한 row 수만
+#
+# 결과는 1k rows당 인코딩 시간(ms)과 본문 크기
+import random
+import sys
+import time
+from typing import Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from core.json_response import FastJSONResponse, dumps, orjson
+
+REPEAT = 10
+CATEGORIES = ["한식", "중식", "일식", "양식", "카페", "술집", "분식", "기타"]
+
+
+# get_restaurants / 인덱스 결과와 비슷한 row
+def synthetic_rows(n: int, seed: int = 0) -> List[Dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "place_id": str(1_000_000_000 + i),
+            "place_name": f"홍길동 식당 {i}호점",
+            "category": rnd.choice(CATEGORIES) + " > 세부 카테고리",
+            "category_group": rnd.choice(CATEGORIES),
+            "address": f"서울 강남구 역삼동 {rnd.randint(1, 999)}-{rnd.randint(1, 99)}",
+            "road_address": f"서울 강남구 테헤란로 {rnd.randint(1, 500)}",
+            "thumbnail": f"https://ldb-phinf.pstatic.net/20240101_{i}/image.jpg",
+            "review_score": round(rnd.uniform(3, 5), 2),
+            "review_count": rnd.randint(0, 5000),
+            "booking_id": str(rnd.randint(100000, 999999)) if rnd.random() < 0.3 else None,
+            "naverorder_id": None,
+            "latitude": 37.5 + rnd.uniform(-0.05, 0.05),
+            "longitude": 127.0 + rnd.uniform(-0.05, 0.05),
+            "distance": round(rnd.uniform(0, 5000), 1),
+        }
+        for i in range(n)
+    ]
+
+
+_adapter = TypeAdapter(List[Dict])
+
+
+# response_model=List[Dict]일 때 FastAPI가 하는 일과 같은 순서
+def fastapi_default(rows: List[Dict]) -> bytes:
+    validated = _adapter.validate_python(rows)
+    encoded = jsonable_encoder(_adapter.dump_python(validated, mode="json"))
+    return JSONResponse(encoded).body
+
+
+def stdlib_only(rows: List[Dict]) -> bytes:
+    return JSONResponse(rows).body
+
+
+def fast(rows: List[Dict]) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def measure(fn, rows: List[Dict]):
+    fn(rows)  # warmup
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        body = fn(rows)
+    elapsed = (time.perf_counter() - start) / REPEAT * 1000
+    return elapsed, len(body)
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 5000, 20000]
+    paths = [
+        ("fastapi default", fastapi_default),
+        ("json (no validation)", stdlib_only),
+        ("fast" + (" (orjson)" if orjson else " (json fallback)"), fast),
+    ]
+
+    for n in sizes:
+        rows = synthetic_rows(n)
+        assert dumps(rows) == fast(rows)
+        print(f"\n{n} rows")
+        print(f"{'path':<24}{'total(ms)':>12}{'ms/1k rows':>12}{'bytes':>12}")
+        for name, fn in paths:
+            elapsed, size = measure(fn, rows)
+            print(f"{name:<24}{elapsed:>12.2f}{elapsed / n * 1000:>12.2f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
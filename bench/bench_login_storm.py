@@ -0,0 +1,82 @@
+# 로그인 폭주 벤치마크: 이벤트 루프에서 bcrypt 직접 실행(기존) vs 프로세스 풀 해시 서비스
+#
+# 사용법
+#   python -m bench.bench_login_storm                 # 로그인 200건, 동시 50
+#   python -m bench.bench_login_storm 500 100         # 로그인 수, 동시 요청 수
+#
+# 로그인(verify)을 동시에 쏟아붓는 동안 다른 가벼운 요청(5ms마다 1건)의 지연시간 p50/p99를 함께 측정
+# PASSWORD_HASH_ROUNDS / PASSWORD_HASH_WORKERS / PASSWORD_HASH_CONCURRENCY 환경변수로 설정 변경
+import asyncio
+import sys
+import time
+
+from core import passwords
+
+PROBE_INTERVAL = 0.005
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+# 다른 엔드포인트 대신: 가벼운 요청이 예정 시각보다 얼마나 늦게 처리되는지(ms)
+async def probe(stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def storm(verify, hashed: str, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login_once():
+        async with semaphore:
+            ok, _ = await verify("password1234", hashed)
+            assert ok
+
+    stop, latencies = asyncio.Event(), []
+    probe_task = asyncio.create_task(probe(stop, latencies))
+    start = time.perf_counter()
+    await asyncio.gather(*(login_once() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return elapsed, latencies
+
+
+async def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    context = passwords._make_context(passwords.PASSWORD_HASH_ROUNDS)
+    hashed = context.hash("password1234")
+
+    # 기존 방식: async 핸들러 안에서 동기 호출
+    async def inline_verify(password: str, hashed_pw: str):
+        return context.verify(password, hashed_pw), None
+
+    await passwords.startup()
+    paths = [
+        ("inline (event loop)", inline_verify),
+        (f"process pool x{passwords.PASSWORD_HASH_WORKERS}", passwords.verify_password),
+    ]
+
+    print(f"rounds={passwords.PASSWORD_HASH_ROUNDS} logins={logins} concurrency={concurrency}")
+    print(f"{'path':<24}{'logins/s':>10}{'probe n':>9}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for name, verify in paths:
+        elapsed, latencies = await storm(verify, hashed, logins, concurrency)
+        latencies = latencies or [0.0]
+        print(
+            f"{name:<24}{logins / elapsed:>10.1f}{len(latencies):>9}"
+            f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}"
+        )
+    print(f"\nprobe: {PROBE_INTERVAL * 1000:.0f}ms마다 1건, 값은 예정 시각 대비 지연 (이벤트 루프가 막혀 있던 시간)")
+
+    await passwords.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+# 영업시간 벤치마크용 pcmap 홈 HTML 저장 (bench/pages/<place_id>.html.gz)
+#
+# 사용법
+#   python -m bench.record_pages 1883597886 11689995 31316673
+#
+# 실제 서버와 같은 공용 클라이언트 설정(core.http_client)으로 받고, 저장소 크기를 줄이려고 gzip으로 저장
+# 페이지 구조가 바뀌면 다시 저장해서 커밋
+import asyncio
+import gzip
+import sys
+from pathlib import Path
+
+from core import http_client
+
+PAGES_DIR = Path(__file__).parent / "pages"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36"
+
+
+async def record(place_id: str) -> None:
+    url = f"https://pcmap.place.naver.com/restaurant/{place_id}/home"
+    resp = await http_client.get(url, headers={"user-agent": USER_AGENT})
+    if resp.status_code != 200:
+        print(f"❌ {place_id}: HTTP {resp.status_code}")
+        return
+    path = PAGES_DIR / f"{place_id}.html.gz"
+    path.write_bytes(gzip.compress(resp.content))
+    print(f"✅ {place_id}: {len(resp.content) / 1024:.0f}KB → {path}")
+
+
+async def main():
+    place_ids = sys.argv[1:]
+    if not place_ids:
+        print("저장할 place_id를 입력하세요.")
+        return
+    PAGES_DIR.mkdir(exist_ok=True)
+    try:
+        for place_id in place_ids:
+            await record(place_id)
+    finally:
+        await http_client.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,6 +2,9 @@ import os
 import re
 from dotenv import load_dotenv
 from supabase import create_client, Client
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 프로젝트 루트 (core 패키지)
+from core.invalidation import notify_categories_updated
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -123,3 +126,6 @@ for cat_record in restaurant_categories:
         }).execute()
 
 print("카테고리 그룹화 작업 완료!")
+
+# API 서버의 카테고리 카탈로그 갱신
+notify_categories_updated()
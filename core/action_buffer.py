@@ -0,0 +1,205 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+KST = timezone(timedelta(hours=9))
+
+# action_type -> 증가시킬 카운터 (like/dislike는 feedback 상태)
+COUNTERS = {"view": "view_count", "click": "click_count"}
+FEEDBACKS = ("like", "dislike")
+ACTION_TYPES = tuple(COUNTERS) + FEEDBACKS
+KINDS = ("restaurant", "activity")
+
+# (kind별 row 목록) → 한 번에 반영, 실패하면 예외
+Flush = Callable[[Dict[str, List[dict]]], Awaitable[None]]
+
+
+class _Pending:
+    __slots__ = ("view_count", "click_count", "feedback", "feedback_at", "updated_at")
+
+    def __init__(self):
+        self.view_count = 0
+        self.click_count = 0
+        self.feedback: Optional[str] = None
+        self.feedback_at: Optional[datetime] = None
+        self.updated_at: Optional[datetime] = None
+
+    def add(self, action_type: str, ts: datetime) -> None:
+        if action_type == "view":
+            self.view_count += 1
+        elif action_type == "click":
+            self.click_count += 1
+        elif self.feedback_at is None or ts >= self.feedback_at:
+            self.feedback, self.feedback_at = action_type, ts  # 가장 마지막 like/dislike만 남김
+        if self.updated_at is None or ts > self.updated_at:
+            self.updated_at = ts
+
+    # 반영 실패한 값을 다시 합침 (그 사이 들어온 feedback이 더 최신이면 유지)
+    def merge(self, other: "_Pending") -> None:
+        self.view_count += other.view_count
+        self.click_count += other.click_count
+        if other.feedback and (self.feedback_at is None or other.feedback_at > self.feedback_at):
+            self.feedback, self.feedback_at = other.feedback, other.feedback_at
+        if self.updated_at is None or other.updated_at > self.updated_at:
+            self.updated_at = other.updated_at
+
+
+Key = Tuple[str, str, str]  # (kind, user_id, place_id)
+
+
+# 집계 결과 → record_actions RPC 인자 (kind별 row 목록)
+def build_rows(pending: Dict[Key, _Pending]) -> Dict[str, List[dict]]:
+    rows: Dict[str, List[dict]] = {kind: [] for kind in KINDS}
+    for (kind, user_id, place_id), p in pending.items():
+        rows[kind].append({
+            "user_id": user_id,
+            "place_id": place_id,
+            "view_count": p.view_count,
+            "click_count": p.click_count,
+            "feedback": p.feedback,
+            "updated_at": p.updated_at.isoformat(),
+        })
+    return rows
+
+
+# (kind, user_id, place_id, action_type, ts) 목록을 key별로 합침
+def aggregate(events: Iterable[Tuple[str, str, str, str, datetime]]) -> Dict[Key, _Pending]:
+    pending: Dict[Key, _Pending] = {}
+    for kind, user_id, place_id, action_type, ts in events:
+        key = (kind, user_id, place_id)
+        if key not in pending:
+            pending[key] = _Pending()
+        pending[key].add(action_type, ts)
+    return pending
+
+
+# action 카운터 write-behind 집계기
+# - 요청에서는 메모리의 (kind, user_id, place_id)별 증가분만 갱신하고 바로 응답
+# - interval마다 또는 쌓인 key가 max_pending을 넘으면 flush 함수(record_actions RPC)로 한 번에 반영
+# - 반영에 실패하면 다음 flush 때 다시 시도, 종료 시 drain()으로 남은 것까지 반영
+# - 실패한 증가분은 key max_retry_keys개까지만 다시 쌓고, 실패가 max_retry_age초 넘게 이어지면 버림 (버린 양은 로그와 stats)
+class ActionAggregator:
+    def __init__(
+        self,
+        flush: Flush,
+        interval: float = 1.0,
+        max_pending: int = 500,
+        max_retry_keys: int = 20_000,
+        max_retry_age: float = 600.0,
+    ):
+        self._flush_fn = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_retry_keys = max_retry_keys
+        self.max_retry_age = max_retry_age
+        self._pending: Dict[Key, _Pending] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+        self._failing_since: Optional[float] = None  # 연속 실패가 시작된 시각 (monotonic)
+
+        self.events = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.dropped_rows = 0
+        self.dropped_events = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, kind: str, user_id: str, place_id: str, action_type: str, ts: Optional[datetime] = None) -> None:
+        key = (kind, user_id, place_id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending()
+        pending.add(action_type, ts or datetime.now(KST))
+        self.events += 1
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+
+            try:
+                await self._flush_fn(build_rows(batch))
+            except BaseException:
+                self.flush_errors += 1
+                self._requeue(batch)
+                raise
+
+            self._failing_since = None
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    # 반영하지 못한 증가분을 다시 쌓아두고 다음에 재시도 (상한을 넘는 것은 버림)
+    def _requeue(self, batch: Dict[Key, _Pending]) -> None:
+        now = time.monotonic()
+        if self._failing_since is None:
+            self._failing_since = now
+        expired = now - self._failing_since > self.max_retry_age
+
+        dropped = []
+        for key, p in batch.items():
+            current = self._pending.get(key)
+            if expired:
+                dropped.append(p)
+            elif current is not None:
+                current.merge(p)
+            elif len(self._pending) < self.max_retry_keys:
+                self._pending[key] = p
+            else:
+                dropped.append(p)
+
+        if dropped:
+            events = sum(p.view_count + p.click_count + (1 if p.feedback else 0) for p in dropped)
+            self.dropped_rows += len(dropped)
+            self.dropped_events += events
+            reason = f"{int(now - self._failing_since)}초째 반영 실패" if expired else f"재시도 대기 {self.max_retry_keys}건 초과"
+            print(f"[ERROR] action 증가분 {len(dropped)}건(이벤트 {events}개) 버림: {reason}")
+
+    async def run_forever(self) -> None:
+        while not self._stopped:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[ERROR] action flush 실패: {e}")
+
+    # run_forever를 진행 중인 flush가 끝난 뒤 멈춤 (flush 도중 취소해서 이중 반영되지 않도록)
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+
+    # 종료 시 남은 증가분 반영 (실패하면 로그만 남김)
+    async def drain(self) -> None:
+        try:
+            flushed = await self.flush()
+            if flushed:
+                print(f"[INFO] 종료 전 action {flushed}건 반영")
+        except Exception as e:
+            print(f"[ERROR] 종료 전 action 반영 실패, {len(self._pending)}건 유실: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "events": self.events,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "dropped_rows": self.dropped_rows,
+            "dropped_events": self.dropped_events,
+            "max_retry_keys": self.max_retry_keys,
+            "max_retry_age": self.max_retry_age,
+            "interval": self.interval,
+            "max_pending": self.max_pending,
+        }
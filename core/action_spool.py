@@ -0,0 +1,254 @@
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+# --------------------------------------
+# action 이벤트 로컬 spool (SQLite WAL)
+# - 요청은 이벤트를 로컬 디스크에 기록(commit)한 뒤 바로 응답 → Supabase 지연/장애와 무관
+# - 동시에 들어온 append는 한 트랜잭션으로 묶어서 commit (fsync 한 번으로 여러 요청 처리, group commit)
+# - drainer가 오래된 순으로 읽어서 record_action_events RPC로 보내고, 성공하면 spool에서 삭제
+#   이벤트마다 event_id가 있어서 같은 이벤트를 다시 보내도 DB에는 한 번만 반영됨
+# - 같은 파일을 여러 워커가 함께 쓰므로 drainer는 보낼 row를 먼저 자기 것으로 표시(claim)한 뒤 읽음
+#   claim은 claim_ttl초가 지나면 풀려서, 보내던 도중 죽은 워커의 row는 다른 워커가 이어서 보냄
+# --------------------------------------
+# (kind, user_id, place_id, action_type, ts)
+Event = Tuple[str, str, str, str, datetime]
+# spool row 목록 → DB 반영, 실패하면 예외
+Ship = Callable[[List[dict]], Awaitable[None]]
+
+_SCHEMA = """
+create table if not exists action_events (
+    id          integer primary key autoincrement,
+    event_id    text not null unique,
+    kind        text not null,
+    user_id     text not null,
+    place_id    text not null,
+    action_type text not null,
+    ts          text not null,
+    created_at  real not null,
+    claimed_by  text,
+    claimed_at  real
+)
+"""
+
+
+class ActionSpool:
+    def __init__(
+        self,
+        path: str,
+        commit_window: float = 0.002,
+        drain_interval: float = 1.0,
+        drain_batch: int = 500,
+        claim_ttl: float = 120.0,
+    ):
+        self.path = path
+        self.commit_window = commit_window
+        self.drain_interval = drain_interval
+        self.drain_batch = drain_batch
+        self.claim_ttl = claim_ttl
+        # drainer 식별자 (워커마다, 기동할 때마다 다름)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # SQLite 연결은 이 스레드 하나에서만 사용
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="action-spool")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: List[Tuple[List[tuple], asyncio.Future]] = []
+        self._queued = asyncio.Event()
+        self._appended = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.appended = 0
+        self.commits = 0
+        self.shipped = 0
+        self.ship_errors = 0
+        self.depth = 0
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _open(self) -> int:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("pragma journal_mode=wal")
+        conn.execute("pragma synchronous=full")  # commit마다 fsync (group commit으로 횟수를 줄임)
+        conn.execute("pragma busy_timeout=5000")  # 같은 파일을 쓰는 다른 워커와 잠금 대기
+        conn.execute(_SCHEMA)
+        # claim 컬럼이 없던 이전 버전의 spool 파일
+        columns = {row[1] for row in conn.execute("pragma table_info(action_events)")}
+        if "claimed_by" not in columns:
+            conn.execute("alter table action_events add column claimed_by text")
+            conn.execute("alter table action_events add column claimed_at real")
+        self._conn = conn
+        return conn.execute("select count(*) from action_events").fetchone()[0]
+
+    async def start(self) -> None:
+        self.depth = await self._run(self._open)
+        if self.depth:
+            print(f"[INFO] action spool에 이전 이벤트 {self.depth}건이 남아 있어 이어서 반영")
+        self._writer_task = asyncio.create_task(self._writer())
+
+    # ---- 기록 (group commit) ----
+    def _insert(self, rows: List[tuple]) -> int:
+        self._conn.execute("begin")
+        try:
+            cur = self._conn.executemany(
+                "insert or ignore into action_events "
+                "(event_id, kind, user_id, place_id, action_type, ts, created_at) values (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("commit")
+        except BaseException:
+            self._conn.execute("rollback")
+            raise
+        return cur.rowcount
+
+    async def _writer(self) -> None:
+        while True:
+            await self._queued.wait()
+            # 잠깐 기다려서 같은 시점의 append를 한 번에 commit
+            if self.commit_window and not self._stopping:
+                await asyncio.sleep(self.commit_window)
+            self._queued.clear()
+            batch, self._queue = self._queue, []
+            if not batch:
+                if self._stopping:
+                    return
+                continue
+
+            rows = [row for rows, _ in batch for row in rows]
+            try:
+                inserted = await self._run(self._insert, rows)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.commits += 1
+            self.appended += inserted
+            self.depth += inserted
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_result(None)
+            self._appended.set()
+            if self._stopping:
+                self._queued.set()  # 남은 게 없으면 다음 루프에서 종료
+
+    # 디스크에 commit된 뒤 반환, event_ids를 주면 그대로 사용 (클라이언트 재전송 중복 방지)
+    async def append(self, events: List[Event], event_ids: Optional[List[Optional[str]]] = None) -> None:
+        now = time.time()
+        rows = [
+            (
+                (event_ids[i] if event_ids and event_ids[i] else None) or uuid.uuid4().hex,
+                kind, user_id, place_id, action_type, ts.isoformat(), now,
+            )
+            for i, (kind, user_id, place_id, action_type, ts) in enumerate(events)
+        ]
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.append((rows, fut))
+        self._queued.set()
+        await fut
+
+    # ---- drain ----
+    # 아무도 claim하지 않았거나 claim이 만료된 row를 오래된 순으로 limit개까지 claim하고, 이 drainer가 claim한 row 반환
+    # (보내다 실패해서 남아 있는 자기 claim도 다시 포함)
+    # begin immediate로 쓰기 잠금을 먼저 잡아서 다른 워커와 같은 row를 동시에 claim하지 않음
+    def _claim(self, limit: int) -> List[dict]:
+        now = time.time()
+        self._conn.execute("begin immediate")
+        try:
+            self._conn.execute(
+                "update action_events set claimed_by = ?, claimed_at = ? where id in ("
+                "select id from action_events "
+                "where claimed_by is null or claimed_by = ? or claimed_at < ? order by id limit ?)",
+                (self.owner, now, self.owner, now - self.claim_ttl, limit),
+            )
+            cur = self._conn.execute(
+                "select id, event_id, kind, user_id, place_id, action_type, ts "
+                "from action_events where claimed_by = ? order by id limit ?",
+                (self.owner, limit),
+            )
+            cols = [c[0] for c in cur.description]
+            rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+            self._conn.execute("commit")
+        except BaseException:
+            self._conn.execute("rollback")
+            raise
+        return rows
+
+    def _delete(self, ids: List[int]) -> int:
+        self._conn.execute("begin")
+        try:
+            cur = self._conn.executemany("delete from action_events where id = ?", [(i,) for i in ids])
+            self._conn.execute("commit")
+        except BaseException:
+            self._conn.execute("rollback")
+            raise
+        return cur.rowcount
+
+    # 한 묶음 반영, 반영한 이벤트 수 반환 (남은 게 없으면 0)
+    async def drain_once(self, ship: Ship) -> int:
+        rows = await self._run(self._claim, self.drain_batch)
+        if not rows:
+            self.depth = 0
+            return 0
+        await ship([{k: v for k, v in r.items() if k != "id"} for r in rows])
+        deleted = await self._run(self._delete, [r["id"] for r in rows])
+        self.shipped += len(rows)
+        self.depth = max(0, self.depth - deleted)
+        return len(rows)
+
+    async def run_drainer(self, ship: Ship) -> None:
+        backoff = self.drain_interval
+        while True:
+            try:
+                shipped = await self.drain_once(ship)
+                backoff = self.drain_interval
+            except Exception as e:
+                self.ship_errors += 1
+                print(f"[ERROR] action spool 반영 실패: {e}")
+                shipped = 0
+                backoff = min(backoff * 2, 60)
+            if shipped >= self.drain_batch:
+                continue  # 밀린 게 더 있으면 바로 다음 묶음
+            if backoff > self.drain_interval:
+                await asyncio.sleep(backoff)  # 실패 중에는 새 이벤트가 와도 기다림
+                continue
+            self._appended.clear()
+            try:
+                await asyncio.wait_for(self._appended.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+
+    # 종료: 대기 중인 append를 commit하고, 남은 이벤트는 가능한 만큼 반영 (못 한 건 다음 기동 때 반영)
+    async def stop(self, ship: Optional[Ship] = None, timeout: float = 5.0) -> None:
+        if self._writer_task:
+            # 이미 받은 append까지 commit한 뒤 writer 종료
+            self._stopping = True
+            self._queued.set()
+            await self._writer_task
+        if ship is not None:
+            deadline = time.monotonic() + timeout
+            try:
+                while time.monotonic() < deadline and await self.drain_once(ship):
+                    pass
+            except Exception as e:
+                print(f"[ERROR] 종료 전 action spool 반영 실패 (다음 기동 때 반영): {e}")
+        if self._conn is not None:
+            await self._run(self._conn.close)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "owner": self.owner,
+            "depth": self.depth,
+            "appended": self.appended,
+            "commits": self.commits,
+            "shipped": self.shipped,
+            "ship_errors": self.ship_errors,
+        }
@@ -0,0 +1,307 @@
+import json
+import random
+import re
+from typing import List, Optional, Tuple
+
+from core import http_client
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:118.0) Gecko/20100101 Firefox/118.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 12_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 10; SM-G973N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/110.0.5481.77 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 15_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.6 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (iPad; CPU OS 14_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.2478.67",
+]
+
+# "newBusinessHours(...)": [  또는  "businessHours": [
+_KEY_RE = re.compile(r'"(newBusinessHours\([^)]*\)|businessHours)"\s*:\s*\[')
+# 두 키에 공통으로 들어가는 문자열, 후보 위치는 str.find로 찾고 키 전체는 그 위치에서만 정규식으로 확인
+_KEY_NEEDLE = "usinessHours"
+_NEW_PREFIX = '"newB'
+_LEGACY_PREFIX = '"b'
+# 후보를 찾지 못했을 때 다음 chunk와 이어서 볼 꼬리 길이 (needle이 경계에 걸쳐도 찾을 수 있을 만큼)
+_KEY_KEEP = len(_NEW_PREFIX) + len(_KEY_NEEDLE) - 1
+# 후보부터 버퍼 끝까지가 키의 앞부분이면 chunk 경계에서 잘린 것이므로 다음 chunk를 기다림
+_KEY_PARTIAL_RE = re.compile(r'"(?:newBusinessHours(?:\([^)]*(?:\)(?:"\s*(?::\s*)?)?)?)?|businessHours(?:"\s*(?::\s*)?)?)\Z')
+# 잘린 키를 기다리는 최대 길이
+_KEY_TAIL = 512
+# 배열을 읽는 동안 의미 있는 문자만 건너뛰며 찾기 위한 패턴
+_OUTSIDE_STR_RE = re.compile(r'[\[\]"]')
+_INSIDE_STR_RE = re.compile(r'[\\"]')
+_decoder = json.JSONDecoder()
+
+
+def fix_encoding(s: str) -> str:
+    try:
+        return s.encode('latin1').decode('utf-8')
+    except:
+        return s
+
+
+# pcmap HTML을 chunk 단위로 받아서 영업시간 배열을 찾는 상태 기계
+# - 키 검색은 str.find로 후보만 찾고 이어서 볼 위치(_pos)를 기억해서, 이미 훑은 부분은 다시 검색하지 않음
+# - 배열은 먼저 C JSON 파서(raw_decode)로 한 번에 읽고, chunk 경계에 걸쳐 실패하면 대괄호/문자열 상태로 끝을 추적
+# - newBusinessHours 배열을 찾으면 즉시 종료 → 나머지 본문은 받지 않아도 됨
+# - 예전 형식의 businessHours 배열은 후보로만 저장해두고, 끝까지 newBusinessHours가 없을 때 사용
+class BusinessHoursStreamExtractor:
+    def __init__(self):
+        self._buf = ""
+        self._kind: Optional[str] = None  # 배열 수집 중이면 "new" / "legacy"
+        self._scanning = False  # raw_decode가 실패해서 배열 끝을 추적 중
+        self._pos = 0
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._fallback: Optional[list] = None
+        self.result: Optional[list] = None
+        self.done = False
+        self.chars_read = 0
+
+    # chunk를 넣고, 더 읽을 필요가 없으면 True
+    def feed(self, chunk: str) -> bool:
+        if self.done:
+            return True
+        self.chars_read += len(chunk)
+        self._buf += chunk
+
+        while True:
+            if self._kind is None and not self._find_key():
+                return False
+
+            complete, arr = self._read_array()
+            if not complete:
+                return False
+
+            kind, self._kind = self._kind, None
+            self._pos = 0
+            if self._accept(kind, arr):
+                self.done = True
+                self._buf = ""
+                return True
+
+    # 다음 키를 찾으면 버퍼를 여는 '['부터 남기고 True, 못 찾으면 다음 chunk에서 이어서 볼 부분만 남기고 False
+    def _find_key(self) -> bool:
+        buf = self._buf
+        i = self._pos
+        while True:
+            j = buf.find(_KEY_NEEDLE, i)
+            if j < 0:
+                self._buf = buf[-_KEY_KEEP:]
+                # 남긴 꼬리 안에서 끝까지 들어와 있는 needle은 이미 확인했음
+                self._pos = max(0, len(self._buf) - len(_KEY_NEEDLE) + 1)
+                return False
+
+            if j >= len(_NEW_PREFIX) and buf.startswith(_NEW_PREFIX, j - len(_NEW_PREFIX)):
+                start = j - len(_NEW_PREFIX)
+            elif j >= len(_LEGACY_PREFIX) and buf.startswith(_LEGACY_PREFIX, j - len(_LEGACY_PREFIX)):
+                start = j - len(_LEGACY_PREFIX)
+            else:
+                i = j + 1
+                continue
+
+            m = _KEY_RE.match(buf, start)
+            if m is not None:
+                self._kind = "new" if m.group(1).startswith("new") else "legacy"
+                # 여는 '[' 부터 버퍼에 남김
+                self._buf = buf[m.end() - 1:]
+                self._pos = 0
+                return True
+            if len(buf) - start < _KEY_TAIL and _KEY_PARTIAL_RE.match(buf, start):
+                # 키가 아직 다 들어오지 않았으므로 후보부터 남겨두고 다음 chunk에서 다시 확인
+                self._buf = buf[start:]
+                self._pos = j - start
+                return False
+            i = j + 1
+
+    # (배열을 끝까지 읽었는지, 파싱한 배열 (JSON이 아니면 None))
+    def _read_array(self) -> Tuple[bool, Optional[list]]:
+        if not self._scanning:
+            # 보통은 키를 찾은 chunk 안에서 배열이 끝나므로 먼저 한 번에 파싱
+            try:
+                arr, end = _decoder.raw_decode(self._buf)
+            except ValueError:
+                # chunk 경계에 걸쳤거나 JSON이 아님 → 지금까지 받은 부분부터 괄호를 따라가며 끝 위치 추적
+                self._scanning = True
+                self._pos = 0
+                self._depth = 0
+                self._in_str = False
+                self._esc = False
+            else:
+                self._buf = self._buf[end:]
+                return True, arr
+
+        end = self._scan_array()
+        if end is None:
+            return False, None
+        self._scanning = False
+        arr_str = self._buf[:end + 1]
+        self._buf = self._buf[end + 1:]
+        try:
+            return True, json.loads(arr_str)
+        except Exception:
+            return True, None
+
+    # 배열의 닫는 ']' 위치를 반환, 아직 못 찾았으면 None (다음 chunk에서 이어서)
+    def _scan_array(self) -> Optional[int]:
+        buf = self._buf
+        i = self._pos
+        n = len(buf)
+
+        if self._esc:
+            if i >= n:
+                return None
+            i += 1
+            self._esc = False
+
+        while True:
+            if self._in_str:
+                m = _INSIDE_STR_RE.search(buf, i)
+                if m is None:
+                    self._pos = n
+                    return None
+                i = m.end()
+                if m.group() == '\\':
+                    if i >= n:
+                        self._pos = i
+                        self._esc = True
+                        return None
+                    i += 1
+                else:
+                    self._in_str = False
+            else:
+                m = _OUTSIDE_STR_RE.search(buf, i)
+                if m is None:
+                    self._pos = n
+                    return None
+                ch = m.group()
+                i = m.end()
+                if ch == '"':
+                    self._in_str = True
+                elif ch == '[':
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        return i - 1
+
+    def _accept(self, kind: str, arr: Optional[list]) -> bool:
+        if arr is None:
+            return False
+
+        if kind == "new":
+            for obj in arr:
+                if isinstance(obj, dict) and isinstance(obj.get("businessHours"), list):
+                    self.result = obj["businessHours"]
+                    return True
+            return False
+
+        if (
+            self._fallback is None
+            and isinstance(arr, list) and arr and isinstance(arr[0], dict)
+            and "day" in arr[0] and "businessHours" in arr[0]
+        ):
+            self._fallback = arr
+        return False
+
+    # 스트림이 끝났거나 중단됐을 때 최종 결과
+    def finish(self) -> Optional[list]:
+        if self.result is not None:
+            return self.result
+        return self._fallback
+
+
+# 문자열 전체가 이미 있을 때 (테스트/배치 스크립트용)
+def extract_business_hours(html: str) -> Optional[list]:
+    extractor = BusinessHoursStreamExtractor()
+    extractor.feed(html)
+    return extractor.finish()
+
+
+def sort_business_hours(bh_list: list) -> list:
+    weekday_order = ["월", "화", "수", "목", "금", "토", "일"]
+    def get_index(item):
+        day = item.get("day")
+        if day == "매일":
+            return -1
+        try:
+            return weekday_order.index(day)
+        except ValueError:
+            return 100
+    return sorted(bh_list, key=get_index)
+
+
+# pcmap의 영업시간 원본 → API 응답 형식
+# with_breaks면 브레이크타임도 breakHours([{start, end}])로 포함 (open_now 구간 계산용, API 응답에는 넣지 않음)
+def normalize_business_hours(bh_list: list, with_breaks: bool = False) -> List[dict]:
+    results = []
+    for info in bh_list:
+        if not isinstance(info, dict):
+            continue
+        bh = info.get("businessHours") or {}
+        last_orders = []
+        for lo in info.get("lastOrderTimes") or []:
+            if isinstance(lo, dict) and "time" in lo:
+                last_orders.append(lo["time"])
+        item = {
+            "day": fix_encoding(info.get("day")),
+            "start": bh.get("start"),
+            "end": bh.get("end"),
+            "lastOrder": last_orders
+        }
+        if with_breaks:
+            item["breakHours"] = [
+                {"start": b.get("start"), "end": b.get("end")}
+                for b in info.get("breakHours") or []
+                if isinstance(b, dict)
+            ]
+        results.append(item)
+
+    return sort_business_hours(results)
+
+
+# 요청 실패 시 httpx 예외를 그대로 올림 (캐시/배치에서 실패와 "영업시간 없음"을 구분하기 위함)
+async def load_business_hours(business_id: str, with_breaks: bool = False) -> List[dict]:
+    url = f"https://pcmap.place.naver.com/restaurant/{business_id}/home"
+
+    headers = {
+            "authority": "pcmap.place.naver.com",
+            "method": "GET",
+            "scheme": "https",
+            "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+            "User-Agent": random.choice(USER_AGENTS),
+            "Referer": url,
+            "Accept-Language": "ko-KR,ko;q=0.9",
+            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Google Chrome";v="138"',
+            "sec-ch-ua-mobile": "?0",
+            "sec-ch-ua-platform": '"Windows"',
+            "sec-ch-ua-platform-version": '"19.0.0"',
+            "sec-fetch-dest": "document",
+            "sec-fetch-mode": "navigate",
+            "sec-fetch-site": "same-origin",
+            "sec-fetch-user": "?1",
+    }
+
+    extractor = BusinessHoursStreamExtractor()
+    # 배열을 찾으면 바로 빠져나가서 응답(커넥션)을 닫음
+    async with http_client.stream("GET", url, headers=headers, timeout=20) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_text():
+            if extractor.feed(chunk):
+                break
+
+    bh_list = extractor.finish()
+    if not bh_list:
+        return []  # businessHours 없으면 빈 리스트 반환
+
+    return normalize_business_hours(bh_list, with_breaks)
+
+
+async def fetch_business_hours(business_id: str):
+    try:
+        return await load_business_hours(business_id)
+    except Exception:
+        return []  # 요청 실패 시 빈 리스트 반환
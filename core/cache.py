@@ -0,0 +1,198 @@
+import asyncio
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Union
+
+# 캐시에 값이 없음을 나타내는 sentinel (None도 정상 값으로 캐싱할 수 있도록)
+MISSING = object()
+
+Loader = Callable[[], Awaitable[Any]]
+TTL = Union[float, Callable[[Any], float]]
+
+
+# 캐시 항목의 대략적인 메모리 크기(byte) 추정
+# API 응답은 대부분 JSON 직렬화 가능한 dict/list라서 직렬화 길이로 계산
+def estimate_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+# TTL + LRU + 메모리 상한을 갖는 프로세스 내 캐시
+# - 같은 key로 동시에 miss가 나면 upstream 호출은 한 번만 하고 나머지는 그 결과를 기다림 (single-flight)
+# - 로더에서 예외가 나면 캐싱하지 않고 기다리던 요청 모두에게 예외를 그대로 전달
+# - 로드 중에 invalidate()된 key는 그 로드 결과를 저장하지 않음 (변경 전에 읽은 값일 수 있음)
+class TTLCache:
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 1024,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # 로드 도중 invalidate돼서 결과를 저장하면 안 되는 로드 (끝나면 제거)
+        self._stale: Set[asyncio.Task] = set()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_loads = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not MISSING
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    # 통계를 건드리지 않고 조회 (만료 항목은 정리)
+    def peek(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return MISSING
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return MISSING
+        return entry.value
+
+    def get(self, key: Hashable) -> Any:
+        value = self.peek(key)
+        if value is MISSING:
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[TTL] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if callable(ttl):
+            ttl = ttl(value)
+        if ttl <= 0:
+            return
+
+        size = self._sizeof(value)
+        # 항목 하나가 메모리 상한보다 크면 캐싱하지 않음
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._remove(key)
+            return
+
+        self._remove(key)
+        self._data[key] = _Entry(value, time.monotonic() + ttl, size)
+        self._bytes += size
+        self._evict()
+
+    # 개수/메모리 상한을 넘으면 가장 오래 안 쓴 항목부터 제거
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.maxsize
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, entry = self._data.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    # 진행 중인 로드가 있으면 결과를 버리도록 표시하고, 이후 요청은 그 로드에 합류하지 않고 새로 로드
+    def _invalidate_inflight(self, key: Hashable) -> None:
+        task = self._inflight.pop(key, None)
+        if task is not None:
+            self._stale.add(task)
+
+    def invalidate(self, key: Hashable) -> bool:
+        existed = key in self._data
+        self._remove(key)
+        self._invalidate_inflight(key)
+        return existed
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+        for key in list(self._inflight):
+            self._invalidate_inflight(key)
+
+    async def _load(self, key: Hashable, loader: Loader, ttl: Optional[TTL]) -> Any:
+        task = asyncio.current_task()
+        try:
+            self.loads += 1
+            value = await loader()
+        except BaseException:
+            self.load_errors += 1
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            stale = task in self._stale
+            self._stale.discard(task)
+        if stale:
+            self.stale_loads += 1
+        else:
+            self.set(key, value, ttl)
+        return value
+
+    # 캐시 조회 후 없으면 loader를 한 번만 실행해서 채움
+    # loader는 인자 없는 코루틴 함수, ttl은 초 단위 숫자 또는 값 -> 초를 돌려주는 함수
+    async def get_or_load(self, key: Hashable, loader: Loader, ttl: Optional[TTL] = None) -> Any:
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, ttl))
+            self._inflight[key] = task
+        else:
+            self.coalesced += 1
+
+        # 요청 하나가 취소돼도 upstream 호출은 끝까지 진행되도록 shield
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "bytes": self._bytes,
+            "maxsize": self.maxsize,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "inflight": len(self._inflight),
+            "stale_loads": self.stale_loads,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.etag import make_etag
+from core.json_response import dumps
+
+KST = timezone(timedelta(hours=9))
+
+# "기타"는 항상 맨 뒤
+OTHER_GROUP = "기타"
+
+
+def sort_category_groups(groups: Iterable[str]) -> List[str]:
+    groups = set(g for g in groups if g)
+    return sorted(g for g in groups if g != OTHER_GROUP) + ([OTHER_GROUP] if OTHER_GROUP in groups else [])
+
+
+# category_type(food / leisure)별 카테고리 목록을 정렬 + 직렬화해서 (ETag, 본문)으로 들고 있는 카탈로그
+# classify 스크립트가 돌 때만 바뀌는 데이터라 시작 시 한 번 읽고, 주기적 갱신 또는 무효화 API로만 다시 읽음
+class CategoryCatalog:
+    def __init__(self):
+        self._documents: Dict[str, Tuple[str, bytes]] = {}
+        self._counts: Dict[str, int] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    # distinct_category_groups row 목록(category_group, category_type)으로 전체 교체
+    def load(self, rows: Iterable[dict], category_types: Iterable[str] = ()) -> None:
+        grouped: Dict[str, List[str]] = {t: [] for t in category_types}
+        for r in rows:
+            grouped.setdefault(r["category_type"], []).append(r["category_group"])
+
+        documents, counts = {}, {}
+        for category_type, groups in grouped.items():
+            sorted_groups = sort_category_groups(groups)
+            body = dumps([{"category_group": g} for g in sorted_groups])
+            documents[category_type] = (make_etag(body), body)
+            counts[category_type] = len(sorted_groups)
+
+        self._documents, self._counts = documents, counts
+        self.loaded_at = datetime.now(KST)
+
+    # (ETag, 본문), 없는 category_type이면 None
+    def get(self, category_type: str) -> Optional[Tuple[str, bytes]]:
+        return self._documents.get(category_type)
+
+    def stats(self) -> dict:
+        return {
+            "categories": dict(self._counts),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
@@ -0,0 +1,167 @@
+import asyncio
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip만 사용
+    brotli = None
+
+# 압축 대상 Content-Type (JSON / 텍스트)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+# Accept-Encoding에서 사용할 인코딩 선택 (br > gzip), q=0은 제외
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    def ok(name: str) -> bool:
+        return accepted.get(name, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and ok("br"):
+        return "br"
+    if ok("gzip"):
+        return "gzip"
+    return None
+
+
+# 압축 통계 (프로세스 단위, /metrics용)
+_stats = {"compressed": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+# 강한 ETag를 약한 ETag로 (압축본은 원본과 바이트가 다르므로)
+def weaken_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else "W/" + etag
+
+
+# 응답 압축 미들웨어
+# - 본문을 한 번에 보내는 응답 중 minimum_size 이상인 JSON/텍스트만 압축
+# - ETag가 있는 응답(식당 상세 등)은 (ETag, 인코딩)으로 압축본을 캐싱해서 같은 본문을 다시 압축하지 않음
+# - offload_size 이상인 본문은 이벤트 루프를 막지 않도록 스레드에서 압축
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        brotli_quality: int = 5,
+        gzip_level: int = 6,
+        offload_size: int = 64 * 1024,
+        cache: Optional[TTLCache] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+        self.offload_size = offload_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if message.get("more_body", False):
+                # 스트리밍 응답은 그대로 전달
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            await self._send_body(start, message.get("body", b""), encoding, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compressible(self, status: int, headers: MutableHeaders, body: bytes) -> bool:
+        if status < 200 or status in (204, 304) or len(body) < self.minimum_size:
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        content_type = headers.get("content-type", "")
+        return any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def _compress_async(self, body: bytes, encoding: str) -> bytes:
+        if len(body) >= self.offload_size:
+            return await asyncio.get_running_loop().run_in_executor(None, self._compress, body, encoding)
+        return self._compress(body, encoding)
+
+    async def _send_body(self, start: Message, body: bytes, encoding: str, send: Send) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        etag = headers.get("etag")
+        status = start["status"]
+
+        if not self._compressible(status, headers, body):
+            _stats["skipped"] += 1
+            if status == 304 and etag:
+                # 클라이언트가 갖고 있는 건 압축본이므로 200 응답과 같은 ETag로 맞춤
+                headers["ETag"] = weaken_etag(etag)
+                headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if etag and self.cache is not None:
+            compressed = await self.cache.get_or_load(
+                (etag, encoding), lambda: self._compress_async(body, encoding)
+            )
+        else:
+            compressed = await self._compress_async(body, encoding)
+
+        _stats["compressed"] += 1
+        _stats["bytes_in"] += len(body)
+        _stats["bytes_out"] += len(compressed)
+
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        if etag:
+            headers["ETag"] = weaken_etag(etag)
+        await send(start)
+        await send({"type": "http.response.body", "body": compressed})
+
+
+# 미들웨어 인스턴스는 Starlette가 내부에서 만들기 때문에 통계는 모듈 단위로 집계
+def stats(cache: Optional[TTLCache] = None) -> dict:
+    bytes_in, bytes_out = _stats["bytes_in"], _stats["bytes_out"]
+    return {
+        "brotli": brotli is not None,
+        **_stats,
+        "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+        "cache": cache.stats() if cache is not None else None,
+    }
@@ -0,0 +1,49 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from dotenv import load_dotenv
+from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+
+# --------------------------------------
+# Supabase(PostgREST) 호출을 이벤트 루프 밖에서 실행하는 data-access 레이어
+# supabase-py는 동기 클라이언트라서, FastAPI 핸들러에서는 반드시 execute()를 거쳐서 호출
+# --------------------------------------
+load_dotenv()
+SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
+SUPABASE_ANON_API_KEY = os.getenv("SUPABASE_ANON_API_KEY")
+
+# 동시에 실행할 수 있는 쿼리 수 (= 전용 스레드 수)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "16"))
+# 쿼리 하나당 기본 제한 시간(초)
+DB_QUERY_TIMEOUT = float(os.getenv("DB_QUERY_TIMEOUT", "10"))
+
+# HTTP 레벨 타임아웃도 걸어서, 제한 시간이 지난 쿼리가 스레드를 계속 잡고 있지 않도록 함
+supabase: Client = create_client(
+    SUPABASE_PROJECT_URL,
+    SUPABASE_ANON_API_KEY,
+    options=ClientOptions(postgrest_client_timeout=DB_QUERY_TIMEOUT + 5),
+)
+
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="supabase")
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+# query: .execute()가 있는 supabase 쿼리 빌더, 또는 인자 없는 동기 함수
+async def execute(query: Union[Any, Callable[[], Any]], timeout: Optional[float] = None):
+    fn = query.execute if hasattr(query, "execute") else query
+    loop = asyncio.get_running_loop()
+    timeout = DB_QUERY_TIMEOUT if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_executor, fn), timeout)
+    except asyncio.TimeoutError:
+        raise QueryTimeout(f"Supabase 쿼리가 {timeout}초 안에 끝나지 않았습니다.")
+
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
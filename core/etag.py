@@ -0,0 +1,35 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# 미리 직렬화해둔 응답 본문에 대한 strong ETag
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+# If-None-Match 헤더("*" 또는 쉼표로 구분된 ETag 목록)와 비교
+# 약한 비교: 압축 미들웨어가 붙인 W/ 접두사는 무시
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [_opaque(c.strip()) for c in if_none_match.split(",")]
+    return "*" in candidates or _opaque(etag) in candidates
+
+
+# 조건부 요청이면 304, 아니면 본문 그대로 응답
+def etag_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str = "application/json",
+    cache_control: str = "no-cache",
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,181 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.pagination import PageRequest, select_page
+
+KST = timezone(timedelta(hours=9))
+EARTH_RADIUS_M = 6_371_008.8
+
+
+# 기준점 하나와 좌표 배열(라디안) 사이의 거리(m)를 한 번에 계산
+def haversine_m(lat: float, lng: float, lats_rad: np.ndarray, lngs_rad: np.ndarray) -> np.ndarray:
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    dlat = lats_rad - lat1
+    dlng = lngs_rad - lng1
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lats_rad) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# 조회에 쓰는 배열 묶음, 갱신 시 통째로 교체해서 조회 중인 요청이 중간 상태를 보지 않도록 함
+class _Snapshot(NamedTuple):
+    items: List[dict]
+    lat: np.ndarray          # 위도(도) 오름차순 정렬
+    lat_rad: np.ndarray
+    lng_rad: np.ndarray
+    lng: np.ndarray
+    category_group: np.ndarray
+    ids: np.ndarray          # id 문자열 (페이지 정렬 키)
+
+
+def _empty_snapshot() -> _Snapshot:
+    empty = np.empty(0, dtype=np.float64)
+    return _Snapshot([], empty, empty, empty, empty, np.empty(0, dtype=object), np.empty(0, dtype=object))
+
+
+# restaurant / activity 좌표 + 표시용 컬럼을 메모리에 올려두고 반경/카테고리 조회를 처리하는 인덱스
+# - 위도 기준으로 정렬해두고 searchsorted로 위도 띠를 자른 뒤, 경도 범위 → haversine 순으로 좁힘
+# - updated_at 기준 증분 갱신 (upsert), 삭제 반영은 주기적인 전체 교체(replace)로 처리
+class GeoIndex:
+    def __init__(self, name: str, lat_key: str = "latitude", lng_key: str = "longitude", id_key: str = "place_id"):
+        self.name = name
+        self.lat_key = lat_key
+        self.lng_key = lng_key
+        self.id_key = id_key
+        self._rows: Dict[str, dict] = {}
+        self._snapshot = _empty_snapshot()
+        self.watermark: Optional[str] = None  # 지금까지 반영한 updated_at 최대값
+        self.loaded_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._snapshot.items)
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def _merge(self, rows: Iterable[dict]) -> int:
+        count = 0
+        for r in rows:
+            self._rows[str(r[self.id_key])] = r
+            updated_at = r.get("updated_at")
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            count += 1
+        return count
+
+    # 전체 교체
+    def replace(self, rows: Iterable[dict]) -> int:
+        self._rows = {}
+        self.watermark = None
+        count = self._merge(rows)
+        self._rebuild()
+        return count
+
+    # 변경분만 반영, 바뀐 row가 있을 때만 배열 재구성
+    def upsert(self, rows: Iterable[dict]) -> int:
+        count = self._merge(rows)
+        if count:
+            self._rebuild()
+        return count
+
+    def _rebuild(self) -> None:
+        items = []
+        for r in self._rows.values():
+            try:
+                lat = float(r[self.lat_key])
+                lng = float(r[self.lng_key])
+            except (KeyError, TypeError, ValueError):
+                continue  # 좌표 없는 장소는 조회 대상 아님
+            items.append((lat, lng, r))
+        items.sort(key=lambda x: x[0])
+
+        lat = np.fromiter((x[0] for x in items), dtype=np.float64, count=len(items))
+        lng = np.fromiter((x[1] for x in items), dtype=np.float64, count=len(items))
+        category_group = np.array([x[2].get("category_group") for x in items], dtype=object)
+        ids = np.array([str(x[2][self.id_key]) for x in items], dtype=object)
+
+        self._snapshot = _Snapshot(
+            items=[x[2] for x in items],
+            lat=lat,
+            lat_rad=np.radians(lat),
+            lng_rad=np.radians(lng),
+            lng=lng,
+            category_group=category_group,
+            ids=ids,
+        )
+        self.loaded_at = datetime.now(KST)
+
+    # 반경(m) 안 후보의 (스냅샷, 위치, 거리)
+    def _candidates(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        category_group: Optional[str],
+    ) -> Tuple[_Snapshot, np.ndarray, np.ndarray]:
+        snap = self._snapshot
+        none = np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+        if not snap.items:
+            return (snap,) + none
+
+        # 1. 위도 띠
+        dlat = math.degrees(radius / EARTH_RADIUS_M)
+        lo = int(np.searchsorted(snap.lat, lat - dlat, side="left"))
+        hi = int(np.searchsorted(snap.lat, lat + dlat, side="right"))
+        if lo >= hi:
+            return (snap,) + none
+
+        # 2. 경도 범위 + 카테고리
+        dlng = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        mask = np.abs(snap.lng[lo:hi] - lng) <= dlng
+        if category_group:
+            mask &= snap.category_group[lo:hi] == category_group
+        idx = np.nonzero(mask)[0] + lo
+        if idx.size == 0:
+            return (snap,) + none
+
+        # 3. 정확한 거리
+        dist = haversine_m(lat, lng, snap.lat_rad[idx], snap.lng_rad[idx])
+        inside = dist <= radius
+        return snap, idx[inside], dist[inside]
+
+    # 반경(m) 안의 장소를 가까운 순으로 반환, 각 row에 distance(m) 추가
+    def query(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        category_group: Optional[str] = None,
+    ) -> List[dict]:
+        snap, idx, dist = self._candidates(lat, lng, radius, category_group)
+        order = np.argsort(dist, kind="stable")
+
+        items = snap.items
+        return [
+            {**items[i], "distance": round(float(d), 1)}
+            for i, d in zip(idx[order].tolist(), dist[order].tolist())
+        ]
+
+    # query와 같은 조건에서 (distance, id) 순 한 페이지만 dict로 만들어서 반환 → (rows, 다음 커서)
+    def query_page(
+        self,
+        lat: float,
+        lng: float,
+        radius: float,
+        category_group: Optional[str],
+        page: PageRequest,
+    ) -> Tuple[List[dict], Optional[str]]:
+        snap, idx, dist = self._candidates(lat, lng, radius, category_group)
+        return select_page(snap.items, idx, dist, snap.ids[idx], page)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "rows": len(self._rows),
+            "indexed": len(self._snapshot.items),
+            "watermark": self.watermark,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
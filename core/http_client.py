@@ -0,0 +1,94 @@
+import asyncio
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# --------------------------------------
+# Naver upstream 호출에 공통으로 쓰는 async HTTP 클라이언트
+# 요청마다 클라이언트를 새로 만들지 않고 keep-alive 커넥션 풀을 재사용
+# --------------------------------------
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# 호스트(pcmap.place.naver.com, m.booking.naver.com 등)별 동시 요청 수 상한
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "20"))
+
+# HTTP/2는 h2 패키지가 설치되어 있고 환경변수로 켠 경우에만 사용
+HTTP2_ENABLED = (
+    os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    and importlib.util.find_spec("h2") is not None
+)
+
+_client: Optional[httpx.AsyncClient] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    # accept-encoding은 지정하지 않음 → httpx 기본값(gzip, deflate, 설치 시 br)으로 압축 전송
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        follow_redirects=True,
+    )
+
+
+# 공용 클라이언트 반환 (lifespan 밖에서 호출돼도 지연 생성)
+def get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).hostname or ""
+    sem = _host_semaphores.get(host)
+    if sem is None:
+        sem = asyncio.Semaphore(HTTP_PER_HOST_LIMIT)
+        _host_semaphores[host] = sem
+    return sem
+
+
+# FastAPI lifespan에서 호출
+async def startup() -> None:
+    get_client()
+
+
+async def shutdown() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_semaphores.clear()
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    async with _host_semaphore(url):
+        return await get_client().request(method, url, **kwargs)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+# 응답 본문을 끝까지 받지 않고 스트리밍으로 읽을 때 사용
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    async with _host_semaphore(url):
+        async with get_client().stream(method, url, **kwargs) as resp:
+            yield resp
@@ -0,0 +1,44 @@
+import os
+from typing import Iterable, Optional
+
+import requests
+
+# --------------------------------------
+# 크롤러/filldata/classify 스크립트에서 upsert 후 API 서버의 캐시를 비우도록 알리는 hook
+# PLACE_API_URL(API 서버 주소)이 없으면 아무것도 하지 않음 (로컬 실행 등)
+# --------------------------------------
+# 한 번에 보내는 place_id 최대 개수
+_BATCH_SIZE = 500
+
+
+# 무효화 API 호출, 실패해도 스크립트는 계속 진행되도록 예외를 올리지 않음
+# (스크립트들이 import 후에 load_dotenv()를 호출하므로 환경변수는 호출 시점에 읽음)
+def _post(path: str, payload: Optional[dict] = None) -> None:
+    api_url = os.getenv("PLACE_API_URL")
+    if not api_url:
+        return
+    try:
+        resp = requests.post(
+            f"{api_url.rstrip('/')}{path}",
+            json=payload,
+            headers={"X-Cache-Token": os.getenv("CACHE_INVALIDATION_TOKEN", "")},
+            timeout=5,
+        )
+        resp.raise_for_status()
+    except Exception as e:
+        print(f"⚠️ 캐시 무효화 요청 실패 ({path}): {e}")
+
+
+# 식당 상세 캐시 무효화
+def notify_restaurant_updated(place_ids: Iterable[str]) -> None:
+    if not os.getenv("PLACE_API_URL"):
+        return
+
+    ids = list(dict.fromkeys(str(pid) for pid in place_ids if pid))
+    for i in range(0, len(ids), _BATCH_SIZE):
+        _post("/cache/restaurant/invalidate", {"place_ids": ids[i:i + _BATCH_SIZE]})
+
+
+# 카테고리 카탈로그 다시 적재
+def notify_categories_updated() -> None:
+    _post("/cache/category/invalidate")
@@ -0,0 +1,122 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+KST = timezone(timedelta(hours=9))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+# 백그라운드 작업 하나의 진행 상황 (대상 수, 완료/실패/건너뜀 수)
+class Job:
+    def __init__(self, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(KST)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._finished_monotonic: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "remaining": max(0, self.total - self.done - self.failed - self.skipped),
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# 프로세스 안에서 도는 백그라운드 작업 목록
+# - start()는 작업을 태스크로 띄우고 바로 Job을 돌려줌 (상태 조회는 get(job_id))
+# - 끝난 작업은 ttl초 동안만 조회 가능, 최대 maxsize개까지 보관 (넘치면 오래된 끝난 작업부터 제거)
+# - 상태는 워커 프로세스마다 따로라서 여러 워커로 띄우면 작업을 만든 워커에서만 조회됨
+class JobRegistry:
+    def __init__(self, name: str, ttl: float = 3600, maxsize: int = 200):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job._finished_monotonic > self.ttl:
+                del self._jobs[job_id]
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) <= self.maxsize:
+                break
+            if job.finished:
+                del self._jobs[job_id]
+
+    async def _run(self, job: Job, fn: Callable[[Job], Awaitable[None]]) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.now(KST)
+        try:
+            await fn(job)
+            job.status = DONE
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            print(f"[ERROR] {self.name} 작업 {job.id} 실패: {e}")
+        finally:
+            job.finished_at = datetime.now(KST)
+            job._finished_monotonic = time.monotonic()
+
+    def start(self, kind: str, params: dict, fn: Callable[[Job], Awaitable[None]]) -> Job:
+        self._prune()
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job, fn))
+        # 태스크 참조를 들고 있어야 실행 도중 GC되지 않음
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    # 종료 시 진행 중인 작업 취소
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"name": self.name, "jobs": len(self._jobs), "running": len(self._tasks), "by_status": counts}
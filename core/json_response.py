@@ -0,0 +1,35 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화 (검증 생략 효과만 남음)
+    orjson = None
+
+# --------------------------------------
+# 목록 응답 빠른 직렬화
+# FAST_JSON_ENABLED=true면 목록 API가 response_model 검증/jsonable_encoder를 거치지 않고
+# orjson으로 바로 직렬화한 응답을 반환 (DB/인덱스에서 나온 dict라 다시 검증할 필요가 없음)
+# --------------------------------------
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "false").lower() == "true"
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# 빠른 모드면 바로 직렬화한 Response, 아니면 원래대로 FastAPI가 처리하도록 content 그대로 반환
+def list_response(content: Any, headers: Optional[Dict[str, str]] = None):
+    if not FAST_JSON_ENABLED:
+        return content
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class _Negative:
+    __slots__ = ("reason", "failures", "retry_at")
+
+    def __init__(self):
+        self.reason = ""
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+# "조회해도 결과가 없음"을 기억하는 캐시 (upstream이 계속 실패하거나 빈 결과만 주는 key용)
+# - record()할 때마다 연속 실패 횟수가 늘고, 다시 조회를 허용하기까지의 시간이 ttl부터 두 배씩 늘어남 (max_ttl까지)
+# - 재조회 시각이 지나면 get()이 None을 돌려줘서 한 번 다시 조회 (그래도 없으면 다시 record)
+# - 결과를 얻으면 clear()로 연속 실패 횟수 초기화
+# - 최대 maxsize개까지 보관하고, 넘치면 가장 오래 안 쓴 항목부터 제거
+class NegativeCache:
+    def __init__(self, name: str, ttl: float, max_ttl: float, maxsize: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, _Negative]" = OrderedDict()
+
+        self.hits = 0
+        self.probes = 0
+        self.recorded: Dict[str, int] = {}
+        self.recovered = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # 아직 재조회 시각 전이면 기록된 사유, 아니면 None
+    def get(self, key: Hashable) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.retry_at > time.monotonic():
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry.reason
+        self.probes += 1
+        return None
+
+    # 결과 없음 기록, 다음 재조회까지 남은 시간(초) 반환 (cap을 주면 그보다 길게 잡지 않음)
+    def record(self, key: Hashable, reason: str, cap: Optional[float] = None) -> float:
+        entry = self._data.get(key)
+        if entry is None:
+            entry = self._data[key] = _Negative()
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self._data.move_to_end(key)
+        entry.reason = reason
+        entry.failures += 1
+        ttl = min(self.ttl * 2 ** (entry.failures - 1), self.max_ttl)
+        if cap is not None:
+            ttl = min(ttl, cap)
+        entry.retry_at = time.monotonic() + ttl
+        self.recorded[reason] = self.recorded.get(reason, 0) + 1
+        return ttl
+
+    def clear(self, key: Hashable) -> bool:
+        if self._data.pop(key, None) is None:
+            return False
+        self.recovered += 1
+        return True
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        active: Dict[str, int] = {}
+        for entry in self._data.values():
+            if entry.retry_at > now:
+                active[entry.reason] = active.get(entry.reason, 0) + 1
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "max_ttl": self.max_ttl,
+            "active_by_reason": active,
+            "hits": self.hits,
+            "probes": self.probes,
+            "recorded": self.recorded,
+            "recovered": self.recovered,
+        }
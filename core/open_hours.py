@@ -0,0 +1,185 @@
+import re
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+KST = timezone(timedelta(hours=9))
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+_DAY_ALIASES = {
+    "매일": list(range(7)),
+    "평일": list(range(5)),
+    "주말": [5, 6],
+}
+_TIME_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})")
+_RANGE_RE = re.compile(r"^([월화수목금토일])\s*[~\-]\s*([월화수목금토일])$")
+
+
+# "월", "매일", "평일", "월~금", "토, 일" → 요일 인덱스(월=0) 리스트, 모르는 값은 빈 리스트
+def parse_days(day: Optional[str]) -> List[int]:
+    if not day:
+        return []
+    day = day.strip()
+    if day in _DAY_ALIASES:
+        return _DAY_ALIASES[day]
+    if day in WEEKDAYS:
+        return [WEEKDAYS.index(day)]
+
+    m = _RANGE_RE.match(day)
+    if m:
+        start, end = WEEKDAYS.index(m.group(1)), WEEKDAYS.index(m.group(2))
+        return [(start + i) % 7 for i in range((end - start) % 7 + 1)]
+
+    if "," in day:
+        days = []
+        for part in day.split(","):
+            days.extend(parse_days(part))
+        return sorted(set(days))
+    return []
+
+
+# "11:30" → 690, "24:00" → 1440
+def parse_minutes(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    m = _TIME_RE.match(value)
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2))
+    if hour > 48 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+# [start, end] 구간에서 브레이크타임을 뺀 나머지 구간들 (모두 그날 시작 기준 분, 자정을 넘기면 1440 이상)
+def _subtract_breaks(start: int, end: int, breaks: Iterable[dict]) -> List[Tuple[int, int]]:
+    cuts = []
+    for b in breaks:
+        b_start = parse_minutes(b.get("start"))
+        b_end = parse_minutes(b.get("end"))
+        if b_start is None or b_end is None:
+            continue
+        if b_start < start:
+            b_start += MINUTES_PER_DAY
+        if b_end <= b_start:
+            b_end += MINUTES_PER_DAY
+        b_start, b_end = max(b_start, start), min(b_end, end)
+        if b_start < b_end:
+            cuts.append((b_start, b_end))
+
+    segments = []
+    cur = start
+    for b_start, b_end in sorted(cuts):
+        if b_start > cur:
+            segments.append((cur, b_start))
+        cur = max(cur, b_end)
+    if cur < end:
+        segments.append((cur, end))
+    return segments
+
+
+# 주(week) 경계를 넘는 구간은 둘로 나눔 (일요일 밤 → 월요일 새벽), 경계 뒤에서 시작하는 구간은 월요일로 옮김
+def _wrap(start: int, end: int) -> List[Tuple[int, int]]:
+    if end <= MINUTES_PER_WEEK:
+        return [(start, end)]
+    if start >= MINUTES_PER_WEEK:
+        return [(start - MINUTES_PER_WEEK, end - MINUTES_PER_WEEK)]
+    return [(start, MINUTES_PER_WEEK), (0, end - MINUTES_PER_WEEK)]
+
+
+# normalize_business_hours 결과(day/start/end/lastOrder, breakHours) → 주간 분(minute-of-week) 구간 row 목록
+# - 종료가 시작보다 이르면 자정을 넘겨 영업하는 것으로 보고 다음 날로 이어붙임
+# - 시작과 종료가 같으면 24시간 영업
+# - 브레이크타임(breakHours)은 구간에서 빼서 그 시간에는 영업중이 아닌 것으로 처리
+# - lastOrder는 구간 안의 마지막 주문 가능 시각(minute-of-week)으로 같이 저장
+def build_intervals(hours: Iterable[dict]) -> List[dict]:
+    rows = []
+    for item in hours:
+        days = parse_days(item.get("day"))
+        start = parse_minutes(item.get("start"))
+        end = parse_minutes(item.get("end"))
+        if not days or start is None or end is None:
+            continue
+        if end <= start:
+            end += MINUTES_PER_DAY
+
+        last_order = None
+        for lo in item.get("lastOrder") or []:
+            lo_min = parse_minutes(lo)
+            if lo_min is None:
+                continue
+            if lo_min < start:
+                lo_min += MINUTES_PER_DAY
+            if lo_min <= end:
+                last_order = lo_min if last_order is None else max(last_order, lo_min)
+
+        for d in days:
+            base = d * MINUTES_PER_DAY
+            lo_week = (base + last_order) % MINUTES_PER_WEEK if last_order is not None else None
+            for seg_start, seg_end in _subtract_breaks(start, end, item.get("breakHours") or []):
+                for s, e in _wrap(base + seg_start, base + seg_end):
+                    rows.append({
+                        "start_minute": s,
+                        "end_minute": e,
+                        "last_order_minute": lo_week,
+                    })
+    return rows
+
+
+def minute_of_week(dt: Optional[datetime] = None) -> int:
+    if dt is None:
+        dt = datetime.now(KST)
+    elif dt.tzinfo is None:
+        dt = dt.replace(tzinfo=KST)  # 시간대가 없으면 KST로 간주
+    else:
+        dt = dt.astimezone(KST)
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+# place_id → 정렬된 영업 구간, 요청 경로에서는 메모리만 조회
+class OpenHoursIndex:
+    def __init__(self):
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        self.loaded_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __contains__(self, place_id: str) -> bool:
+        return place_id in self._starts
+
+    # business_hours_interval 테이블 row 목록으로 전체 교체
+    def load(self, rows: Iterable[dict]) -> None:
+        grouped: Dict[str, List[Tuple[int, int]]] = {}
+        for r in rows:
+            grouped.setdefault(str(r["place_id"]), []).append((r["start_minute"], r["end_minute"]))
+
+        starts, ends = {}, {}
+        for place_id, intervals in grouped.items():
+            intervals.sort()
+            starts[place_id] = [s for s, _ in intervals]
+            ends[place_id] = [e for _, e in intervals]
+
+        self._starts, self._ends = starts, ends
+        self.loaded_at = datetime.now(KST)
+
+    # 영업시간 정보가 없는 가게는 False
+    def is_open(self, place_id: str, minute: int) -> bool:
+        starts = self._starts.get(place_id)
+        if not starts:
+            return False
+        ends = self._ends[place_id]
+        # minute 이전에 시작한 구간들 중 하나라도 아직 안 끝났으면 영업중
+        i = bisect_right(starts, minute)
+        return any(ends[j] > minute for j in range(i))
+
+    def stats(self) -> dict:
+        return {
+            "places": len(self._starts),
+            "intervals": sum(len(v) for v in self._starts.values()),
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+        }
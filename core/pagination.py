@@ -0,0 +1,111 @@
+import base64
+import json
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# --------------------------------------
+# 주변 검색 결과 커서 페이지네이션 + 필드 선택
+# 정렬 기준은 (distance(0.1m 단위), place_id) 이고, 커서는 마지막으로 보낸 row의 정렬 키
+# (offset이 아니라 키 기준이라 페이지 사이에 데이터가 바뀌어도 중복/누락이 적음)
+# --------------------------------------
+Keyset = Tuple[float, str]
+
+
+# limit: 페이지 크기 (None이면 전체), after: 디코딩한 커서, fields: 응답에 남길 컬럼
+# keep: 페이지를 자르기 전에 적용할 필터 (open_now 등)
+class PageRequest(NamedTuple):
+    limit: Optional[int] = None
+    after: Optional[Keyset] = None
+    fields: Optional[Tuple[str, ...]] = None
+    keep: Optional[Callable[[dict], bool]] = None
+
+
+def encode_cursor(key: Keyset) -> str:
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# 잘못된 커서는 ValueError
+def decode_cursor(cursor: str) -> Keyset:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        distance, place_id = json.loads(raw)
+        return float(distance), str(place_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+# "place_id, place_name" → ("place_id", "place_name"), 비어있으면 None(전체 컬럼)
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    return names or None
+
+
+def project(row: dict, distance: float, fields: Optional[Tuple[str, ...]]) -> dict:
+    if fields is None:
+        return {**row, "distance": distance}
+    out = {}
+    for f in fields:
+        if f == "distance":
+            out[f] = distance
+        elif f in row:
+            out[f] = row[f]
+    return out
+
+
+# 후보들을 정렬 키 순으로 돌면서 keep을 통과한 것만 limit개까지 담고, 다음 페이지 커서를 반환
+def _take(
+    rows: List[dict],
+    ordered: Iterable[Tuple[int, float, Keyset]],
+    page: PageRequest,
+) -> Tuple[List[dict], Optional[str]]:
+    out, last = [], None
+    for i, distance, key in ordered:
+        row = rows[i]
+        if page.keep is not None and not page.keep(row):
+            continue
+        if page.limit is not None and len(out) >= page.limit:
+            return out, encode_cursor(last)
+        out.append(project(row, distance, page.fields))
+        last = key
+    return out, None
+
+
+# 좌표 배열을 가진 인덱스/타일 캐시용: idx(rows 위치), dist(m), ids(place_id 문자열, object 배열)는 반경 안 후보들
+def select_page(
+    rows: List[dict],
+    idx: np.ndarray,
+    dist: np.ndarray,
+    ids: np.ndarray,
+    page: PageRequest,
+) -> Tuple[List[dict], Optional[str]]:
+    d = np.round(dist, 1)
+    if page.after is not None:
+        after_d, after_id = page.after
+        mask = (d > after_d) | ((d == after_d) & (ids > after_id))
+        idx, d, ids = idx[mask], d[mask], ids[mask]
+
+    order = np.lexsort((ids, d))
+    # keep 필터가 없으면 필요한 만큼(limit + 1)만 꺼냄
+    if page.keep is None and page.limit is not None:
+        order = order[:page.limit + 1]
+    return _take(
+        rows,
+        ((i, dd, (dd, pid)) for i, dd, pid in zip(idx[order].tolist(), d[order].tolist(), ids[order].tolist())),
+        page,
+    )
+
+
+# 이미 distance가 들어있는 dict 목록용 (get_restaurants RPC 결과 등)
+def paginate(rows: List[dict], page: PageRequest, id_key: str = "place_id") -> Tuple[List[dict], Optional[str]]:
+    keyed = []
+    for i, r in enumerate(rows):
+        key = (round(float(r.get("distance") or 0), 1), str(r.get(id_key)))
+        if page.after is None or key > page.after:
+            keyed.append((key, i))
+    keyed.sort()
+    # 응답의 distance는 원래 값 그대로 두고 정렬/커서에만 반올림한 값을 사용
+    return _take(rows, ((i, rows[i].get("distance"), key) for key, i in keyed), page)
@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# --------------------------------------
+# 비밀번호 해시/검증 서비스
+# bcrypt는 한 번에 100~300ms씩 CPU를 쓰기 때문에 이벤트 루프가 아니라 별도 프로세스 풀에서 실행
+# - 동시에 처리할 수 있는 요청 수를 세마포어로 제한하고, 오래 기다리면 PasswordHashBusy
+# - 로그인 시 저장된 해시의 cost가 현재 설정과 다르면 새 해시를 돌려줘서 호출 쪽에서 교체 (rehash-on-login)
+# --------------------------------------
+# bcrypt cost (2^rounds)
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+# 해시 전용 프로세스 수
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# 풀에 동시에 넣을 수 있는 작업 수 (실행 중 + 대기), 초과분은 여기서 기다림
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 2)))
+# 자리가 날 때까지 기다리는 최대 시간(초)
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_context: Optional[CryptContext] = None  # 워커 프로세스 안에서 사용
+
+_stats = {"hashed": 0, "verified": 0, "rehashed": 0, "busy": 0}
+# 세마포어를 얻어서 풀에 넣은 작업 수 (실행 중 + 풀 안에서 대기)
+_in_flight = 0
+
+
+class PasswordHashBusy(Exception):
+    pass
+
+
+# min_rounds도 같이 올려야 verify_and_update가 cost가 낮은 기존 해시를 새 해시로 바꿔줌
+def _make_context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+# ---- 워커 프로세스에서 실행되는 함수들 ----
+def _init_worker(rounds: int) -> None:
+    global _context
+    _context = _make_context(rounds)
+
+
+def _warmup() -> int:
+    return os.getpid()
+
+
+def _hash(password: str) -> str:
+    return _context.hash(password)
+
+
+# (일치 여부, cost가 바뀌었으면 새 해시)
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return _context.verify_and_update(password, hashed)
+
+
+# ---- 이벤트 루프 쪽 ----
+async def startup() -> None:
+    global _pool, _semaphore
+    if _pool is not None:
+        return
+    # 서버 프로세스의 스레드/커넥션을 물려받지 않도록 spawn으로 띄움
+    _pool = ProcessPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(PASSWORD_HASH_ROUNDS,),
+    )
+    _semaphore = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+    # 첫 로그인에서 프로세스 기동 비용을 내지 않도록 미리 띄워둠
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(_pool, _warmup) for _ in range(PASSWORD_HASH_WORKERS)))
+
+
+async def shutdown() -> None:
+    global _pool, _semaphore
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool, _semaphore = None, None
+
+
+async def _submit(fn, *args):
+    global _in_flight
+    if _pool is None:
+        await startup()
+    try:
+        await asyncio.wait_for(_semaphore.acquire(), PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _stats["busy"] += 1
+        raise PasswordHashBusy("비밀번호 처리 대기열이 가득 찼습니다.")
+    _in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pool, fn, *args)
+    finally:
+        _in_flight -= 1
+        _semaphore.release()
+
+
+async def hash_password(password: str) -> str:
+    hashed = await _submit(_hash, password)
+    _stats["hashed"] += 1
+    return hashed
+
+
+# (일치 여부, 새 해시 또는 None) - 새 해시가 있으면 users.password_hash를 교체해야 함
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    ok, new_hash = await _submit(_verify_and_update, password, hashed)
+    _stats["verified"] += 1
+    if new_hash:
+        _stats["rehashed"] += 1
+    return ok, new_hash
+
+
+def stats() -> dict:
+    return {
+        "rounds": PASSWORD_HASH_ROUNDS,
+        "workers": PASSWORD_HASH_WORKERS,
+        "concurrency": PASSWORD_HASH_CONCURRENCY,
+        "in_use": _in_flight,
+        **_stats,
+    }
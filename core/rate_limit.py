@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+
+# 초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷
+# acquire()는 토큰이 생길 때까지 기다린 뒤 하나 가져감 (먼저 기다린 순서대로)
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.waited += 1
+                self.wait_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+            self.acquired += 1
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
@@ -0,0 +1,89 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import NamedTuple, Optional, Tuple
+
+# --------------------------------------
+# 서명된 세션 토큰 (HMAC-SHA256)
+# 형식: base64url(payload JSON) + "." + base64url(서명)
+# 서버 비밀키로 서명만 확인하면 되므로 요청마다 users 테이블을 조회하지 않음
+# --------------------------------------
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(30 * 24 * 3600)))
+_secret = os.getenv("SESSION_SECRET")
+# 설정되지 않았으면 임시 키를 쓰는데, 토큰을 필수로 요구하는 서버는 기동하지 않음 (app.py lifespan)
+SESSION_SECRET_CONFIGURED = bool(_secret)
+if not _secret:
+    # 워커/인스턴스마다 키가 달라져서 다른 프로세스가 발급한 토큰을 검증하지 못함 → 운영에서는 반드시 설정
+    print("⚠️ SESSION_SECRET이 설정되지 않아 임시 키를 사용합니다 (재시작하면 기존 토큰 무효)")
+    _secret = secrets.token_urlsafe(32)
+SESSION_SECRET = _secret.encode("utf-8")
+
+
+class InvalidSession(Exception):
+    pass
+
+
+# 토큰에서 꺼낸 세션 정보
+# from_query: 토큰 없이 user_id 쿼리 파라미터로만 식별된 세션 (SESSION_AUTH_REQUIRED=false 전환 기간, 게스트인지 알 수 없음)
+class Session(NamedTuple):
+    user_id: str
+    is_guest: bool
+    expires_at: int
+    from_query: bool = False
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(SESSION_SECRET, payload.encode(), hashlib.sha256).digest())
+
+
+# (토큰, 만료 시각(unix time))
+def issue_token(user_id: str, is_guest: bool, ttl: Optional[int] = None) -> Tuple[str, int]:
+    now = int(time.time())
+    expires_at = now + (SESSION_TTL if ttl is None else ttl)
+    payload = _b64encode(json.dumps(
+        {"sub": user_id, "guest": is_guest, "iat": now, "exp": expires_at},
+        separators=(",", ":"),
+    ).encode())
+    return f"{payload}.{_sign(payload)}", expires_at
+
+
+# 서명/만료 확인, 실패하면 InvalidSession
+def verify_token(token: str) -> Session:
+    try:
+        payload, signature = token.split(".", 1)
+    except ValueError:
+        raise InvalidSession("잘못된 토큰 형식입니다.")
+    # str끼리 비교하면 ASCII가 아닌 문자가 섞였을 때 TypeError가 나서 bytes로 비교
+    if not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+        raise InvalidSession("토큰 서명이 올바르지 않습니다.")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+        session = Session(str(claims["sub"]), bool(claims["guest"]), int(claims["exp"]))
+    except Exception:
+        raise InvalidSession("잘못된 토큰입니다.")
+    if session.expires_at < time.time():
+        raise InvalidSession("만료된 토큰입니다.")
+    return session
+
+
+# "Bearer <token>" 헤더에서 토큰만 추출
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
@@ -0,0 +1,69 @@
+import time
+from typing import Awaitable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+# 여러 upstream 호출로 이루어진 작업(메뉴 수집 등)의 단계별 소요 시간 집계
+# - 단계마다 호출 수 / 평균 / 최대(ms)를 모아서 /metrics로 노출
+# - 전체 소요 시간이 slow_ms를 넘은 호출은 단계별 시간과 함께 로그로 남김 (0이면 끔)
+class StageStats:
+    def __init__(self, name: str, slow_ms: float = 0):
+        self.name = name
+        self.slow_ms = slow_ms
+        self._count: Dict[str, int] = {}
+        self._total_ms: Dict[str, float] = {}
+        self._max_ms: Dict[str, float] = {}
+        self.slow = 0
+
+    def record(self, stage: str, ms: float) -> None:
+        self._count[stage] = self._count.get(stage, 0) + 1
+        self._total_ms[stage] = self._total_ms.get(stage, 0.0) + ms
+        if ms > self._max_ms.get(stage, 0.0):
+            self._max_ms[stage] = ms
+
+    def timer(self, label: str = "") -> "StageTimer":
+        return StageTimer(self, label)
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "slow": self.slow,
+            "slow_ms": self.slow_ms,
+            "stages": {
+                stage: {
+                    "count": count,
+                    "avg_ms": round(self._total_ms[stage] / count, 2),
+                    "max_ms": round(self._max_ms[stage], 2),
+                }
+                for stage, count in self._count.items()
+            },
+        }
+
+
+# 호출 한 번의 단계별 시간 측정 (병렬로 도는 단계도 각자 시간을 잼)
+class StageTimer:
+    def __init__(self, stats: StageStats, label: str = ""):
+        self._stats = stats
+        self.label = label
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    async def run(self, stage: str, aw: Awaitable[T]) -> T:
+        start = time.perf_counter()
+        try:
+            return await aw
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.timings[stage] = ms
+            self._stats.record(stage, ms)
+
+    # 전체 시간 기록, 느린 호출이면 로그
+    def finish(self, label: Optional[str] = None) -> float:
+        total = (time.perf_counter() - self.started) * 1000
+        self._stats.record("total", total)
+        if self._stats.slow_ms and total >= self._stats.slow_ms:
+            self._stats.slow += 1
+            stages = " ".join(f"{stage}={ms:.0f}ms" for stage, ms in self.timings.items())
+            print(f"[SLOW] {self._stats.name} {label or self.label} total={total:.0f}ms {stages}")
+        return total
@@ -0,0 +1,153 @@
+import math
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from core.cache import TTLCache
+from core.geo_index import haversine_m
+from core.pagination import PageRequest, paginate, select_page
+
+METERS_PER_DEGREE = 111_320.0
+# row 하나당 대략적인 메모리 크기 (캐시 메모리 상한 계산용, 매번 직렬화하지 않기 위함)
+ROW_BYTES_ESTIMATE = 600
+
+# 좌표가 없어서 타일로 처리할 수 없는 결과임을 표시 (이 경우 원래 조회로 우회)
+_BYPASS = object()
+
+Fetch = Callable[[float, float, int, Optional[str]], Awaitable[Optional[List[dict]]]]
+
+
+# 타일 하나의 상위 집합(타일 중심 기준 반경 + 타일 반대각선) 결과
+class _TileResult:
+    __slots__ = ("rows", "lat_rad", "lng_rad", "ids")
+
+    def __init__(self, rows: List[dict], lat_rad: np.ndarray, lng_rad: np.ndarray, ids: np.ndarray):
+        self.rows = rows
+        self.lat_rad = lat_rad
+        self.lng_rad = lng_rad
+        self.ids = ids
+
+
+def _coords(row: dict) -> Optional[Tuple[float, float]]:
+    lat = row.get("latitude", row.get("lat"))
+    lng = row.get("longitude", row.get("lng"))
+    if lat is None or lng is None:
+        return None
+    try:
+        return float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+
+
+# 주변 검색 결과를 지리 타일 단위로 캐싱
+# - 조회 중심을 tile_m 크기 격자에 맞추고, 반경은 radius_bucket 단위로 올림
+# - (타일, 반경 버킷, category_group)마다 타일 전체를 덮는 상위 집합을 한 번만 가져와서
+#   실제 중심/반경 원으로는 메모리에서 다시 거름 → 근처 사용자끼리 결과를 공유
+class TileCache:
+    def __init__(self, tile_m: int, radius_bucket: int, ttl: float, maxsize: int, max_bytes: int):
+        self.tile_m = tile_m
+        self.radius_bucket = radius_bucket
+        self.cache = TTLCache(
+            "nearby_tiles",
+            ttl=ttl,
+            maxsize=maxsize,
+            max_bytes=max_bytes,
+            sizeof=lambda v: len(v.rows) * ROW_BYTES_ESTIMATE if isinstance(v, _TileResult) else 0,
+        )
+        self.bypassed = 0
+
+    # (row, col)과 타일 중심 좌표
+    def tile_of(self, lat: float, lng: float) -> Tuple[Tuple[int, int], Tuple[float, float]]:
+        dlat = self.tile_m / METERS_PER_DEGREE
+        row = math.floor(lat / dlat)
+        center_lat = (row + 0.5) * dlat
+        dlng = self.tile_m / (METERS_PER_DEGREE * max(math.cos(math.radians(center_lat)), 1e-6))
+        col = math.floor(lng / dlng)
+        return (row, col), (center_lat, (col + 0.5) * dlng)
+
+    def bucket_of(self, radius: int) -> int:
+        return max(1, math.ceil(radius / self.radius_bucket)) * self.radius_bucket
+
+    async def _load_tile(self, fetch: Fetch, center: Tuple[float, float], radius: int, category_group: Optional[str]):
+        # 타일 안 어느 지점에서 radius 원을 그려도 포함되도록 반대각선 절반만큼 넓힘
+        superset_radius = math.ceil(radius + self.tile_m * math.sqrt(2) / 2)
+        rows = await fetch(center[0], center[1], superset_radius, category_group)
+        if rows is None:
+            return None
+
+        coords = [_coords(r) for r in rows]
+        if any(c is None for c in coords):
+            return _BYPASS  # 좌표가 없는 결과는 타일 단위로 다시 거를 수 없음
+
+        lat = np.fromiter((c[0] for c in coords), dtype=np.float64, count=len(coords))
+        lng = np.fromiter((c[1] for c in coords), dtype=np.float64, count=len(coords))
+        ids = np.array([str(r.get("place_id")) for r in rows], dtype=object)
+        return _TileResult(rows, np.radians(lat), np.radians(lng), ids)
+
+    async def _load(self, fetch: Fetch, lat: float, lng: float, radius: int, category_group: Optional[str]):
+        tile, center = self.tile_of(lat, lng)
+        bucket = self.bucket_of(radius)
+        key = (tile, bucket, category_group)
+
+        return await self.cache.get_or_load(
+            key,
+            lambda: self._load_tile(fetch, center, bucket, category_group),
+            ttl=lambda v: self.cache.ttl if v is not None else 0,
+        )
+
+    # 타일 상위 집합 중 실제 반경 안에 있는 (위치, 거리)
+    @staticmethod
+    def _inside(result: _TileResult, lat: float, lng: float, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+        dist = haversine_m(lat, lng, result.lat_rad, result.lng_rad)
+        idx = np.nonzero(dist <= radius)[0]
+        return idx, dist[idx]
+
+    # fetch(lat, lng, radius, category_group)를 감싸서 같은 결과(가까운 순, distance(m) 포함)를 반환
+    async def query(
+        self,
+        fetch: Fetch,
+        lat: float,
+        lng: float,
+        radius: int,
+        category_group: Optional[str] = None,
+    ) -> Optional[List[dict]]:
+        result = await self._load(fetch, lat, lng, radius, category_group)
+        if result is None:
+            return None  # 조회 실패
+        if result is _BYPASS:
+            # 타일로 처리할 수 없는 경우 원래 조회 그대로
+            self.bypassed += 1
+            return await fetch(lat, lng, radius, category_group)
+
+        idx, dist = self._inside(result, lat, lng, radius)
+        order = np.argsort(dist, kind="stable")
+
+        rows = result.rows
+        return [
+            {**rows[i], "distance": round(float(d), 1)}
+            for i, d in zip(idx[order].tolist(), dist[order].tolist())
+        ]
+
+    # query와 같은 결과 중 (distance, place_id) 순 한 페이지만 반환 → (rows, 다음 커서)
+    async def query_page(
+        self,
+        fetch: Fetch,
+        lat: float,
+        lng: float,
+        radius: int,
+        category_group: Optional[str],
+        page: PageRequest,
+    ) -> Optional[Tuple[List[dict], Optional[str]]]:
+        result = await self._load(fetch, lat, lng, radius, category_group)
+        if result is None:
+            return None
+        if result is _BYPASS:
+            self.bypassed += 1
+            rows = await fetch(lat, lng, radius, category_group)
+            return None if rows is None else paginate(rows, page)
+
+        idx, dist = self._inside(result, lat, lng, radius)
+        return select_page(result.rows, idx, dist, result.ids[idx], page)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "bypassed": self.bypassed, "tile_m": self.tile_m, "radius_bucket": self.radius_bucket}
@@ -0,0 +1,107 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+# 같은 종류의 값 목록 → 한 번에 반영, 실패하면 예외
+Writer = Callable[[List[Any]], Awaitable[None]]
+
+
+# 응답을 기다리게 할 필요가 없는 쓰기(menu_cache, last_active_at 등)를 모아서 백그라운드로 반영하는 큐
+# - (종류, key)가 같은 쓰기는 window 안에서 마지막 값 하나로 합침
+# - window마다 또는 max_batch개가 쌓이면 종류별로 writer를 한 번씩 호출 (bulk upsert/update)
+# - 최대 maxsize개까지만 보관하고, 넘치면 새 쓰기를 버림 (버린 수는 dropped로 집계)
+# - 반영에 실패한 쓰기는 다시 넣지 않고 failed로만 집계 (중요하지 않은 쓰기 전용)
+class WriteQueue:
+    def __init__(self, name: str, window: float = 2.0, maxsize: int = 10_000, max_batch: int = 500):
+        self.name = name
+        self.window = window
+        self.maxsize = maxsize
+        self.max_batch = max_batch
+        self._writers: Dict[str, Writer] = {}
+        self._pending: "OrderedDict[Tuple[str, Hashable], Any]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopped = False
+
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def register(self, kind: str, writer: Writer) -> None:
+        self._writers[kind] = writer
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # 큐에 넣었으면 True, 가득 차서 버렸으면 False
+    def submit(self, kind: str, key: Hashable, value: Any) -> bool:
+        if kind not in self._writers:
+            raise KeyError(f"등록되지 않은 쓰기 종류: {kind}")
+        self.submitted += 1
+        item_key = (kind, key)
+        if item_key in self._pending:
+            self._pending[item_key] = value
+            self.coalesced += 1
+            return True
+        if len(self._pending) >= self.maxsize:
+            self.dropped += 1
+            return False
+        self._pending[item_key] = value
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, OrderedDict()
+            self.flushes += 1
+
+            grouped: Dict[str, List[Any]] = {}
+            for (kind, _), value in batch.items():
+                grouped.setdefault(kind, []).append(value)
+
+            for kind, values in grouped.items():
+                for i in range(0, len(values), self.max_batch):
+                    chunk = values[i:i + self.max_batch]
+                    try:
+                        await self._writers[kind](chunk)
+                        self.written += len(chunk)
+                    except Exception as e:
+                        self.failed += len(chunk)
+                        print(f"[ERROR] {self.name} {kind} 쓰기 {len(chunk)}건 실패: {e}")
+            return len(batch)
+
+    async def run_forever(self) -> None:
+        while not self._stopped:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wakeup.set()
+
+    def stats(self) -> dict:
+        depth: Dict[str, int] = {}
+        for kind, _ in self._pending:
+            depth[kind] = depth.get(kind, 0) + 1
+        return {
+            "name": self.name,
+            "depth": len(self._pending),
+            "depth_by_kind": depth,
+            "maxsize": self.maxsize,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
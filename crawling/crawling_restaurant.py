@@ -10,6 +10,9 @@ import random
 import pyshorteners
 import os
 import pytz
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 프로젝트 루트 (core 패키지)
+from core.invalidation import notify_restaurant_updated
 
 start_time = time.time()
 s = pyshorteners.Shortener()
@@ -536,6 +539,7 @@ def process_tab():
 
                     if response.data:
                         log_message(f"{keyword} 데이터 삽입 성공")
+                        notify_restaurant_updated(r["place_id"] for r in deduped_results)
                     else:
                         log_message(f"응답 데이터 없음")
                 except Exception as e:
@@ -551,6 +555,7 @@ def process_tab():
 
                     if response.data:
                         log_message(f"{keyword} 키워드 데이터 삽입 성공")
+                        notify_restaurant_updated(k["place_id"] for k in deduped_keywords)
                     else:
                         log_message(f"키워드 응답 데이터 없음")
                 except Exception as e:
@@ -0,0 +1,79 @@
+import asyncio
+import random
+import os
+import pytz
+from datetime import datetime
+from supabase import create_client, Client
+from dotenv import load_dotenv
+from core import http_client
+from core.business_hours import load_business_hours
+from core.open_hours import build_intervals
+
+# 실행: 프로젝트 루트에서 python -m filldata.fill_business_hours
+# pcmap 영업시간(businessHours/breakHours/lastOrderTimes)을 긁어서 business_hours_interval 테이블에 주간 분 단위 구간으로 저장
+# 브레이크타임은 구간에서 빠지므로 그 시간에는 open_now에 나오지 않음
+# API 서버는 이 테이블만 읽어서 open_now / open_at 필터를 처리함 (요청 경로에서 크롤링 x)
+
+load_dotenv()
+
+SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
+SUPABASE_ANON_API_KEY = os.getenv("SUPABASE_ANON_API_KEY")
+
+# supabase 클라이언트 생성
+supabase: Client = create_client(SUPABASE_PROJECT_URL, SUPABASE_ANON_API_KEY)
+
+def log_message(msg: str):
+    print(f"[{datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
+
+# 가게 하나의 구간을 통째로 교체 (replace_business_hours_intervals RPC, 한 트랜잭션에서 delete + insert)
+def replace_intervals(place_id: str, rows: list):
+    supabase.rpc("replace_business_hours_intervals", {"p_place_id": place_id, "p_rows": rows}).execute()
+
+async def fill_business_hours():
+    batch_size = 1000
+    offset = 0
+
+    while True:
+        # 1. Supabase에서 batch_size만큼 place_id 가져오기
+        query = supabase.table("restaurant")\
+                .select("place_id")\
+                .order("place_id")\
+                .range(offset, offset + batch_size - 1)\
+                .execute()
+
+        if not query.data:  # 데이터 없으면 종료
+            log_message("✅ 모든 place_id 처리 완료")
+            break
+
+        place_ids = [item["place_id"] for item in query.data]
+        log_message(f"📦 Batch {offset // batch_size + 1} → {len(place_ids)}개 place_id 조회됨")
+
+        # 2. 영업시간 크롤링 → 구간 변환 → 저장
+        for i, pid in enumerate(place_ids, start=1):
+            try:
+                hours = await load_business_hours(pid, with_breaks=True)
+            except Exception as e:
+                log_message(f"[{i}/{len(place_ids)}] place_id {pid} ⚠️ 영업시간 요청 실패: {e}")
+                await asyncio.sleep(random.uniform(1.5, 3.0))
+                continue
+
+            rows = build_intervals(hours)
+            try:
+                replace_intervals(pid, rows)
+                log_message(f"[{i}/{len(place_ids)}] place_id {pid} ✅ 구간 {len(rows)}개 저장")
+            except Exception as e:
+                log_message(f"[{i}/{len(place_ids)}] place_id {pid} ❌ 저장 실패: {e}")
+
+            await asyncio.sleep(random.uniform(1.5, 3.0))  # API 부담 줄이기
+
+        # 3. 다음 배치로 이동
+        offset += batch_size
+
+async def main():
+    try:
+        await fill_business_hours()
+    finally:
+        await http_client.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())
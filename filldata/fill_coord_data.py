@@ -8,6 +8,9 @@ from datetime import datetime
 import pytz
 from dotenv import load_dotenv
 from datetime import datetime
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 프로젝트 루트 (core 패키지)
+from core.invalidation import notify_restaurant_updated
 
 load_dotenv()
 
@@ -166,6 +169,7 @@ def update_missing_coordinates():
         log_message(f"📦 Batch {offset // batch_size + 1} → {len(place_ids)}개 place_id 조회됨")
 
         # 2. 데이터 처리
+        updated_ids = []
         for i, pid in enumerate(place_ids, start=1):
             info = fetch_data(pid)
             if "error" not in info:
@@ -188,11 +192,15 @@ def update_missing_coordinates():
                     log_message(f"[{i}/{len(place_ids)}] place_id {pid} ❌ 업데이트 실패")
                 else:
                     log_message(f"[{i}/{len(place_ids)}] place_id {pid} ✅ 업데이트 완료")
+                    updated_ids.append(pid)
             else:
                 log_message(f"[{i}/{len(place_ids)}] place_id {pid} ⚠️ 재수집 실패")
 
             time.sleep(random.uniform(1.5, 3.0))  # API 부담 줄이기
 
+        # API 서버의 식당 상세 캐시 무효화
+        notify_restaurant_updated(updated_ids)
+
         # 3. 다음 배치로 이동
         offset += batch_size
 
@@ -8,6 +8,9 @@ from datetime import datetime
 import pytz
 from dotenv import load_dotenv
 from datetime import datetime
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 프로젝트 루트 (core 패키지)
+from core.invalidation import notify_restaurant_updated
 
 load_dotenv()
 
@@ -174,6 +177,7 @@ def update_missing_coordinates():
         log_message(f"Batch {offset//limit + 1}: {len(place_ids)}개 place_id 조회됨")
         total_count += len(place_ids)
 
+        updated_ids = []
         for i, pid in enumerate(place_ids, start=1):
             info = fetch_data(pid)
             if "error" not in info:
@@ -211,11 +215,18 @@ def update_missing_coordinates():
                 else:
                     log_message(f"[{offset+i}/{total_count}] {pid} 키워드 업서트 완료")
 
+                # 실제로 바뀐 식당만 상세 캐시 무효화 대상
+                if response.data is not None or response2.data is not None:
+                    updated_ids.append(pid)
+
             else:
                 log_message(f"[{offset+i}/{total_count}] {pid} 재수집 실패")
 
             time.sleep(random.uniform(1.5, 3.0))
 
+        # API 서버의 식당 상세 캐시 무효화
+        notify_restaurant_updated(updated_ids)
+
         offset += limit  # 다음 페이지로 이동
 
 if __name__ == "__main__":
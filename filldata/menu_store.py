@@ -8,6 +8,9 @@ from datetime import datetime
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 프로젝트 루트 (core 패키지)
+from core.invalidation import notify_restaurant_updated
 
 load_dotenv()
 
@@ -197,6 +200,9 @@ def insert_menu_data(place_id, menu_data):
         else:
             print(f"✅ 메뉴판 이미지 저장 성공: {place_id}_{idx}")
 
+    # API 서버의 식당 상세 캐시 무효화 (menu, menu_board 변경)
+    notify_restaurant_updated([place_id])
+
 def main():
     # 메뉴 없는 place_id 목록 가져오기
     place_ids = get_place_ids_without_menu()
@@ -0,0 +1,111 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+import httpx
+
+from core.cache import TTLCache
+from core.negative_cache import NegativeCache
+
+# --------------------------------------
+# m.booking.naver.com GraphQL 공통 (KST 날짜, 에러, 조회 결과 캐시)
+# 메뉴 재고/일정은 날짜(KST)마다 달라지므로 캐시 key에 날짜를 넣고,
+# TTL도 자정을 넘기지 않게 잘라서 날짜가 바뀌면 자연스럽게 새로 조회
+# --------------------------------------
+KST = timezone(timedelta(hours=9))
+
+# 조회 결과 캐시 TTL 상한 (단위: 초 / 개), 실제 TTL은 자정(KST)까지 남은 시간과 비교해서 짧은 쪽
+# 메뉴는 재고(remainStock)로 거르기 때문에 slot/카테고리보다 짧게 유지
+BOOKING_SLOT_CACHE_TTL = int(os.getenv("BOOKING_SLOT_CACHE_TTL", str(6 * 3600)))
+BOOKING_MENU_CACHE_TTL = int(os.getenv("BOOKING_MENU_CACHE_TTL", "600"))
+BOOKING_CACHE_MAXSIZE = int(os.getenv("BOOKING_CACHE_MAXSIZE", "5000"))
+BOOKING_CACHE_MAX_BYTES = int(os.getenv("BOOKING_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# 메뉴가 없었던 가게를 다시 조회하기까지의 시간 (연속으로 없으면 두 배씩, 최대 BOOKING_NEGATIVE_MAX_TTL, 자정(KST)은 넘기지 않음)
+BOOKING_NEGATIVE_TTL = int(os.getenv("BOOKING_NEGATIVE_TTL", "300"))
+BOOKING_NEGATIVE_MAX_TTL = int(os.getenv("BOOKING_NEGATIVE_MAX_TTL", str(6 * 3600)))
+BOOKING_NEGATIVE_MAXSIZE = int(os.getenv("BOOKING_NEGATIVE_MAXSIZE", "20000"))
+
+# 메뉴가 없는 사유
+HTTP_ERROR = "http_error"          # booking GraphQL 호출 실패
+EMPTY_SCHEDULE = "empty_schedule"  # 오늘 주문 가능한 메뉴(일정/재고)가 없음, menuGroups는 메뉴 자체가 없음
+NO_CATEGORIES = "no_categories"    # 메뉴는 있지만 오늘 slot의 카테고리에 속한 메뉴가 없음
+
+
+# upstream이 200이 아니거나 호출 자체가 실패한 경우 (빈 결과와 구분해서 캐싱하지 않기 위함)
+class BookingGraphQLError(Exception):
+    pass
+
+
+# 오늘 날짜(KST), 장시간 떠 있는 워커에서도 호출할 때마다 계산
+def today_kst() -> str:
+    return datetime.now(KST).strftime("%Y-%m-%d")
+
+
+def seconds_until_kst_midnight() -> float:
+    now = datetime.now(KST)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+# 빈 값은 캐싱하지 않고, 나머지는 limit과 자정까지 남은 시간 중 짧은 쪽만큼 캐싱
+def day_ttl(limit: float) -> Callable[[Any], float]:
+    return lambda value: min(limit, seconds_until_kst_midnight()) if value else 0
+
+
+# (booking_id, naverorder_id, 날짜) -> slot_id
+slot_cache = TTLCache("booking_slot", ttl=BOOKING_SLOT_CACHE_TTL, maxsize=BOOKING_CACHE_MAXSIZE, sizeof=lambda v: 0)
+# (booking_id, naverorder_id, slot_id) -> 유효한 categoryId 목록
+category_ids_cache = TTLCache(
+    "booking_category_ids",
+    ttl=BOOKING_SLOT_CACHE_TTL,
+    maxsize=BOOKING_CACHE_MAXSIZE,
+    max_bytes=BOOKING_CACHE_MAX_BYTES,
+)
+# (booking_id, naverorder_id, 날짜) -> 오늘 주문 가능한 메뉴 목록 (place_id를 붙이기 전)
+menu_cache = TTLCache(
+    "booking_menu",
+    ttl=BOOKING_MENU_CACHE_TTL,
+    maxsize=BOOKING_CACHE_MAXSIZE,
+    max_bytes=BOOKING_CACHE_MAX_BYTES,
+)
+
+# menuGroups 조회 single-flight용 (결과는 캐싱하지 않고, 같은 가게를 동시에 조회한 요청만 upstream 호출 한 번으로 합침)
+menu_groups_loads = TTLCache("booking_menu_groups", ttl=0, maxsize=BOOKING_CACHE_MAXSIZE, sizeof=lambda v: 0)
+
+# (파이프라인, place_id, booking_id, naverorder_id) -> 메뉴가 없었던 사유
+# 파이프라인(menu / menu_groups)별로 따로 기록해서 menu가 비어도 menuGroups 대체 조회는 막지 않음
+negative_cache = NegativeCache(
+    "booking_no_menu",
+    ttl=BOOKING_NEGATIVE_TTL,
+    max_ttl=BOOKING_NEGATIVE_MAX_TTL,
+    maxsize=BOOKING_NEGATIVE_MAXSIZE,
+)
+
+
+# asyncio.gather(..., return_exceptions=True) 결과가 upstream 호출 실패인지 확인
+# BookingGraphQLError / httpx 에러만 실패로 보고, 취소(CancelledError)나 코드 버그는 그대로 다시 raise
+def is_upstream_failure(result: Any) -> bool:
+    if not isinstance(result, BaseException):
+        return False
+    if isinstance(result, (BookingGraphQLError, httpx.HTTPError)):
+        return True
+    raise result
+
+
+# 메뉴를 못 얻었으면 사유를 기록하고, 얻었으면 연속 실패 기록을 지움
+def record_menu_result(key: tuple, reason: Optional[str]) -> None:
+    if reason is None:
+        negative_cache.clear(key)
+        return
+    retry_in = negative_cache.record(key, reason, cap=seconds_until_kst_midnight())
+    print(f"[INFO] {key[0]} 메뉴 없음 ({reason}), {int(retry_in)}초 뒤 다시 조회: {key[1:]}")
+
+
+def stats() -> dict:
+    return {
+        "slot": slot_cache.stats(),
+        "category_ids": category_ids_cache.stats(),
+        "menu": menu_cache.stats(),
+        "menu_groups": menu_groups_loads.stats(),
+        "no_menu": negative_cache.stats(),
+    }
@@ -1,11 +1,13 @@
 import random
-import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
-from datetime import datetime
-import time
+from typing import Optional
 import json
+from core import http_client
+from core.stage_timer import StageTimer
+from graphql.booking import BookingGraphQLError, category_ids_cache, day_ttl, slot_cache, today_kst, BOOKING_SLOT_CACHE_TTL
+from graphql.orderBizItemSchedule import get_slot_id
 
 # 환경 변수 로드
 load_dotenv()
@@ -18,8 +20,6 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 12_3) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
 ]
 
-today_str = datetime.now().strftime("%Y-%m-%d")
-
 # 재귀적으로 categoryId 뽑아내기
 def extract_category_ids(category):
     ids = []
@@ -39,7 +39,7 @@ def get_booking_id():
         .execute()
     return response.data or []
 
-# 2. GraphQL 호출로 카테고리 가져오기
+# 2. GraphQL 호출로 카테고리 가져오기 (호출이 실패하면 BookingGraphQLError)
 async def fetch_categories_graphql(place_id: str, booking_id: str, naverorder_id: str, slot_id: str):
     url = "https://m.booking.naver.com/graphql?opName=categories"
 
@@ -48,7 +48,6 @@ async def fetch_categories_graphql(place_id: str, booking_id: str, naverorder_id
         "method": "POST",
         "scheme": "https",
         "accept": "*/*",
-        "accept-encoding": "identity",
         "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         "content-type": "application/json",
         "origin": "https://m.booking.naver.com",
@@ -115,24 +114,43 @@ async def fetch_categories_graphql(place_id: str, booking_id: str, naverorder_id
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(url, headers=headers, json=payload, timeout=10)
-            if resp.status_code != 200:
-                print(f"❌ 요청 실패: HTTP {resp.status_code}")
-                return []
-
-            data = resp.json()
-            category_list = data.get("data", {}).get("categories", [])
-            
-            # flatten categoryId만 뽑기
-            all_ids = []
-            for c in category_list:
-                all_ids.extend(extract_category_ids(c))
-
-            return all_ids
+        resp = await http_client.post(url, headers=headers, json=payload, timeout=10)
+        if resp.status_code != 200:
+            print(f"❌ 요청 실패: HTTP {resp.status_code}")
+            raise BookingGraphQLError(f"categories: HTTP {resp.status_code}")
+
+        data = resp.json()
+        category_list = data.get("data", {}).get("categories", [])
+        
+        # flatten categoryId만 뽑기
+        all_ids = []
+        for c in category_list:
+            all_ids.extend(extract_category_ids(c))
+
+        return all_ids
+    except BookingGraphQLError:
+        raise
     except Exception as e:
         print(f"⚠️ GraphQL 호출 실패: {e}")
-        return []
+        raise BookingGraphQLError(f"categories: {e}") from e
+
+# slot 조회 → 카테고리 조회 순서로 실행해서 유효한 categoryId 목록 반환 (slot이 없으면 None)
+# 메뉴 조회와는 의존성이 없어서 호출하는 쪽에서 메뉴 조회와 동시에 실행
+# 두 조회 모두 (booking_id, naverorder_id, 날짜) 기준으로 캐싱 (빈 결과와 실패는 캐싱하지 않음)
+async def fetch_valid_category_ids(place_id: str, booking_id: str, naverorder_id: str, timer: StageTimer, day: Optional[str] = None):
+    day = day or today_kst()
+    slot_id = await timer.run("slot", slot_cache.get_or_load(
+        (booking_id, naverorder_id, day),
+        lambda: get_slot_id(place_id, booking_id, naverorder_id, day),
+        ttl=day_ttl(BOOKING_SLOT_CACHE_TTL),
+    ))
+    if not slot_id:
+        return None
+    return await timer.run("categories", category_ids_cache.get_or_load(
+        (booking_id, naverorder_id, day, slot_id),
+        lambda: fetch_categories_graphql(place_id, booking_id, naverorder_id, slot_id),
+        ttl=day_ttl(BOOKING_SLOT_CACHE_TTL),
+    ))
 
 # 3. 메인 함수
 # def main():
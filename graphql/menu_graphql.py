@@ -1,13 +1,16 @@
+import asyncio
 import random
-import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
-from datetime import datetime
-import asyncio
-from graphql.categories_graphql import fetch_categories_graphql
-from graphql.orderBizItemSchedule import get_slot_id
-from datetime import datetime, timedelta, timezone
+from typing import Optional
+from core import http_client
+from core.stage_timer import StageStats
+from graphql.booking import (
+    BookingGraphQLError, day_ttl, is_upstream_failure, menu_cache, negative_cache, record_menu_result, today_kst,
+    BOOKING_MENU_CACHE_TTL, EMPTY_SCHEDULE, HTTP_ERROR, NO_CATEGORIES,
+)
+from graphql.categories_graphql import fetch_valid_category_ids
 
 # 환경 변수 로드
 load_dotenv()
@@ -15,9 +18,9 @@ SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
 SUPABASE_ANON_API_KEY = os.getenv("SUPABASE_ANON_API_KEY")
 supabase: Client = create_client(SUPABASE_PROJECT_URL, SUPABASE_ANON_API_KEY)
 
-# 오늘 날짜(KST)
-KST = timezone(timedelta(hours=9))
-today_kst_str = datetime.now(KST).strftime("%Y-%m-%d")
+# 메뉴 수집 단계별 소요 시간 (전체가 MENU_FETCH_SLOW_MS 이상이면 로그, 0이면 끔)
+MENU_FETCH_SLOW_MS = float(os.getenv("MENU_FETCH_SLOW_MS", "3000"))
+menu_fetch_stats = StageStats("menu_fetch", slow_ms=MENU_FETCH_SLOW_MS)
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
@@ -49,22 +52,22 @@ def deduplicate_menus(menus: list):
             unique_menus.append(m)
     return unique_menus
 
-# 2. 메뉴 유효 여부 체크
-def is_valid_menu(menu: dict) -> bool:
-    schedules = menu.get("schedules", {})
-    today_schedule = schedules.get(today_kst_str)
+# 2. 메뉴 유효 여부 체크 (day: KST 날짜)
+def is_valid_menu(menu: dict, day: str) -> bool:
+    schedules = menu.get("schedules") or {}
+    today_schedule = schedules.get(day)
     if not today_schedule:
         return False
     stock = today_schedule.get("stock", 0)
     remain = today_schedule.get("remainStock", 0)
     return stock > 0 and remain > 0
 
-# 4. 메뉴 가져오기
-def fetch_menu_graphql(place_id: str, booking_id: str, naverorder_id: str):
+# 4. 메뉴 가져오기 (day 기준으로 주문 가능한 메뉴만, 호출이 실패하면 BookingGraphQLError)
+async def fetch_menu_graphql(place_id: str, booking_id: str, naverorder_id: str, day: Optional[str] = None):
+    day = day or today_kst()
     url = "https://m.booking.naver.com/graphql?opName=menu"
     headers = {
         "accept": "*/*",
-        "accept-encoding": "identity",
         "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         "content-type": "application/json",
         "origin": "https://m.booking.naver.com",
@@ -99,23 +102,25 @@ def fetch_menu_graphql(place_id: str, booking_id: str, naverorder_id: str):
     }
 
     try:
-        resp = httpx.post(url, headers=headers, json=payload, timeout=10)
+        resp = await http_client.post(url, headers=headers, json=payload, timeout=10)
         if resp.status_code != 200:
             print(f"❌ 메뉴 요청 실패: HTTP {resp.status_code}")
-            return []
+            raise BookingGraphQLError(f"menu: HTTP {resp.status_code}")
 
         data = resp.json()
         menu_list = data.get("data", {}).get("menu", {}).get("menus", [])
         menus = []
 
         for idx, m in enumerate(menu_list):
-            if is_valid_menu(m):
+            if is_valid_menu(m, day):
                 menus.append(m)
 
         return menus
+    except BookingGraphQLError:
+        raise
     except Exception as e:
         print(f"⚠️ 메뉴 GraphQL 실패: {e}")
-        return []
+        raise BookingGraphQLError(f"menu: {e}") from e
 
 # 5. 카테고리 기반 메뉴 필터링
 def filter_menus_by_category(menu_list: list, valid_category_ids: list):
@@ -126,27 +131,73 @@ def filter_menus_by_category(menu_list: list, valid_category_ids: list):
             filtered.append(menu)
     return filtered
 
-# 여기가 메인이지
-async def fetch_menu_for_place(place_id: str, booking_id: str, naverorder_id: str):
-    slot_id = get_slot_id(place_id, booking_id, naverorder_id)
+# slot → categories 조회와 menu 조회는 서로 의존성이 없어서 동시에 실행
+# 반환: {"menus": place_id를 붙이기 전 메뉴 목록, "complete": 모든 단계가 성공했는지, "reason": 메뉴가 없으면 사유}
+# 카테고리 조회만 실패하면 예전처럼 카테고리 필터 없이 돌려주되 캐싱하지 않음
+async def load_menus(place_id: str, booking_id: str, naverorder_id: str, day: str):
+    timer = menu_fetch_stats.timer(place_id)
+    valid_category_ids, menus = await asyncio.gather(
+        fetch_valid_category_ids(place_id, booking_id, naverorder_id, timer, day),
+        timer.run("menu", fetch_menu_graphql(place_id, booking_id, naverorder_id, day)),
+        return_exceptions=True,
+    )
+    timer.finish()
+    category_failed = is_upstream_failure(valid_category_ids)
+    if is_upstream_failure(menus):
+        raise menus
+
+    complete = not category_failed
+    reason = EMPTY_SCHEDULE if not menus else None
+    if complete and valid_category_ids:
+        menus = filter_menus_by_category(menus, valid_category_ids)
+        if not menus and reason is None:
+            reason = NO_CATEGORIES
 
-    valid_category_ids = None
+    menus = deduplicate_menus(menus)
 
-    if slot_id:
-        valid_category_ids = await fetch_categories_graphql(place_id, booking_id, naverorder_id, slot_id)
-    
-    menus = await asyncio.to_thread(fetch_menu_graphql, place_id, booking_id, naverorder_id) or []
+    return {
+        "complete": complete,
+        "reason": reason,
+        "menus": [{
+            "menu_name": m.get("name", "").strip(),
+            "menu_price": int(float(m["price"])) if m.get("price") not in (None, "") else 0,
+            "description": m.get("desc", ""),
+            "image_url": m.get("titleImageUrl", ""),
+        } for m in menus],
+    }
 
-    if slot_id and valid_category_ids:
-        menus = filter_menus_by_category(menus, valid_category_ids)
+_menu_ttl = day_ttl(BOOKING_MENU_CACHE_TTL)
 
-    menus = deduplicate_menus(menus)
+# upstream 조회 한 번에 결과를 한 번만 기록 (같은 load를 기다린 요청 수만큼 실패 횟수가 늘지 않도록 loader 안에서 기록)
+async def load_and_record_menus(negative_key: tuple, place_id: str, booking_id: str, naverorder_id: str, day: str):
+    try:
+        result = await load_menus(place_id, booking_id, naverorder_id, day)
+    except BookingGraphQLError:
+        record_menu_result(negative_key, HTTP_ERROR)
+        raise
+    record_menu_result(negative_key, result["reason"])
+    return result
+
+# 여기가 메인이지
+# (booking_id, naverorder_id, 오늘 날짜) 기준으로 캐싱, 같은 가게를 동시에 조회하면 upstream 호출은 한 번만
+# 메뉴가 없었던 가게는 재조회 시각 전까지 upstream을 호출하지 않고 바로 빈 목록 반환
+async def fetch_menu_for_place(place_id: str, booking_id: str, naverorder_id: str):
+    negative_key = ("menu", place_id, booking_id, naverorder_id)
+    if negative_cache.get(negative_key):
+        return []
+
+    day = today_kst()
+    try:
+        result = await menu_cache.get_or_load(
+            (booking_id, naverorder_id, day),
+            lambda: load_and_record_menus(negative_key, place_id, booking_id, naverorder_id, day),
+            ttl=lambda r: _menu_ttl(r["menus"]) if r["complete"] else 0,
+        )
+    except BookingGraphQLError:
+        return []
 
     return [{
         "menu_id": f"{place_id}_{idx}",
         "place_id": place_id,
-        "menu_name": m.get("name", "").strip(),
-        "menu_price": int(float(m["price"])) if m.get("price") not in (None, "") else 0,
-        "description": m.get("desc", ""),
-        "image_url": m.get("titleImageUrl", ""),
-    } for idx, m in enumerate(menus)]
+        **m,
+    } for idx, m in enumerate(result["menus"])]
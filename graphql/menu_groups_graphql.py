@@ -1,17 +1,17 @@
-import random
-import httpx
-from supabase import create_client, Client
-from dotenv import load_dotenv
-import os
 import asyncio
-from graphql.categories_graphql import fetch_categories_graphql
-from graphql.orderBizItemSchedule import get_slot_id
-
-# 환경 변수 로드
-load_dotenv()
-SUPABASE_PROJECT_URL = os.getenv("SUPABASE_PROJECT_URL")
-SUPABASE_ANON_API_KEY = os.getenv("SUPABASE_ANON_API_KEY")
-supabase: Client = create_client(SUPABASE_PROJECT_URL, SUPABASE_ANON_API_KEY)
+import os
+import random
+from core import http_client, db
+from core.stage_timer import StageStats
+from graphql.booking import (
+    BookingGraphQLError, is_upstream_failure, menu_groups_loads, negative_cache, record_menu_result,
+    EMPTY_SCHEDULE, HTTP_ERROR, NO_CATEGORIES,
+)
+from graphql.categories_graphql import fetch_valid_category_ids
+
+# menuGroups 수집 단계별 소요 시간 (전체가 MENU_FETCH_SLOW_MS 이상이면 로그, 0이면 끔)
+MENU_FETCH_SLOW_MS = float(os.getenv("MENU_FETCH_SLOW_MS", "3000"))
+menu_groups_fetch_stats = StageStats("menu_groups_fetch", slow_ms=MENU_FETCH_SLOW_MS)
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
@@ -43,13 +43,12 @@ def deduplicate_menus(menus: list):
             unique_menus.append(m)
     return unique_menus
 
-def get_restaurant_by_place_id(place_id: str):
-    res = (
-        supabase.table("restaurant")
+async def get_restaurant_by_place_id(place_id: str):
+    res = await db.execute(
+        db.supabase.table("restaurant")
         .select("place_id, booking_id, naverorder_id")
         .eq("place_id", place_id)
         .single()
-        .execute()
     )
     return res.data if res.data else None
 
@@ -64,11 +63,11 @@ def filter_menus_by_category(menu_list: list, valid_category_ids: list):
             filtered.append(menu)
     return filtered
 
-def fetch_menu_groups(place_id: str, booking_id: str, naverorder_id: str):
+# 호출이 실패하면 BookingGraphQLError
+async def fetch_menu_groups(place_id: str, booking_id: str, naverorder_id: str):
     url = "https://m.booking.naver.com/graphql?opName=menuGroups"
     headers = {
         "accept": "*/*",
-        "accept-encoding": "identity",
         "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         "content-type": "application/json",
         "origin": "https://m.booking.naver.com",
@@ -107,12 +106,12 @@ def fetch_menu_groups(place_id: str, booking_id: str, naverorder_id: str):
     }
 
     try:
-        resp = httpx.post(url, headers=headers, json=payload, timeout=10)
+        resp = await http_client.post(url, headers=headers, json=payload, timeout=10)
         resp.raise_for_status()
         data = resp.json()
     except Exception as e:
         print(f"⚠️ GraphQL 호출 실패: {e}")
-        return []
+        raise BookingGraphQLError(f"menuGroups: {e}") from e
 
     menu_groups = data.get("data", {}).get("menuGroups", [])
     if not menu_groups:
@@ -132,26 +131,47 @@ def fetch_menu_groups(place_id: str, booking_id: str, naverorder_id: str):
         })
     return menus
 
+# slot → categories 조회와 menuGroups 조회를 동시에 실행하고, 결과(메뉴 없음 사유)는 upstream 조회 한 번에 한 번만 기록
+async def load_menu_groups(place_id: str, booking_id: str, naverorder_id: str, negative_key: tuple, timer):
+    valid_category_ids, menus = await asyncio.gather(
+        fetch_valid_category_ids(place_id, booking_id, naverorder_id, timer),
+        timer.run("menu_groups", fetch_menu_groups(place_id, booking_id, naverorder_id)),
+        return_exceptions=True,
+    )
+    category_failed = is_upstream_failure(valid_category_ids)
+    if is_upstream_failure(menus):
+        record_menu_result(negative_key, HTTP_ERROR)
+        return []
+
+    # 카테고리 조회가 실패하면 카테고리 필터 없이 반환
+    reason = EMPTY_SCHEDULE if not menus else None
+    if valid_category_ids and not category_failed:
+        menus = filter_menus_by_category(menus, valid_category_ids)
+        if not menus and reason is None:
+            reason = NO_CATEGORIES
+    record_menu_result(negative_key, reason)
+
+    return deduplicate_menus(menus)
+
+# booking id 조회 후 메뉴 조회, 같은 가게를 동시에 조회하면 upstream 호출은 한 번만
+# 메뉴가 없었던 가게는 재조회 시각 전까지 upstream을 호출하지 않고 바로 빈 목록 반환
 async def fetch_menu_groups_for_place(place_id: str):
-    restaurant = get_restaurant_by_place_id(place_id)
+    timer = menu_groups_fetch_stats.timer(place_id)
+    restaurant = await timer.run("restaurant", get_restaurant_by_place_id(place_id))
     if not restaurant:
         print(f"❌ place_id {place_id} 해당 데이터 없음")
         return []
 
     booking_id = restaurant["booking_id"]
     naverorder_id = restaurant["naverorder_id"]
-    slot_id = get_slot_id(place_id, booking_id, naverorder_id)
-
-    valid_category_ids = None
-
-    if slot_id:
-        valid_category_ids = await fetch_categories_graphql(place_id, booking_id, naverorder_id, slot_id)
-
-    menus = await asyncio.to_thread(fetch_menu_groups, place_id, booking_id, naverorder_id) or []
+    negative_key = ("menu_groups", place_id, booking_id, naverorder_id)
+    if negative_cache.get(negative_key):
+        return []
 
-    if slot_id and valid_category_ids:
-        menus = filter_menus_by_category(menus, valid_category_ids)
-    
-    menus = deduplicate_menus(menus)
+    menus = await menu_groups_loads.get_or_load(
+        negative_key,
+        lambda: load_menu_groups(place_id, booking_id, naverorder_id, negative_key, timer),
+    )
+    timer.finish()
 
     return menus
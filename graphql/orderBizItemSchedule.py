@@ -1,9 +1,10 @@
 import random
-import httpx
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from datetime import date
+from typing import Optional
 import os
+from core import http_client
+from graphql.booking import BookingGraphQLError, today_kst
 
 # 환경 변수 로드
 load_dotenv()
@@ -33,8 +34,9 @@ def get_booking_id():
         .execute()
     return response.data or []
 
-# 2. GraphQL 호출로 카테고리 가져오기
-def get_slot_id(place_id: str, booking_id: str, naverorder_id: str):
+# 2. GraphQL 호출로 slot_id 가져오기 (day: KST 날짜, 없으면 오늘)
+# 오늘 일정이 없으면 None, 호출이 실패하면 BookingGraphQLError
+async def get_slot_id(place_id: str, booking_id: str, naverorder_id: str, day: Optional[str] = None):
     url = "https://m.booking.naver.com/graphql?opName=orderBizItemSchedule"
 
     headers = {
@@ -42,7 +44,6 @@ def get_slot_id(place_id: str, booking_id: str, naverorder_id: str):
         "method": "POST",
         "scheme": "https",
         "accept": "*/*",
-        "accept-encoding": "identity",
         "accept-language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         "content-type": "application/json",
         "origin": "https://m.booking.naver.com",
@@ -65,7 +66,7 @@ def get_slot_id(place_id: str, booking_id: str, naverorder_id: str):
                 "businessId": booking_id,
                 "bizItemId": naverorder_id,
                 "fallback": {
-                    "nextStartDate": date.today().isoformat()
+                    "nextStartDate": day or today_kst()
                 }
             }
         },
@@ -100,22 +101,23 @@ def get_slot_id(place_id: str, booking_id: str, naverorder_id: str):
     }
 
     try:
-        with httpx.Client() as client:
-            resp = client.post(url, headers=headers, json=payload)
+        resp = await http_client.post(url, headers=headers, json=payload)
 
-            if resp.status_code != 200:
-                print(f"요청 실패: HTTP {resp.status_code}")
-                return None
-            
-            data = resp.json()
-            schedules = data.get("data", {}).get("orderBizItemSchedule", {}).get("schedule", [])
-            
-            if not schedules:
-                return None
+        if resp.status_code != 200:
+            print(f"요청 실패: HTTP {resp.status_code}")
+            raise BookingGraphQLError(f"orderBizItemSchedule: HTTP {resp.status_code}")
+        
+        data = resp.json()
+        schedules = data.get("data", {}).get("orderBizItemSchedule", {}).get("schedule", [])
+        
+        if not schedules:
+            return None
 
-            slot_id = schedules.get("slotId")
-            return slot_id
+        slot_id = schedules.get("slotId")
+        return slot_id
 
+    except BookingGraphQLError:
+        raise
     except Exception as e:
         print(f"❌ [ERROR] orderBizItemSchedule 호출 실패: {e}")
-        return None
+        raise BookingGraphQLError(f"orderBizItemSchedule: {e}") from e
@@ -0,0 +1,26 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# action 이벤트 하나 (kind, action_type은 서버에서 검증해서 잘못된 이벤트만 rejected로 응답)
+class ActionEvent(BaseModel):
+    kind: str = Field(..., description="restaurant 또는 activity")
+    place_id: str = Field(..., description="식당/장소 ID")
+    action_type: str = Field(..., description="액션 타입(view, click, like, dislike)")
+    ts: Optional[datetime] = Field(None, description="발생 시각 (ISO 8601, 시간대 없으면 KST, 없으면 서버 수신 시각)")
+    event_id: Optional[str] = Field(None, max_length=64, description="클라이언트 이벤트 ID (재전송 시 중복 반영 방지)")
+
+# action 일괄 기록 요청 바디 모델
+class ActionBatchRequest(BaseModel):
+    events: List[ActionEvent] = Field(..., min_length=1, max_length=200, description="action 이벤트 목록")
+
+# 반영하지 않은 이벤트 (요청 내 위치와 이유)
+class ActionEventResult(BaseModel):
+    index: int
+    reason: str
+
+# action 일괄 기록 응답 모델 (applied: 반영한 이벤트 위치)
+class ActionBatchResponse(BaseModel):
+    applied: List[int]
+    skipped: List[ActionEventResult]
+    rejected: List[ActionEventResult]
@@ -16,6 +16,9 @@ class SignupResponse(BaseModel):
     nickname: str
     birth: str
     is_guest: bool
+    access_token: str = Field(..., description="서명된 세션 토큰 (Authorization: Bearer 헤더로 전달)")
+    token_type: str = "bearer"
+    expires_at: int = Field(..., description="토큰 만료 시각 (unix time)")
 
 # 로그인 요청 모델
 class LoginRequest(BaseModel):
@@ -28,4 +31,7 @@ class LoginResponse(BaseModel):
     email: EmailStr
     nickname: str
     birth: str
-    is_guest: bool
\ No newline at end of file
+    is_guest: bool
+    access_token: str = Field(..., description="서명된 세션 토큰 (Authorization: Bearer 헤더로 전달)")
+    token_type: str = "bearer"
+    expires_at: int = Field(..., description="토큰 만료 시각 (unix time)")
\ No newline at end of file
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+# 캐시 무효화 요청 바디 모델 (크롤러/filldata upsert 후 호출)
+class CacheInvalidateRequest(BaseModel):
+    place_ids: List[str] = Field(..., description="변경된 place_id 목록")
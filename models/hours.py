@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+
+# 영업시간 일괄 조회 요청 바디 모델
+class BusinessHoursBatchRequest(BaseModel):
+    business_ids: List[str] = Field(..., min_length=1, max_length=100, description="네이버 플레이스 가게 고유 ID 목록")
+
+# 영업시간 일괄 조회 응답 모델
+class BusinessHoursBatchResponse(BaseModel):
+    hours: Dict[str, List[Dict]] = Field(..., description="business_id -> 영업시간 리스트")
+    failed: List[str] = Field(default_factory=list, description="조회에 실패한 business_id 목록")
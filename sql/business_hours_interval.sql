@@ -0,0 +1,35 @@
+-- 가게별 영업시간을 주간 분(minute-of-week, 월 00:00 = 0 ~ 일 24:00 = 10080) 구간으로 정규화한 테이블
+-- filldata/fill_business_hours.py 가 채우고, API 서버는 시작 시/주기적으로 읽어서 메모리 인덱스로 사용
+create table if not exists business_hours_interval (
+    id bigint generated always as identity primary key,
+    place_id text not null,
+    start_minute integer not null check (start_minute between 0 and 10080),
+    end_minute integer not null check (end_minute between 0 and 10080),
+    last_order_minute integer check (last_order_minute between 0 and 10080),
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists business_hours_interval_place_id_idx
+    on business_hours_interval (place_id);
+
+-- 가게 하나의 구간을 한 트랜잭션에서 통째로 교체 (filldata/fill_business_hours.py가 호출)
+-- delete와 insert를 따로 호출하면 그 사이에 실패하거나 조회가 끼어들 때 구간이 없는 가게(= 영업 안 함)로 보임
+-- p_rows: [{ start_minute, end_minute, last_order_minute }, ...], 빈 배열이면 구간만 삭제
+create or replace function replace_business_hours_intervals(p_place_id text, p_rows jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    delete from business_hours_interval where place_id = p_place_id;
+
+    insert into business_hours_interval (place_id, start_minute, end_minute, last_order_minute, updated_at)
+    select p_place_id, r.start_minute, r.end_minute, r.last_order_minute, now()
+    from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb))
+        as r(start_minute integer, end_minute integer, last_order_minute integer);
+
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
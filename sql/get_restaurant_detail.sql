@@ -0,0 +1,33 @@
+-- 식당 상세(/restaurant/{place_id})를 한 번의 RPC로 조회
+-- 기존 4번의 호출(restaurant, get_menu_data, menu_board, place_keyword)과 같은 JSON 구조를 반환
+--   { "restaurant": {...}, "menu": [...], "menu_board": [{"image_url": ...}], "keywords": [...] }
+-- 예약(booking) 메뉴는 별도 테이블 없이 get_menu_data 결과에 포함되어 있으므로 그대로 재사용
+-- place_id가 없으면 null 반환
+create or replace function get_restaurant_detail(p_place_id text)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'restaurant', to_jsonb(r),
+        'menu', coalesce(
+            (select jsonb_agg(to_jsonb(m)) from get_menu_data(p_place_id) m),
+            '[]'::jsonb
+        ),
+        'menu_board', coalesce(
+            (select jsonb_agg(jsonb_build_object('image_url', mb.image_url))
+               from menu_board mb
+              where mb.place_id = p_place_id),
+            '[]'::jsonb
+        ),
+        'keywords', coalesce(
+            (select to_jsonb(pk.keywords)
+               from place_keyword pk
+              where pk.place_id = p_place_id
+              limit 1),
+            '[]'::jsonb
+        )
+    )
+    from restaurant r
+    where r.place_id = p_place_id;
+$$;
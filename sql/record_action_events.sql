@@ -0,0 +1,67 @@
+-- action 이벤트 멱등 반영 (app.py의 로컬 spool drainer, event_id가 있는 /action/batch가 호출)
+-- p_events: [{ event_id, kind, user_id, place_id, action_type, ts }, ...]
+--   kind: restaurant / activity, action_type: view / click / like / dislike
+-- action_event_log에 처음 들어온 event_id만 집계해서 (payload 안에서 겹치는 event_id는 한 번만) record_actions(sql/record_actions.sql)로 반영하므로
+-- drainer가 같은 이벤트를 다시 보내도(반영 후 spool 삭제 전에 종료된 경우 등) 한 번만 반영됨
+-- 반환값: 이번에 새로 반영한 이벤트 수
+
+create table if not exists action_event_log (
+    event_id   text primary key,
+    created_at timestamptz not null default now()
+);
+create index if not exists action_event_log_created_at_idx on action_event_log (created_at);
+
+-- 오래된 로그는 주기적으로 정리 (spool에 이벤트가 머무를 수 있는 기간보다 길게 유지)
+--   delete from action_event_log where created_at < now() - interval '7 days';
+
+create or replace function record_action_events(p_events jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+    v_restaurant jsonb;
+    v_activity jsonb;
+begin
+    -- payload 안에서 event_id가 겹치면 한 건만 남기고, action_event_log에 실제로 들어간 이벤트만 집계
+    with events as (
+        select distinct on (e.event_id) e.*
+        from jsonb_to_recordset(p_events)
+            as e(event_id text, kind text, user_id text, place_id text, action_type text, ts timestamptz)
+        order by e.event_id, e.ts
+    ),
+    inserted as (
+        insert into action_event_log (event_id)
+        select event_id from events
+        on conflict (event_id) do nothing
+        returning event_id
+    ),
+    fresh as (
+        select e.* from events e join inserted i on i.event_id = e.event_id
+    ),
+    agg as (
+        select
+            f.kind,
+            f.user_id,
+            f.place_id,
+            count(*) filter (where f.action_type = 'view') as view_count,
+            count(*) filter (where f.action_type = 'click') as click_count,
+            (array_agg(f.action_type order by f.ts desc) filter (where f.action_type in ('like', 'dislike')))[1] as feedback,
+            max(f.ts) as updated_at
+        from fresh f
+        group by f.kind, f.user_id, f.place_id
+    )
+    select
+        (select count(*) from fresh),
+        (select jsonb_agg(to_jsonb(a) - 'kind') from agg a where a.kind = 'restaurant'),
+        (select jsonb_agg(to_jsonb(a) - 'kind') from agg a where a.kind = 'activity')
+    into v_count, v_restaurant, v_activity;
+
+    if v_count = 0 then
+        return 0;
+    end if;
+
+    perform record_actions(v_restaurant, v_activity);
+    return v_count;
+end;
+$$;
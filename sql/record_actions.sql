@@ -0,0 +1,100 @@
+-- action 카운터 일괄 반영 (app.py의 write-behind 집계기가 주기적으로 한 번에 호출)
+-- p_restaurant / p_activity: [{ user_id, place_id, view_count, click_count, feedback, updated_at }, ...]
+--   view_count / click_count는 누적값이 아니라 이번에 더할 증가분
+--   feedback은 null이면 기존 값 유지, like/dislike면 교체
+-- 같은 (user_id, place_id)는 집계기에서 미리 합쳐서 보내므로 한 번의 insert 안에서 중복되지 않음
+
+-- 예전 select-then-insert 경합으로 같은 (user_id, place_id) row가 여러 개 생겼을 수 있어서
+-- unique index를 만들기 전에 한 트랜잭션 안에서 중복을 합침 (그 사이 새 row가 끼어들지 않도록 테이블 잠금)
+begin;
+
+lock table user_restaurant_action, user_activity_action in share row exclusive mode;
+
+-- user_restaurant_action: 중복 row를 (user_id, place_id)별로 하나로 합침
+--   view/click은 합계, feedback은 가장 최근에 바뀐 row의 값, updated_at은 가장 늦은 값을 남은 row 하나에 반영
+create temp table user_restaurant_action_dup on commit drop as
+select
+    user_id,
+    place_id,
+    (array_agg(ctid order by updated_at desc nulls last))[1] as keep_ctid,
+    sum(coalesce(view_count, 0)) as view_count,
+    sum(coalesce(click_count, 0)) as click_count,
+    (array_agg(feedback order by updated_at desc nulls last) filter (where feedback is not null))[1] as feedback,
+    max(updated_at) as updated_at
+from user_restaurant_action
+group by user_id, place_id
+having count(*) > 1;
+
+-- update하면 ctid가 바뀌므로 나머지 row를 먼저 지우고 남은 row를 갱신
+delete from user_restaurant_action t
+using user_restaurant_action_dup d
+where t.user_id = d.user_id and t.place_id = d.place_id and t.ctid <> d.keep_ctid;
+
+update user_restaurant_action t set
+    view_count = d.view_count,
+    click_count = d.click_count,
+    feedback = d.feedback,
+    updated_at = d.updated_at
+from user_restaurant_action_dup d
+where t.ctid = d.keep_ctid;
+
+create unique index if not exists user_restaurant_action_user_place_key
+    on user_restaurant_action (user_id, place_id);
+
+-- user_activity_action: 중복 row를 (user_id, place_id)별로 하나로 합침
+--   view/click은 합계, feedback은 가장 최근에 바뀐 row의 값, updated_at은 가장 늦은 값을 남은 row 하나에 반영
+create temp table user_activity_action_dup on commit drop as
+select
+    user_id,
+    place_id,
+    (array_agg(ctid order by updated_at desc nulls last))[1] as keep_ctid,
+    sum(coalesce(view_count, 0)) as view_count,
+    sum(coalesce(click_count, 0)) as click_count,
+    (array_agg(feedback order by updated_at desc nulls last) filter (where feedback is not null))[1] as feedback,
+    max(updated_at) as updated_at
+from user_activity_action
+group by user_id, place_id
+having count(*) > 1;
+
+-- update하면 ctid가 바뀌므로 나머지 row를 먼저 지우고 남은 row를 갱신
+delete from user_activity_action t
+using user_activity_action_dup d
+where t.user_id = d.user_id and t.place_id = d.place_id and t.ctid <> d.keep_ctid;
+
+update user_activity_action t set
+    view_count = d.view_count,
+    click_count = d.click_count,
+    feedback = d.feedback,
+    updated_at = d.updated_at
+from user_activity_action_dup d
+where t.ctid = d.keep_ctid;
+
+create unique index if not exists user_activity_action_user_place_key
+    on user_activity_action (user_id, place_id);
+
+commit;
+
+create or replace function record_actions(p_restaurant jsonb, p_activity jsonb)
+returns void
+language plpgsql
+as $$
+begin
+    insert into user_restaurant_action (user_id, place_id, view_count, click_count, feedback, updated_at)
+    select a.user_id, a.place_id, coalesce(a.view_count, 0), coalesce(a.click_count, 0), a.feedback, a.updated_at
+    from jsonb_populate_recordset(null::user_restaurant_action, coalesce(p_restaurant, '[]'::jsonb)) as a
+    on conflict (user_id, place_id) do update set
+        view_count = coalesce(user_restaurant_action.view_count, 0) + excluded.view_count,
+        click_count = coalesce(user_restaurant_action.click_count, 0) + excluded.click_count,
+        feedback = coalesce(excluded.feedback, user_restaurant_action.feedback),
+        updated_at = greatest(user_restaurant_action.updated_at, excluded.updated_at);
+
+    insert into user_activity_action (user_id, place_id, view_count, click_count, feedback, updated_at)
+    select a.user_id, a.place_id, coalesce(a.view_count, 0), coalesce(a.click_count, 0), a.feedback, a.updated_at
+    from jsonb_populate_recordset(null::user_activity_action, coalesce(p_activity, '[]'::jsonb)) as a
+    on conflict (user_id, place_id) do update set
+        view_count = coalesce(user_activity_action.view_count, 0) + excluded.view_count,
+        click_count = coalesce(user_activity_action.click_count, 0) + excluded.click_count,
+        feedback = coalesce(excluded.feedback, user_activity_action.feedback),
+        updated_at = greatest(user_activity_action.updated_at, excluded.updated_at);
+end;
+$$;
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from core.action_buffer import ActionAggregator
+
+
+async def _failing_flush(rows):
+    raise RuntimeError("supabase down")
+
+
+def _flush_and_fail(aggregator):
+    with pytest.raises(RuntimeError):
+        asyncio.run(aggregator.flush())
+
+
+# 반영 실패 시 다시 쌓는 key 수는 max_retry_keys까지, 나머지는 버리고 집계
+def test_failed_batch_is_capped_by_keys():
+    aggregator = ActionAggregator(_failing_flush, max_retry_keys=3)
+    for i in range(5):
+        aggregator.add("restaurant", "u1", f"p{i}", "view")
+    aggregator.add("restaurant", "u1", "p0", "like")
+
+    _flush_and_fail(aggregator)
+
+    stats = aggregator.stats()
+    assert len(aggregator) == 3
+    assert stats["dropped_rows"] == 2
+    assert stats["dropped_events"] == 2
+
+
+# 실패가 max_retry_age초 넘게 이어지면 실패한 증가분을 모두 버리고, 성공하면 다시 쌓기 시작
+def test_failed_batch_is_dropped_after_max_age():
+    calls = []
+
+    async def flush(rows):
+        calls.append(rows)
+        if len(calls) < 3:
+            raise RuntimeError("supabase down")
+
+    aggregator = ActionAggregator(flush, max_retry_age=0)
+    aggregator.add("restaurant", "u1", "p1", "click")
+    _flush_and_fail(aggregator)  # 첫 실패는 다시 쌓음
+    assert len(aggregator) == 1
+
+    _flush_and_fail(aggregator)  # 실패가 max_retry_age를 넘김 → 버림
+    assert len(aggregator) == 0
+    assert aggregator.stats()["dropped_events"] == 1
+
+    aggregator.add("restaurant", "u1", "p2", "view")
+    assert asyncio.run(aggregator.flush()) == 1
+    assert aggregator._failing_since is None
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from core.action_spool import ActionSpool
+
+KST = timezone(timedelta(hours=9))
+
+
+def _events(n):
+    now = datetime.now(KST)
+    return [("restaurant", "u1", f"p{i}", "view", now) for i in range(n)]
+
+
+# 같은 spool 파일을 두 워커가 함께 drain해도 이벤트는 한 번씩만 보냄
+def test_two_drainers_ship_each_event_once(tmp_path):
+    path = str(tmp_path / "spool.db")
+
+    async def run():
+        a = ActionSpool(path, commit_window=0, drain_batch=7)
+        b = ActionSpool(path, commit_window=0, drain_batch=7)
+        await a.start()
+        await b.start()
+        await a.append(_events(30))
+
+        shipped = []
+
+        async def ship(rows):
+            shipped.extend(r["event_id"] for r in rows)
+            await asyncio.sleep(0)
+
+        while True:
+            counts = await asyncio.gather(a.drain_once(ship), b.drain_once(ship))
+            if not any(counts):
+                break
+        await a.stop()
+        await b.stop()
+        return shipped
+
+    shipped = asyncio.run(run())
+    assert len(shipped) == 30
+    assert len(set(shipped)) == 30
+
+
+# 보내다 실패한 row는 claim이 만료되기 전까지 다른 drainer가 가져가지 않고, 만료되면 가져감
+def test_failed_claim_is_released_after_ttl(tmp_path):
+    path = str(tmp_path / "spool.db")
+
+    async def run():
+        a = ActionSpool(path, commit_window=0, claim_ttl=60)
+        b = ActionSpool(path, commit_window=0, claim_ttl=60)
+        await a.start()
+        await b.start()
+        await a.append(_events(3))
+
+        async def fail(rows):
+            raise RuntimeError("supabase down")
+
+        shipped = []
+
+        async def ship(rows):
+            shipped.extend(rows)
+
+        try:
+            await a.drain_once(fail)
+        except RuntimeError:
+            pass
+        before = await b.drain_once(ship)
+
+        b.claim_ttl = -1  # a의 claim이 만료된 것으로 취급
+        after = await b.drain_once(ship)
+        await a.stop()
+        await b.stop()
+        return before, after
+
+    assert asyncio.run(run()) == (0, 3)
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from core.business_hours import BusinessHoursStreamExtractor
+
+NEW_HOURS = [{"day": "월", "businessHours": {"start": "11:00", "end": "22:00"}}]
+LEGACY_HOURS = [{"day": "화", "businessHours": {"start": "10:00", "end": "21:00"}}]
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1000, 16 * 1024]
+
+
+def _run(html: str, chunk_size: int):
+    extractor = BusinessHoursStreamExtractor()
+    for i in range(0, len(html), chunk_size):
+        if extractor.feed(html[i:i + chunk_size]):
+            break
+    return extractor.finish()
+
+
+def _page(state: dict) -> str:
+    return "<html>" + "x" * 3000 + f"<script>window.__APOLLO_STATE__ = {json.dumps(state, ensure_ascii=False)};</script>" + "y" * 3000
+
+
+PAGES = {
+    # newBusinessHours가 있으면 예전 형식보다 우선
+    "new": (_page({
+        "a": {"businessHours": LEGACY_HOURS},
+        'PlaceDetailBase:1': {'newBusinessHours({"format":"restaurant"})': [{"name": None, "businessHours": NEW_HOURS}]},
+    }), NEW_HOURS),
+    # 예전 형식만 있는 페이지, 배열이 아닌 "businessHours"는 건너뜀
+    "legacy": (_page({"a": {"businessHours": {"start": "x"}}, "b": {"businessHours": LEGACY_HOURS}}), LEGACY_HOURS),
+    # 문자열 안의 대괄호/따옴표와 키처럼 보이는 문자열은 무시
+    "strings": (_page({"s": "\\\" ] [ \" usinessHours \"businessHours\": [", "b": {"businessHours": LEGACY_HOURS}}), LEGACY_HOURS),
+    "none": (_page({"a": 1}), None),
+}
+
+
+@pytest.mark.parametrize("name", PAGES)
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_extractor_finds_same_array_for_any_chunking(name, chunk_size):
+    html, expected = PAGES[name]
+    assert _run(html, chunk_size) == expected
+
+
+# newBusinessHours 배열을 찾으면 그 뒤는 읽지 않음
+def test_extractor_stops_after_new_array():
+    html, _ = PAGES["new"]
+    extractor = BusinessHoursStreamExtractor()
+    for i in range(0, len(html), 64):
+        if extractor.feed(html[i:i + 64]):
+            break
+    assert extractor.done
+    assert extractor.chars_read < len(html)
@@ -0,0 +1,75 @@
+import asyncio
+
+from core.cache import MISSING, TTLCache
+
+
+# 로드 도중 invalidate되면 변경 전에 읽은 값은 저장하지 않고, 이후 요청은 새로 로드
+def test_invalidate_during_load_discards_stale_value():
+    async def run():
+        cache = TTLCache("test", ttl=60)
+        started, release = asyncio.Event(), asyncio.Event()
+        calls = []
+
+        async def slow_loader():
+            calls.append("old")
+            started.set()
+            await release.wait()
+            return "old"
+
+        async def fresh_loader():
+            calls.append("new")
+            return "new"
+
+        first = asyncio.ensure_future(cache.get_or_load("k", slow_loader))
+        await started.wait()
+        cache.invalidate("k")
+
+        # invalidate 이후의 요청은 진행 중인 로드에 합류하지 않음
+        second = await cache.get_or_load("k", fresh_loader)
+        release.set()
+        first_value = await first
+        return first_value, second, cache.peek("k"), calls, cache.stats()
+
+    first_value, second, cached, calls, stats = asyncio.run(run())
+    assert first_value == "old"
+    assert second == "new"
+    assert cached == "new"
+    assert calls == ["old", "new"]
+    assert stats["stale_loads"] == 1
+    assert stats["inflight"] == 0
+
+
+def test_load_without_invalidate_is_cached():
+    async def run():
+        cache = TTLCache("test", ttl=60)
+
+        async def loader():
+            return 1
+
+        results = await asyncio.gather(*(cache.get_or_load("k", loader) for _ in range(3)))
+        return results, cache.peek("k"), cache.stats(), cache._stale
+
+    results, cached, stats, stale = asyncio.run(run())
+    assert results == [1, 1, 1]
+    assert cached == 1
+    assert stats["loads"] == 1 and stats["coalesced"] == 2
+    assert stale == set()
+
+
+def test_clear_discards_inflight_loads():
+    async def run():
+        cache = TTLCache("test", ttl=60)
+        release = asyncio.Event()
+
+        async def loader():
+            await release.wait()
+            return "old"
+
+        task = asyncio.ensure_future(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        cache.clear()
+        release.set()
+        await task
+        return cache.peek("k")
+
+    assert asyncio.run(run()) is MISSING
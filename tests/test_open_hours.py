@@ -0,0 +1,50 @@
+from core.open_hours import MINUTES_PER_DAY, MINUTES_PER_WEEK, OpenHoursIndex, build_intervals
+
+
+def _index(hours):
+    index = OpenHoursIndex()
+    index.load({**r, "place_id": "p"} for r in build_intervals(hours))
+    return index
+
+
+def _minute(day: int, hhmm: str) -> int:
+    h, m = hhmm.split(":")
+    return day * MINUTES_PER_DAY + int(h) * 60 + int(m)
+
+
+# 브레이크타임에는 영업중이 아님
+def test_break_hours_are_subtracted():
+    index = _index([{
+        "day": "월", "start": "11:00", "end": "22:00", "lastOrder": ["21:30"],
+        "breakHours": [{"start": "15:00", "end": "17:00"}],
+    }])
+    assert index.is_open("p", _minute(0, "14:59"))
+    assert not index.is_open("p", _minute(0, "15:00"))
+    assert not index.is_open("p", _minute(0, "16:59"))
+    assert index.is_open("p", _minute(0, "17:00"))
+    assert not index.is_open("p", _minute(0, "22:00"))
+
+
+# 자정을 넘기는 영업시간의 새벽 브레이크타임, 일요일 → 월요일로 넘어가는 구간
+def test_break_after_midnight_and_week_wrap():
+    rows = build_intervals([{
+        "day": "일", "start": "18:00", "end": "04:00", "lastOrder": [],
+        "breakHours": [{"start": "01:00", "end": "02:00"}],
+    }])
+    assert all(0 <= r["start_minute"] < r["end_minute"] <= MINUTES_PER_WEEK for r in rows)
+
+    index = _index([{
+        "day": "일", "start": "18:00", "end": "04:00", "lastOrder": [],
+        "breakHours": [{"start": "01:00", "end": "02:00"}],
+    }])
+    assert index.is_open("p", _minute(6, "23:00"))
+    assert index.is_open("p", _minute(0, "00:30"))
+    assert not index.is_open("p", _minute(0, "01:30"))
+    assert index.is_open("p", _minute(0, "03:00"))
+
+
+# breakHours가 없으면 이전과 같은 구간
+def test_without_break_hours():
+    rows = build_intervals([{"day": "매일", "start": "09:00", "end": "18:00", "lastOrder": []}])
+    assert len(rows) == 7
+    assert rows[0] == {"start_minute": 540, "end_minute": 1080, "last_order_minute": None}
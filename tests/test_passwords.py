@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("passlib")
+
+from core import passwords
+
+
+# cost를 올린 뒤 로그인하면 이전 cost의 해시가 새 해시로 교체되어야 함
+def test_verify_password_rehashes_lower_cost_hash(monkeypatch):
+    old_hash = passwords._make_context(4).hash("secret")
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_ROUNDS", 5)
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_CONCURRENCY", 1)
+
+    async def run():
+        await passwords.startup()
+        try:
+            return await passwords.verify_password("secret", old_hash), await passwords.verify_password("wrong", old_hash)
+        finally:
+            await passwords.shutdown()
+
+    (ok, new_hash), (bad_ok, bad_hash) = asyncio.run(run())
+    assert ok is True
+    assert new_hash is not None and new_hash.startswith("$2b$05$")
+    assert passwords._make_context(5).verify("secret", new_hash)
+    assert (bad_ok, bad_hash) == (False, None)
+    assert passwords.stats()["in_use"] == 0
+
+
+def test_verify_password_keeps_current_cost_hash(monkeypatch):
+    current = passwords._make_context(4).hash("secret")
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_ROUNDS", 4)
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_WORKERS", 1)
+
+    async def run():
+        await passwords.startup()
+        try:
+            return await passwords.verify_password("secret", current)
+        finally:
+            await passwords.shutdown()
+
+    assert asyncio.run(run()) == (True, None)
@@ -0,0 +1,56 @@
+# 식당 상세: get_restaurant_detail RPC와 기존 4번 호출(gather) 결과가 같은지 확인
+#
+# 운영 스키마와 sql/get_restaurant_detail.sql이 적용된 Supabase(로컬 `supabase start` 등)가 필요
+#   SUPABASE_PROJECT_URL=http://127.0.0.1:54321 SUPABASE_ANON_API_KEY=<anon key> python -m pytest tests/test_restaurant_detail.py
+# 접속 정보가 없으면 건너뜀
+import asyncio
+import json
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("supabase")
+if not os.getenv("SUPABASE_PROJECT_URL"):
+    pytest.skip("SUPABASE_PROJECT_URL이 없어 상세 조회 비교 테스트를 건너뜀", allow_module_level=True)
+
+import app
+from core import db
+
+SAMPLE_SIZE = 20
+MISSING_PLACE_ID = "__missing_place_id__"
+
+
+def normalize(doc) -> str:
+    return json.dumps(doc, ensure_ascii=False, sort_keys=True, default=str)
+
+
+async def sample_place_ids(n: int = SAMPLE_SIZE) -> list:
+    res = await db.execute(db.supabase.table("restaurant").select("place_id").limit(n))
+    return [r["place_id"] for r in res.data or []]
+
+
+def test_rpc_matches_gather():
+    async def run():
+        place_ids = await sample_place_ids()
+        assert place_ids, "restaurant 테이블에 비교할 데이터가 없습니다."
+        mismatches = []
+        for pid in place_ids:
+            gathered = await app.load_restaurant_detail_gather(pid)
+            rpc = await app.load_restaurant_detail_rpc(pid)
+            assert gathered is not None
+            if normalize(gathered) != normalize(rpc):
+                mismatches.append(pid)
+        return mismatches
+
+    assert asyncio.run(run()) == []
+
+
+def test_missing_place_id_is_none_on_both_paths():
+    async def run():
+        return (
+            await app.load_restaurant_detail_gather(MISSING_PLACE_ID),
+            await app.load_restaurant_detail_rpc(MISSING_PLACE_ID),
+        )
+
+    assert asyncio.run(run()) == (None, None)
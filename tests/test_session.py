@@ -0,0 +1,18 @@
+import pytest
+
+from core.session import InvalidSession, issue_token, verify_token
+
+
+def test_verify_token_roundtrip():
+    token, expires_at = issue_token("user-1", False)
+    session = verify_token(token)
+    assert session.user_id == "user-1"
+    assert session.expires_at == expires_at
+
+
+# 서명에 ASCII가 아닌 문자가 들어와도 TypeError(500)가 아니라 InvalidSession(401)
+def test_verify_token_rejects_non_ascii_signature():
+    token, _ = issue_token("user-1", False)
+    payload = token.split(".", 1)[0]
+    with pytest.raises(InvalidSession):
+        verify_token(f"{payload}.서명é")